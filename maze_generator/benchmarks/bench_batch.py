@@ -0,0 +1,30 @@
+"""
+Batch generation throughput for different worker counts
+
+Usage: python benchmarks/bench_batch.py [count] [size]
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.maze_batch import generate_batch
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 51
+    specs = [(size, size, seed) for seed in range(count)]
+
+    print(f"{count} mazes of {size}x{size}")
+    print(f"{'workers':>8} {'mazes/sec':>10}")
+    for workers in sorted({0, 1, 2, os.cpu_count() or 1}):
+        report = {}
+        for _ in generate_batch(specs, workers=workers, chunksize=8, report=report):
+            pass
+        print(f"{workers:>8} {report['mazes_per_sec']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""
+Time and peak memory of every carving strategy
+
+Usage: python benchmarks/bench_carving.py [size ...]
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.carving import CARVING_STRATEGIES, profile_strategy
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [101, 501]
+
+    print(f"{'size':>6} {'algorithm':>12} {'time, s':>9} {'peak, KiB':>10}")
+    for size in sizes:
+        for name in CARVING_STRATEGIES:
+            report = profile_strategy(name, size, size, seed=0)
+            print(f"{size:>6} {name:>12} {report['time']:>9.3f} "
+                  f"{report['peak_memory'] / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Throughput of ASCII, PGM and PNG export on large grids
+
+The dict lookup per cell that to_ascii() used before is measured as
+the reference for the translate table. "in, MB/s" counts the text or
+pixel bytes produced before compression.
+
+Usage: python benchmarks/bench_export.py [size] [cell_size]
+"""
+
+import sys
+import os
+import io
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.maze_cell import SYMBOLS
+from src.maze_export import to_ascii, write_pgm, write_png
+from src.maze_generator import MazeGenerator
+
+
+def ascii_per_cell(grid):
+    return '\n'.join(''.join(map(SYMBOLS.__getitem__, grid.row_codes(i)))
+                     for i in range(grid.height))
+
+
+def measure(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def main():
+    size = int(sys.argv[1]) | 1 if len(sys.argv) > 1 else 2001
+    cell_size = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    generator = MazeGenerator(size, size, seed=1)
+    generator.generate()
+    grid = generator.grid
+    cells = size * size
+    path = generator.solver().path('entrance', 'exit')
+
+    pixels = cells * cell_size * cell_size
+    # (name, function returning the bytes written, bytes of pixels or text produced)
+    cases = [
+        ('ascii, per cell', lambda: len(ascii_per_cell(grid).encode('utf-8')), None),
+        ('ascii, translate', lambda: len(to_ascii(grid).encode('utf-8')), None),
+        ('pgm', lambda: write_pgm(generator, io.BytesIO()), cells),
+        (f'pgm x{cell_size}', lambda: write_pgm(generator, io.BytesIO(), cell_size), pixels),
+        ('png', lambda: write_png(generator, io.BytesIO()), cells),
+        ('png, level 1', lambda: write_png(generator, io.BytesIO(), level=1), cells),
+        (f'png x{cell_size}', lambda: write_png(generator, io.BytesIO(), cell_size), pixels),
+        (f'png x{cell_size} + path',
+         lambda: write_png(generator, io.BytesIO(), cell_size, path), pixels),
+    ]
+    print(f"{size}x{size} cells, solution of {len(path)} cells")
+    print(f"{'case':>20} {'time, s':>9} {'Mcells/s':>9} {'out, MB':>8} {'in, MB/s':>9}")
+    for name, function, produced in cases:
+        elapsed, written = measure(function)
+        produced = produced or written
+        print(f"{name:>20} {elapsed:>9.3f} {cells / elapsed / 1e6:>9.1f} "
+              f"{written / 1e6:>8.2f} {produced / elapsed / 1e6:>9.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Memory and throughput of the grid storage backends
+
+Usage: python benchmarks/bench_grid.py [size ...]
+"""
+
+import sys
+import os
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.maze_cell import MazeCell
+from src.maze_generator import MazeGenerator
+from src.maze_grid import GRID_BACKENDS
+
+
+def legacy_bytes_per_cell(width, height):
+    """Memory of the old list-of-lists of MazeCell representation"""
+    rows = [[MazeCell.WALL for _ in range(width)] for _ in range(height)]
+    total = sys.getsizeof(rows) + sum(sys.getsizeof(row) for row in rows)
+    return total / (width * height)
+
+
+def available_backends():
+    """Backends whose dependencies are installed"""
+    names = []
+    for name, grid_class in GRID_BACKENDS.items():
+        try:
+            grid_class(1, 1)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def bench_backend(backend, size):
+    """Returns (bytes per cell, generated cells per second)"""
+    generator = MazeGenerator(size, size, backend=backend)
+    start = time.perf_counter()
+    generator.generate()
+    elapsed = time.perf_counter() - start
+    cells = generator.width * generator.height
+    return generator.grid.bytes_per_cell, cells / elapsed
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [101, 301, 1001]
+
+    print(f"{'size':>6} {'backend':>10} {'bytes/cell':>11} {'cells/sec':>12}")
+    for size in sizes:
+        print(f"{size:>6} {'list':>10} {legacy_bytes_per_cell(size, size):>11.2f} {'-':>12}")
+        for backend in available_backends():
+            per_cell, throughput = bench_backend(backend, size)
+            print(f"{size:>6} {backend:>10} {per_cell:>11.2f} {throughput:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
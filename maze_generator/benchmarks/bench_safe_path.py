@@ -0,0 +1,80 @@
+"""
+Safe-path search: integer-state engine against the original dict-based BFS
+
+Usage: python benchmarks/bench_safe_path.py [size ...]
+"""
+
+import sys
+import os
+import time
+from collections import deque
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.maze_generator import MazeGenerator
+from src.maze_grid import ROAD, EXIT, TRAP, TREASURE
+from src.safe_path import safe_search, safe_search_bidirectional
+
+
+def legacy_safe_path(generator, start, goal):
+    """The tuple-state search _find_safe_path used before, kept as a reference"""
+    height, width = generator.height, generator.width
+    queue = deque([(start, 0)])
+    parents = {(start, 0): None}
+    while queue:
+        (x, y), trap_count = queue.popleft()
+        if (x, y) == goal:
+            break
+        for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < height and 0 <= ny < width:
+                cell_type = generator.grid.get(nx, ny)
+                if cell_type == TRAP:
+                    new_trap_count = trap_count + 1
+                    if new_trap_count >= 3:
+                        continue
+                elif cell_type in [ROAD, EXIT, TREASURE]:
+                    new_trap_count = 0
+                else:
+                    continue
+                state = ((nx, ny), new_trap_count)
+                if state not in parents:
+                    parents[state] = ((x, y), trap_count)
+                    queue.append(state)
+    for (pos, traps), parent in parents.items():
+        if pos == goal:
+            path = []
+            current_state = (pos, traps)
+            while current_state is not None:
+                path.append(current_state[0])
+                current_state = parents.get(current_state)
+            return path[::-1]
+    return []
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1001, 2001]
+
+    print(f"{'size':>6} {'legacy, s':>10} {'int, s':>8} {'bidir, s':>9} {'speedup':>8}")
+    for size in sizes:
+        generator = MazeGenerator(size, size, seed=1, algorithm='kruskal', trap_density=0.1)
+        generator.generate()
+        start, goal = generator.entrance, generator.exit
+
+        legacy, legacy_time = timed(legacy_safe_path, generator, start, goal)
+        paths, int_time = timed(safe_search, generator.grid, start, [goal])
+        bidir, bidir_time = timed(safe_search_bidirectional, generator.grid, start, goal)
+        assert len(paths[goal]) == len(legacy) and bool(bidir) == bool(legacy)
+
+        print(f"{size:>6} {legacy_time:>10.3f} {int_time:>8.3f} {bidir_time:>9.3f} "
+              f"{legacy_time / int_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Carving time of one large maze with the tiled strategy per worker count
+
+Usage: python benchmarks/bench_tiled.py [size] [tile_size]
+"""
+
+import sys
+import os
+import random
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.carving import TiledCarving, get_strategy
+from src.maze_grid import create_grid
+
+
+def carve_time(strategy, size):
+    grid = create_grid(size, size)
+    start = time.perf_counter()
+    strategy.carve(grid, random.Random(0))
+    return time.perf_counter() - start
+
+
+def main():
+    size = int(sys.argv[1]) | 1 if len(sys.argv) > 1 else 4001
+    tile_size = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+    cpus = os.cpu_count() or 1
+
+    print(f"{size}x{size}, tiles of {tile_size}x{tile_size} cells, {cpus} CPUs")
+    print(f"{'strategy':>14} {'time, s':>9} {'speedup':>8}")
+    baseline = carve_time(get_strategy('dfs'), size)
+    print(f"{'dfs':>14} {baseline:>9.2f} {1:>8.2f}")
+    workers = 1
+    while True:
+        elapsed = carve_time(TiledCarving(tile_size, workers=workers), size)
+        print(f"{f'tiled x{workers}':>14} {elapsed:>9.2f} {baseline / elapsed:>8.2f}")
+        if workers >= cpus:
+            break
+        workers = min(cpus, workers * 2)
+
+
+if __name__ == "__main__":
+    main()
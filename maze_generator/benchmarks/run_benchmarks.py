@@ -0,0 +1,218 @@
+"""
+Benchmark suite: generation, searches, stats, rendering and serialization
+
+Every case runs on fixed seeds at several sizes. The best time of a few
+repeats and the peak memory of one traced run are written as JSON and
+compared against a stored baseline; the run fails when a case got slower
+or bigger than the threshold allows.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --sizes 21x15,501x501 --output new.json
+    python benchmarks/run_benchmarks.py --output benchmarks/baseline.json --no-compare
+"""
+
+import sys
+import os
+import argparse
+import io
+import json
+import platform
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.maze_generator import MazeGenerator
+from src.maze_io import load_maze
+from src.maze_viewport import LodPyramid, MazeViewport
+
+DEFAULT_SIZES = '21x15,101x101,501x501,2001x2001'
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+# Differences below these are noise, whatever the ratio
+MIN_TIME_DELTA = 0.002
+MIN_MEMORY_DELTA = 64 * 1024
+
+
+class StubImage:
+    """Stands in for tk.PhotoImage, so drawing can be measured without a display"""
+
+    def put(self, data, to=None):
+        pass
+
+
+def _maze(width, height, folder=None):
+    generator = MazeGenerator(width, height, seed=1, trap_density=0.02)
+    generator.generate()
+    return generator
+
+
+def _saved_maze(width, height, folder):
+    path = os.path.join(folder, f'{width}x{height}.maze')
+    _maze(width, height).save(path)
+    return path
+
+
+def _draw(generator):
+    """What the GUI does for a new maze: build the pyramid, fit and draw"""
+    view = MazeViewport(StubImage(), 500, 400)
+    view.show(LodPyramid(generator.grid))
+    view.render()
+
+
+def _cold(method):
+    """Calls a generator method with the search and stats caches dropped"""
+    def run(generator):
+        generator._invalidate_caches()
+        return method(generator)
+    return run
+
+
+# name -> (setup(width, height, folder) -> state, run(state))
+# Setup is not measured and run must leave the maze unchanged
+CASES = {
+    'generate': (lambda w, h, folder: (w, h),
+                 lambda size: MazeGenerator(*size, seed=1, trap_density=0.02).generate()),
+    'bfs': (_maze, _cold(lambda g: g._bfs(g.entrance, g.exit))),
+    'find_safe_path': (_maze, _cold(lambda g: g._find_safe_path(g.entrance, g.exit))),
+    'validate_maze': (_maze, _cold(MazeGenerator.validate_maze)),
+    'get_stats': (_maze, _cold(MazeGenerator.get_stats)),
+    'to_ascii': (_maze, MazeGenerator.to_ascii),
+    'draw': (_maze, _draw),
+    'save': (_maze, lambda g: g.save(io.BytesIO())),
+    'load': (_saved_maze, load_maze),
+}
+
+
+def measure(run, state, repeat, memory=True):
+    """Best time over repeat runs and peak traced memory of one more run"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(state)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        run(state)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {'time': best, 'peak_memory': peak}
+
+
+def run_suite(sizes, cases, repeat, memory=True, log=print):
+    """Runs every case at every size, returns {'case/WxH': result}"""
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for width, height in sizes:
+            # Cases that only read the maze share one per size
+            states = {}
+            for name in cases:
+                setup, run = CASES[name]
+                if setup not in states:
+                    states[setup] = setup(width, height, folder)
+                state = states[setup]
+                # Larger mazes get fewer repeats
+                times = repeat if width * height <= 250_000 else 1
+                key = f'{name}/{width}x{height}'
+                results[key] = measure(run, state, times, memory)
+                log(_format_row(key, results[key]))
+    return results
+
+
+def _format_row(key, result):
+    memory = result['peak_memory']
+    memory = f"{memory / 1024:>10.0f}" if memory is not None else f"{'-':>10}"
+    return f"{key:<28} {result['time'] * 1000:>10.2f} {memory}"
+
+
+def compare(results, baseline, threshold, memory_threshold):
+    """Cases that regressed against the baseline: (key, what, old, new)"""
+    regressions = []
+    for key, new in results.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+        if new['time'] > old['time'] * (1 + threshold) and \
+                new['time'] - old['time'] > MIN_TIME_DELTA:
+            regressions.append((key, 'time', old['time'], new['time']))
+        if new['peak_memory'] is not None and old.get('peak_memory') is not None and \
+                new['peak_memory'] > old['peak_memory'] * (1 + memory_threshold) and \
+                new['peak_memory'] - old['peak_memory'] > MIN_MEMORY_DELTA:
+            regressions.append((key, 'memory', old['peak_memory'], new['peak_memory']))
+    return regressions
+
+
+def parse_sizes(text):
+    sizes = []
+    for item in text.split(','):
+        width, _, height = item.partition('x')
+        sizes.append((int(width), int(height or width)))
+    return sizes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help=f"comma separated WxH list (default {DEFAULT_SIZES})")
+    parser.add_argument('--cases', default=','.join(CASES),
+                        help="comma separated case names")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="timed runs per case, the best one counts")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="skip the traced run that measures peak memory")
+    parser.add_argument('--output', help="write results as JSON to this file")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help="results to compare against")
+    parser.add_argument('--no-compare', action='store_true',
+                        help="only measure, e.g. to record a new baseline")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="allowed relative slowdown (default 0.25)")
+    parser.add_argument('--memory-threshold', type=float, default=0.10,
+                        help="allowed relative memory growth (default 0.10)")
+    args = parser.parse_args(argv)
+
+    cases = args.cases.split(',')
+    unknown = [name for name in cases if name not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+
+    print(f"{'case':<28} {'time, ms':>10} {'peak, KiB':>10}")
+    results = run_suite(parse_sizes(args.sizes), cases, args.repeat, not args.no_memory)
+
+    if args.output:
+        report = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results,
+        }
+        with open(args.output, 'w') as fp:
+            json.dump(report, fp, indent=2, sort_keys=True)
+
+    if args.no_compare:
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}, nothing to compare")
+        return 0
+    with open(args.baseline) as fp:
+        baseline = json.load(fp)['results']
+
+    regressions = compare(results, baseline, args.threshold, args.memory_threshold)
+    if not regressions:
+        print(f"\nNo regressions against {args.baseline}")
+        return 0
+    print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+    for key, what, old, new in regressions:
+        if what == 'time':
+            print(f"  {key:<28} time   {old * 1000:.2f} ms -> {new * 1000:.2f} ms")
+        else:
+            print(f"  {key:<28} memory {old / 1024:.0f} KiB -> {new / 1024:.0f} KiB")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Example of an asyncio backend serving mazes
+
+A small stand-in for a web server: GET /maze?width=51&height=31&seed=7
+answers with the maze as text, /stats with the service counters. Requests
+that exceed --timeout get 503 and their generation is cancelled; invalid
+parameters get 400.
+
+Usage:
+    python exaples/async_server.py --port 8080 --max-concurrent 4
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import json
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.maze_async import MazeService
+
+
+async def respond(writer, status, body, content_type='text/plain; charset=utf-8'):
+    reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found',
+              503: 'Service Unavailable'}[status]
+    data = body.encode('utf-8')
+    writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\n"
+                 f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode('ascii'))
+    writer.write(data)
+    await writer.drain()
+
+
+def maze_params(query):
+    params = {key: values[-1] for key, values in parse_qs(query).items()}
+    width = int(params.pop('width', 21))
+    height = int(params.pop('height', 15))
+    timeout = float(params.pop('timeout')) if 'timeout' in params else None
+    kwargs = {}
+    if 'seed' in params:
+        kwargs['seed'] = int(params['seed'])
+    if 'trap_density' in params:
+        kwargs['trap_density'] = float(params['trap_density'])
+    if 'algorithm' in params:
+        kwargs['algorithm'] = params['algorithm']
+    return width, height, timeout, kwargs
+
+
+async def answer(service, reader, writer):
+    request_line = (await reader.readline()).decode('latin-1').split()
+    # Skip the headers, the example does not need them
+    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+        pass
+    if len(request_line) < 2 or request_line[0] != 'GET':
+        return await respond(writer, 400, "only GET is supported\n")
+
+    url = urlsplit(request_line[1])
+    if url.path == '/stats':
+        return await respond(writer, 200, json.dumps(service.stats()) + '\n',
+                             'application/json')
+    if url.path != '/maze':
+        return await respond(writer, 404, "try /maze or /stats\n")
+    try:
+        width, height, timeout, kwargs = maze_params(url.query)
+    except ValueError as error:
+        return await respond(writer, 400, f"{error}\n")
+    try:
+        generator = await service.generate(width, height, timeout=timeout, **kwargs)
+    except asyncio.TimeoutError:
+        return await respond(writer, 503, "generation timed out\n")
+    except ValueError as error:
+        # Bad parameters, e.g. an unknown algorithm or trap_density above 1
+        return await respond(writer, 400, f"{error}\n")
+    await respond(writer, 200, generator.to_ascii() + '\n')
+
+
+def make_handler(service):
+    async def handle(reader, writer):
+        try:
+            await answer(service, reader, writer)
+        finally:
+            # Always release the connection, whatever went wrong
+            writer.close()
+    return handle
+
+
+async def serve(args):
+    async with MazeService(max_concurrent=args.max_concurrent, processes=args.processes,
+                           timeout=args.timeout) as service:
+        server = await asyncio.start_server(make_handler(service), args.host, args.port)
+        print(f"Serving mazes on http://{args.host}:{args.port}/maze?width=51&height=31&seed=1")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve mazes over HTTP with asyncio.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--max-concurrent', type=int, default=4,
+                        help="mazes generated at the same time")
+    parser.add_argument('--processes', action='store_true',
+                        help="generate in worker processes instead of threads")
+    parser.add_argument('--timeout', type=float, default=10.0,
+                        help="seconds per request before 503")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Load test for the asyncio example server
+
+Sends requests from many concurrent clients and reports latency
+percentiles. A few distinct seeds make clients ask for the same maze at
+the same time, which the server coalesces.
+
+Usage:
+    python exaples/async_server.py &
+    python exaples/load_test.py --requests 500 --concurrency 50 --size 101x101
+"""
+
+import argparse
+import asyncio
+import math
+import time
+from collections import Counter
+
+
+def percentile(values, share):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(share * len(values)))
+    return values[rank - 1]
+
+
+async def fetch(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode('ascii'))
+    await writer.drain()
+    status_line = await reader.readline()
+    await reader.read()
+    writer.close()
+    return int(status_line.split()[1])
+
+
+async def run(args):
+    width, _, height = args.size.partition('x')
+    queue = asyncio.Queue()
+    for i in range(args.requests):
+        seed = i % args.seeds if args.seeds else None
+        path = f"/maze?width={width}&height={height or width}"
+        if seed is not None:
+            path += f"&seed={seed}"
+        if args.timeout:
+            path += f"&timeout={args.timeout}"
+        queue.put_nowait(path)
+
+    latencies = []
+    statuses = Counter()
+
+    async def client():
+        while not queue.empty():
+            path = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                status = await fetch(args.host, args.port, path)
+            except OSError:
+                status = 'error'
+            latencies.append(time.perf_counter() - start)
+            statuses[status] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"{len(latencies)} requests in {elapsed:.2f} s ({len(latencies) / elapsed:.1f} req/s)")
+    print("status: " + ", ".join(f"{status}: {count}" for status, count in sorted(
+        statuses.items(), key=str)))
+    for name, share in (('p50', 0.50), ('p90', 0.90), ('p99', 0.99)):
+        print(f"{name}: {percentile(latencies, share) * 1000:.1f} ms")
+    print(f"max: {latencies[-1] * 1000:.1f} ms" if latencies else "max: -")
+
+    try:
+        reader, writer = await asyncio.open_connection(args.host, args.port)
+        writer.write(b"GET /stats HTTP/1.1\r\nConnection: close\r\n\r\n")
+        await writer.drain()
+        print("server: " + (await reader.read()).decode('utf-8').split('\r\n\r\n', 1)[1].strip())
+        writer.close()
+    except OSError:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for exaples/async_server.py.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=20,
+                        help="clients sending requests at the same time")
+    parser.add_argument('--size', default='51x51', help="maze size as WIDTHxHEIGHT")
+    parser.add_argument('--seeds', type=int, default=10,
+                        help="distinct seeds to cycle through, 0 for random mazes")
+    parser.add_argument('--timeout', type=float, help="per-request timeout in seconds")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,496 @@
+"""
+Passage carving strategies
+
+Every strategy turns a grid full of walls into a perfect maze: maze cells
+sit at odd coordinates and exactly one passage connects any two of them.
+"""
+
+import os
+import random
+import time
+import tracemalloc
+from array import array
+
+from .maze_grid import WALL, ROAD, create_grid
+
+
+class CarvingStrategy:
+    """Base class for carving algorithms"""
+
+    name = None
+
+    # Cells between two progress reports of the cell-by-cell strategies
+    progress_step = 1024
+
+    def carve(self, grid, rng, start=(1, 1), progress=None):
+        """
+        Carves passages into the grid using rng for every random choice
+
+        progress, if given, is called as progress(done, total) with the
+        number of maze cells carved so far. It may raise to stop carving.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def cell_shape(grid):
+        """Number of maze cell rows and columns in the grid"""
+        return (grid.height - 1) // 2, (grid.width - 1) // 2
+
+    @staticmethod
+    def open_cell(grid, r, c):
+        grid.cells[(2 * r + 1) * grid.stride + 2 * c + 1] = ROAD
+
+    @staticmethod
+    def open_wall(grid, r, c, dr, dc):
+        """Opens the wall between cell (r, c) and its neighbour (r + dr, c + dc)"""
+        grid.cells[(2 * r + 1 + dr) * grid.stride + 2 * c + 1 + dc] = ROAD
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+class DFSBacktracking(CarvingStrategy):
+    """Iterative depth-first search with backtracking, long winding corridors"""
+
+    name = 'dfs'
+
+    def carve(self, grid, rng, start=(1, 1), progress=None):
+        cells = grid.cells
+        w = grid.stride
+        height, width = grid.height, grid.width
+        rows, cols = self.cell_shape(grid)
+        step = self.progress_step
+        cx, cy = start
+        stack = [(cx, cy)]
+        cells[cx * w + cy] = ROAD
+        carved = 1
+        directions = [(2, 0), (-2, 0), (0, 2), (0, -2)]
+
+        while stack:
+            cx, cy = stack[-1]
+            rng.shuffle(directions)
+            moved = False
+
+            for dx, dy in directions:
+                nx, ny = cx + dx, cy + dy
+                if 1 <= nx < height - 1 and 1 <= ny < width - 1:
+                    if cells[nx * w + ny] == WALL:
+                        cells[(cx + dx // 2) * w + cy + dy // 2] = ROAD
+                        cells[nx * w + ny] = ROAD
+                        stack.append((nx, ny))
+                        moved = True
+                        carved += 1
+                        if progress is not None and carved % step == 0:
+                            progress(carved, rows * cols)
+                        break
+
+            if not moved:
+                stack.pop()
+
+        grid.touch()
+
+
+class Kruskal(CarvingStrategy):
+    """Randomized Kruskal: walls in random order, joined with union-find"""
+
+    name = 'kruskal'
+
+    def carve(self, grid, rng, start=(1, 1), progress=None):
+        rows, cols = self.cell_shape(grid)
+        count = rows * cols
+        for r in range(rows):
+            for c in range(cols):
+                self.open_cell(grid, r, c)
+
+        # Wall k * 2 is east of cell k, wall k * 2 + 1 is south of it
+        walls = array('i', (k * 2 for k in range(count) if k % cols != cols - 1))
+        walls.extend(k * 2 + 1 for k in range(count - cols))
+        rng.shuffle(walls)
+        parent = array('i', range(count))
+
+        def find(a):
+            while parent[a] != a:
+                parent[a] = parent[parent[a]]
+                a = parent[a]
+            return a
+
+        joined = 1
+        for wall in walls:
+            if joined >= count:
+                break
+            k, south = wall >> 1, wall & 1
+            other = k + cols if south else k + 1
+            a, b = find(k), find(other)
+            if a != b:
+                parent[a] = b
+                joined += 1
+                r, c = divmod(k, cols)
+                self.open_wall(grid, r, c, south, 1 - south)
+                if progress is not None and joined % self.progress_step == 0:
+                    progress(joined, count)
+
+        grid.touch()
+
+
+class Wilson(CarvingStrategy):
+    """Wilson's algorithm: loop-erased random walks, uniform spanning tree"""
+
+    name = 'wilson'
+
+    def carve(self, grid, rng, start=(1, 1), progress=None):
+        rows, cols = self.cell_shape(grid)
+        count = rows * cols
+        in_tree = bytearray(count)
+        # Last direction taken from every cell; overwriting it erases loops
+        step = array('i', [0]) * count
+        moves = ((-cols, -1, 0), (cols, 1, 0), (-1, 0, -1), (1, 0, 1))
+
+        root = (start[0] // 2) * cols + start[1] // 2
+        in_tree[root] = 1
+        self.open_cell(grid, *divmod(root, cols))
+        carved = 1
+        reported = 0
+
+        for first in range(count):
+            if in_tree[first]:
+                continue
+
+            cell = first
+            while not in_tree[cell]:
+                r, c = divmod(cell, cols)
+                while True:
+                    direction = rng.randrange(4)
+                    offset, dr, dc = moves[direction]
+                    if 0 <= r + dr < rows and 0 <= c + dc < cols:
+                        break
+                step[cell] = direction
+                cell += offset
+
+            cell = first
+            while not in_tree[cell]:
+                in_tree[cell] = 1
+                r, c = divmod(cell, cols)
+                offset, dr, dc = moves[step[cell]]
+                self.open_cell(grid, r, c)
+                self.open_wall(grid, r, c, dr, dc)
+                cell += offset
+                carved += 1
+
+            if progress is not None and carved - reported >= self.progress_step:
+                progress(carved, count)
+                reported = carved
+
+        grid.touch()
+
+
+def eller_rows(rows, cols, rng):
+    """
+    Eller's algorithm, yields (east, south) openings for every cell row
+
+    east[c] opens the wall between cells c and c + 1, south[c] the wall
+    below cell c (None for the last row). Only O(cols) state is kept, so
+    rows can be consumed as a stream.
+    """
+    sets = list(range(cols))
+    for r in range(rows):
+        last = r == rows - 1
+        # Set merges within the row go through a small union-find
+        parent = list(range(2 * cols))
+
+        def find(a):
+            while parent[a] != a:
+                parent[a] = parent[parent[a]]
+                a = parent[a]
+            return a
+
+        east = bytearray(max(0, cols - 1))
+        for c in range(cols - 1):
+            a, b = find(sets[c]), find(sets[c + 1])
+            if a != b and (last or rng.random() < 0.5):
+                parent[b] = a
+                east[c] = 1
+        sets = [find(label) for label in sets]
+
+        if last:
+            yield east, None
+            return
+
+        # Every set continues down through at least one cell
+        south = bytearray(cols)
+        members = {}
+        for c, label in enumerate(sets):
+            members.setdefault(label, []).append(c)
+        for group in members.values():
+            carried = False
+            for c in group:
+                if rng.random() < 0.5:
+                    south[c] = 1
+                    carried = True
+            if not carried:
+                south[rng.choice(group)] = 1
+        yield east, south
+
+        # Relabel compactly so labels stay below 2 * cols
+        labels = {}
+        fresh = cols
+        next_sets = []
+        for c in range(cols):
+            if south[c]:
+                next_sets.append(labels.setdefault(sets[c], len(labels)))
+            else:
+                next_sets.append(fresh)
+                fresh += 1
+        sets = next_sets
+
+
+class Eller(CarvingStrategy):
+    """Eller's algorithm, carves row by row with O(width) working memory"""
+
+    name = 'eller'
+
+    def carve(self, grid, rng, start=(1, 1), progress=None):
+        rows, cols = self.cell_shape(grid)
+        for r, (east, south) in enumerate(eller_rows(rows, cols, rng)):
+            for c in range(cols):
+                self.open_cell(grid, r, c)
+                if c < cols - 1 and east[c]:
+                    self.open_wall(grid, r, c, 0, 1)
+                if south is not None and south[c]:
+                    self.open_wall(grid, r, c, 1, 0)
+            if progress is not None:
+                progress((r + 1) * cols, rows * cols)
+        grid.touch()
+
+
+class BinaryTree(CarvingStrategy):
+    """Binary tree: every cell opens north or west, no extra memory"""
+
+    name = 'binary_tree'
+
+    def carve(self, grid, rng, start=(1, 1), progress=None):
+        rows, cols = self.cell_shape(grid)
+        for r in range(rows):
+            for c in range(cols):
+                self.open_cell(grid, r, c)
+                if r and c:
+                    if rng.random() < 0.5:
+                        self.open_wall(grid, r, c, -1, 0)
+                    else:
+                        self.open_wall(grid, r, c, 0, -1)
+                elif r:
+                    self.open_wall(grid, r, c, -1, 0)
+                elif c:
+                    self.open_wall(grid, r, c, 0, -1)
+            if progress is not None:
+                progress((r + 1) * cols, rows * cols)
+        grid.touch()
+
+
+class Sidewinder(CarvingStrategy):
+    """Sidewinder: horizontal runs, each joined upwards once"""
+
+    name = 'sidewinder'
+
+    def carve(self, grid, rng, start=(1, 1), progress=None):
+        rows, cols = self.cell_shape(grid)
+        for r in range(rows):
+            run_start = 0
+            for c in range(cols):
+                self.open_cell(grid, r, c)
+                close_run = c == cols - 1 or (r > 0 and rng.random() < 0.5)
+                if not close_run:
+                    self.open_wall(grid, r, c, 0, 1)
+                elif r > 0:
+                    self.open_wall(grid, r, rng.randint(run_start, c), -1, 0)
+                    run_start = c + 1
+            if progress is not None:
+                progress((r + 1) * cols, rows * cols)
+        grid.touch()
+
+
+def _write_tile(buffer, width, tile, r0, c0):
+    """Copies a carved tile grid into a full-size buffer of cell codes"""
+    data = tile.to_bytes()
+    for x in range(tile.height):
+        start = (2 * r0 + x) * width + 2 * c0
+        buffer[start:start + tile.width] = data[x * tile.width:(x + 1) * tile.width]
+
+
+def _carve_tile(task):
+    """Worker process: carves one tile straight into the shared grid buffer"""
+    from multiprocessing import shared_memory
+    memory_name, width, inner, bounds, seed = task
+    r0, c0, r1, c1 = bounds
+    tile = create_grid(2 * (c1 - c0) + 1, 2 * (r1 - r0) + 1)
+    get_strategy(inner).carve(tile, random.Random(seed))
+    memory = shared_memory.SharedMemory(name=memory_name)
+    try:
+        _write_tile(memory.buf, width, tile, r0, c0)
+    finally:
+        memory.close()
+    return (r1 - r0) * (c1 - c0)
+
+
+class TiledCarving(CarvingStrategy):
+    """
+    Carves square tiles independently, then joins them into one maze
+
+    Every tile is a perfect maze of its own, carved by the inner strategy
+    (in worker processes writing into shared memory when workers > 1).
+    A random spanning tree over the tiles, built with union-find, decides
+    which neighbouring tiles are joined; each of its edges opens one wall
+    at a random spot of their seam, so the whole grid is a perfect maze
+    again. Tile seeds come from rng, so the result does not depend on the
+    number of workers.
+    """
+
+    name = 'tiled'
+
+    def __init__(self, tile_size=256, workers=None, inner='dfs'):
+        """
+        Initialization of the strategy
+
+        Args:
+            tile_size (int): tile edge in maze cells
+            workers (int): worker processes, defaults to the CPU count;
+                1 carves all tiles in the calling process
+            inner (str): strategy carving each tile, any name but 'tiled'
+        """
+        if tile_size < 1:
+            raise ValueError("tile_size must be at least 1")
+        if inner == self.name:
+            raise ValueError("tiles cannot be carved by the tiled strategy")
+        self.tile_size = tile_size
+        self.workers = workers
+        self.inner = inner
+
+    def tiles(self, grid):
+        """(r0, c0, r1, c1) cell bounds of every tile, row by row"""
+        rows, cols = self.cell_shape(grid)
+        size = self.tile_size
+        return [(r0, c0, min(rows, r0 + size), min(cols, c0 + size))
+                for r0 in range(0, rows, size) for c0 in range(0, cols, size)]
+
+    def carve(self, grid, rng, start=(1, 1), progress=None):
+        rows, cols = self.cell_shape(grid)
+        tiles = self.tiles(grid)
+        seeds = [rng.getrandbits(64) for _ in tiles]
+        workers = self.workers or os.cpu_count() or 1
+        workers = min(workers, len(tiles))
+
+        width = grid.width
+        total = rows * cols
+        done = 0
+        # Tiles cover the whole grid, their border walls included, so the
+        # buffers need no filling beforehand
+        if workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            from multiprocessing import shared_memory
+            memory = shared_memory.SharedMemory(create=True, size=width * grid.height)
+            try:
+                tasks = [(memory.name, width, self.inner, bounds, seed)
+                         for bounds, seed in zip(tiles, seeds)]
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    for cells in executor.map(_carve_tile, tasks):
+                        done += cells
+                        if progress is not None:
+                            progress(done, total)
+                self._join_tiles(memory.buf, width, rows, cols, rng)
+                grid.load_bytes(memory.buf)
+            finally:
+                memory.close()
+                memory.unlink()
+            return
+
+        buffer = bytearray(width * grid.height)
+        inner = get_strategy(self.inner)
+        for (r0, c0, r1, c1), seed in zip(tiles, seeds):
+            tile = create_grid(2 * (c1 - c0) + 1, 2 * (r1 - r0) + 1)
+            inner.carve(tile, random.Random(seed))
+            _write_tile(buffer, width, tile, r0, c0)
+            done += (r1 - r0) * (c1 - c0)
+            if progress is not None:
+                progress(done, total)
+        self._join_tiles(buffer, width, rows, cols, rng)
+        grid.load_bytes(buffer)
+
+    def _join_tiles(self, buffer, width, rows, cols, rng):
+        """Opens one seam wall per edge of a random spanning tree over the tiles"""
+        size = self.tile_size
+        tile_rows, tile_cols = -(-rows // size), -(-cols // size)
+        # Edge k * 2 joins tile k with its east neighbour, k * 2 + 1 with its south one
+        edges = [k * 2 for k in range(tile_rows * tile_cols) if k % tile_cols != tile_cols - 1]
+        edges.extend(k * 2 + 1 for k in range((tile_rows - 1) * tile_cols))
+        rng.shuffle(edges)
+        parent = list(range(tile_rows * tile_cols))
+
+        def find(a):
+            while parent[a] != a:
+                parent[a] = parent[parent[a]]
+                a = parent[a]
+            return a
+
+        for edge in edges:
+            k, south = edge >> 1, edge & 1
+            a, b = find(k), find(k + tile_cols if south else k + 1)
+            if a == b:
+                continue
+            parent[a] = b
+            ti, tj = divmod(k, tile_cols)
+            if south:
+                # Wall below the last cell row of the tile, at a random column
+                c = rng.randrange(tj * size, min(cols, (tj + 1) * size))
+                x, y = 2 * min(rows, (ti + 1) * size), 2 * c + 1
+            else:
+                r = rng.randrange(ti * size, min(rows, (ti + 1) * size))
+                x, y = 2 * r + 1, 2 * min(cols, (tj + 1) * size)
+            buffer[x * width + y] = ROAD
+
+
+CARVING_STRATEGIES = {
+    strategy.name: strategy
+    for strategy in (DFSBacktracking, Kruskal, Wilson, Eller, BinaryTree, Sidewinder,
+                     TiledCarving)
+}
+
+
+def get_strategy(algorithm):
+    """Returns a strategy instance for a name or passes an instance through"""
+    if isinstance(algorithm, CarvingStrategy):
+        return algorithm
+    try:
+        return CARVING_STRATEGIES[algorithm]()
+    except KeyError:
+        raise ValueError(f"Unknown carving algorithm: {algorithm!r}") from None
+
+
+def profile_strategy(algorithm, width, height, seed=None):
+    """Measures carving time and peak extra memory of one strategy"""
+    strategy = get_strategy(algorithm)
+    width, height = width | 1, height | 1
+
+    grid = create_grid(width, height)
+    start = time.perf_counter()
+    strategy.carve(grid, random.Random(seed))
+    elapsed = time.perf_counter() - start
+
+    # Second run under tracemalloc, which would distort the timing
+    grid = create_grid(width, height)
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    elif hasattr(tracemalloc, 'reset_peak'):
+        tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    strategy.carve(grid, random.Random(seed))
+    peak = tracemalloc.get_traced_memory()[1] - before
+    if not already_tracing:
+        tracemalloc.stop()
+
+    return {
+        'algorithm': strategy.name,
+        'width': width,
+        'height': height,
+        'time': elapsed,
+        'peak_memory': peak,
+    }
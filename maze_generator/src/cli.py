@@ -0,0 +1,226 @@
+"""
+maze-gen: bulk maze generation to stdout or sharded files
+
+Only the standard library is imported at startup; the generator modules
+are loaded when mazes are actually produced. tkinter is never loaded;
+NumPy is loaded lazily by the whole-grid scans, and only if installed.
+"""
+
+import argparse
+import sys
+
+FORMATS = ('ascii', 'packed', 'jsonl')
+
+# Pending output is written once it grows past this many bytes
+DEFAULT_BUFFER_SIZE = 1 << 20
+
+
+class ChunkWriter:
+    """Collects small byte strings and writes them to the file in large chunks"""
+
+    def __init__(self, fp, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.fp = fp
+        self.buffer_size = buffer_size
+        self.parts = []
+        self.pending = 0
+        self.written = 0
+
+    def write(self, data):
+        self.parts.append(data)
+        self.pending += len(data)
+        if self.pending >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self.parts:
+            self.fp.write(b''.join(self.parts))
+            self.written += self.pending
+            self.parts = []
+            self.pending = 0
+        self.fp.flush()
+
+
+def parse_size(text):
+    """'51x31' or '51' (square) -> (width, height)"""
+    width, _, height = text.lower().partition('x')
+    try:
+        return int(width), int(height or width)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {text!r}") from None
+
+
+def parse_seeds(text):
+    """'100' (start) or '100:200' (start:stop, stop excluded)"""
+    start, _, stop = text.partition(':')
+    try:
+        return int(start), int(stop) if stop else None
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid seed range: {text!r}") from None
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='maze-gen', description="Generate mazes in bulk to stdout or files.")
+    parser.add_argument('-n', '--count', type=int, default=1,
+                        help="number of mazes (default 1)")
+    parser.add_argument('-s', '--size', type=parse_size, default=(21, 15),
+                        help="maze size as WIDTHxHEIGHT (default 21x15)")
+    parser.add_argument('--seeds', type=parse_seeds,
+                        help="seed range START or START:STOP; maze i gets seed START + i, "
+                             "STOP sets the count. Unseeded mazes are random")
+    parser.add_argument('-a', '--algorithm', default='dfs',
+                        help="carving algorithm (default dfs)")
+    parser.add_argument('-t', '--trap-density', type=float,
+                        help="share of free road cells turned into traps")
+    parser.add_argument('-f', '--format', choices=FORMATS, default='ascii',
+                        help="ascii text, packed binary records or JSON lines")
+    parser.add_argument('-w', '--workers', type=int, default=0,
+                        help="worker processes, 0 generates in this process (default)")
+    parser.add_argument('-o', '--output', default='-',
+                        help="output file, '-' for stdout (default)")
+    parser.add_argument('--shards', type=int, default=1,
+                        help="spread mazes round-robin over this many files; "
+                             "'{shard}' in --output is replaced by the shard number")
+    parser.add_argument('--buffer-size', type=int, default=DEFAULT_BUFFER_SIZE,
+                        help="bytes collected before each write")
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help="do not print the throughput report")
+    return parser
+
+
+def shard_paths(output, shards):
+    """File name of every shard"""
+    if shards == 1:
+        return [output]
+    if '{shard}' in output:
+        return [output.replace('{shard}', str(k)) for k in range(shards)]
+    return [f'{output}.{k}' for k in range(shards)]
+
+
+def iter_specs(args):
+    """MazeGenerator arguments of every requested maze"""
+    width, height = args.size
+    count = args.count
+    start = None
+    if args.seeds is not None:
+        start, stop = args.seeds
+        if stop is not None:
+            count = max(0, stop - start)
+    for i in range(count):
+        spec = {'width': width, 'height': height, 'algorithm': args.algorithm,
+                'trap_density': args.trap_density}
+        if start is not None:
+            spec['seed'] = start + i
+        yield spec
+
+
+class Encoder:
+    """Turns MazeResult objects into bytes of the selected format"""
+
+    def __init__(self, fmt):
+        from .maze_export import ascii_bytes
+        self.fmt = fmt
+        self.ascii_bytes = ascii_bytes
+        if fmt == 'packed':
+            from .maze_io import pack_row, write_header
+            self.pack_row = pack_row
+            self.write_header = write_header
+
+    def rows(self, result):
+        width = result.width
+        cells = result.cells
+        for offset in range(0, width * result.height, width):
+            yield cells[offset:offset + width]
+
+    def ascii_rows(self, result):
+        for row in self.rows(result):
+            yield self.ascii_bytes(row)
+
+    def write(self, result, out):
+        """Writes the maze to a ChunkWriter piece by piece"""
+        if self.fmt == 'ascii':
+            out.write(f"# maze {result.index} {result.width}x{result.height} "
+                      f"seed={result.seed}\n".encode('ascii'))
+            for line in self.ascii_rows(result):
+                out.write(line)
+                out.write(b'\n')
+            out.write(b'\n')
+        elif self.fmt == 'packed':
+            self.write_header(out, result.width, result.height, result.entrance,
+                              result.exit, result.seed, {'index': result.index})
+            for row in self.rows(result):
+                out.write(self.pack_row(row))
+        else:
+            import json
+            record = {
+                'index': result.index,
+                'width': result.width,
+                'height': result.height,
+                'seed': result.seed,
+                'entrance': result.entrance,
+                'exit': result.exit,
+                'fingerprint': result.fingerprint,
+                'rows': [line.decode('utf-8') for line in self.ascii_rows(result)],
+            }
+            out.write(json.dumps(record, ensure_ascii=False).encode('utf-8'))
+            out.write(b'\n')
+
+
+def run(args, stdout=None, stderr=None):
+    """Generates and writes the mazes, returns the report dict"""
+    from .maze_batch import generate_batch
+
+    stdout = stdout if stdout is not None else sys.stdout.buffer
+    stderr = stderr if stderr is not None else sys.stderr
+    encoder = Encoder(args.format)
+
+    files = []
+    if args.output == '-':
+        writers = [ChunkWriter(stdout, args.buffer_size)]
+    else:
+        for path in shard_paths(args.output, args.shards):
+            files.append(open(path, 'wb'))
+        writers = [ChunkWriter(fp, args.buffer_size) for fp in files]
+
+    report = {}
+    try:
+        for result in generate_batch(iter_specs(args), workers=args.workers,
+                                     chunksize=16 if args.workers else 1, report=report):
+            encoder.write(result, writers[result.index % len(writers)])
+        for writer in writers:
+            writer.flush()
+    finally:
+        for fp in files:
+            fp.close()
+
+    written = sum(writer.written for writer in writers)
+    elapsed = report.get('elapsed', 0.0)
+    report['bytes'] = written
+    report['bytes_per_sec'] = written / elapsed if elapsed > 0 else 0.0
+    if not args.quiet:
+        print(f"{report.get('count', 0)} mazes in {elapsed:.2f} s: "
+              f"{report.get('mazes_per_sec', 0.0):.1f} mazes/s, "
+              f"{written / 1e6:.2f} MB ({report['bytes_per_sec'] / 1e6:.2f} MB/s)",
+              file=stderr)
+    return report
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.count < 0 or args.shards < 1 or args.buffer_size < 1:
+        parser.error("--count, --shards and --buffer-size must be positive")
+    if args.shards > 1 and args.output == '-':
+        parser.error("--shards needs --output")
+    try:
+        run(args)
+    except ValueError as error:
+        parser.error(str(error))
+    except BrokenPipeError:
+        # Output piped into e.g. head, which stopped reading
+        sys.stderr.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
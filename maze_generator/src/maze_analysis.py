@@ -0,0 +1,112 @@
+"""
+Whole-grid scans: cell statistics, border detection and cell lookup
+
+NumPy is used when it is installed (one bincount pass, slicing and
+argwhere); otherwise the same results are computed with bytes
+operations that also run in C.
+"""
+
+from .maze_grid import ROAD, CELLS
+
+_numpy = None
+
+
+def load_numpy():
+    """Returns the numpy module, or None when it is not installed"""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+def as_array(grid):
+    """2D uint8 view of the grid buffer, without copying"""
+    numpy = load_numpy()
+    if isinstance(grid.cells, numpy.ndarray):
+        flat = grid.cells
+    else:
+        flat = numpy.frombuffer(grid.cells, dtype=numpy.uint8)
+    return flat.reshape(grid.height, grid.stride)
+
+
+def cell_counts(grid):
+    """Number of cells of every type, indexed by cell code"""
+    numpy = load_numpy()
+    if numpy:
+        counts = numpy.bincount(as_array(grid).ravel(), minlength=len(CELLS))
+        return [int(count) for count in counts]
+    return [grid.count(code) for code in range(len(CELLS))]
+
+
+def border_cells(grid, code=ROAD):
+    """Border cells with the given code, in the order of a row-by-row scan"""
+    height, width = grid.height, grid.width
+    numpy = load_numpy()
+    if numpy:
+        array = as_array(grid)
+        # (y, side) pairs, row-major order keeps top/bottom interleaved per column
+        rows = numpy.argwhere(numpy.stack((array[0], array[height - 1]), axis=1) == code)
+        cols = numpy.argwhere(numpy.stack((array[:, 0], array[:, width - 1]), axis=1) == code)
+        return ([(0 if side == 0 else height - 1, int(y)) for y, side in rows] +
+                [(int(x), 0 if side == 0 else width - 1) for x, side in cols])
+
+    cells = grid.cells
+    stride = grid.stride
+    top = grid.row_codes(0)
+    bottom = grid.row_codes(height - 1)
+    left = bytes(cells[0::stride])
+    right = bytes(cells[width - 1::stride])
+    found = []
+    for y in range(width):
+        if top[y] == code:
+            found.append((0, y))
+        if bottom[y] == code:
+            found.append((height - 1, y))
+    for x in range(height):
+        if left[x] == code:
+            found.append((x, 0))
+        if right[x] == code:
+            found.append((x, width - 1))
+    return found
+
+
+def open_border_access(grid):
+    """Opens the outer wall next to every road cell touching it"""
+    height, width = grid.height, grid.width
+    numpy = load_numpy()
+    if numpy:
+        array = as_array(grid)
+        for outer, inner in ((array[0], array[1]), (array[height - 1], array[height - 2]),
+                             (array[:, 0], array[:, 1]),
+                             (array[:, width - 1], array[:, width - 2])):
+            edge = outer[1:-1:2]
+            edge[inner[1:-1:2] == ROAD] = ROAD
+        grid.touch()
+        return
+
+    get, put = grid.get, grid.set
+    for y in range(1, width - 1, 2):
+        if get(1, y) == ROAD:
+            put(0, y, ROAD)
+        if get(height - 2, y) == ROAD:
+            put(height - 1, y, ROAD)
+    for x in range(1, height - 1, 2):
+        if get(x, 1) == ROAD:
+            put(x, 0, ROAD)
+        if get(x, width - 2) == ROAD:
+            put(x, width - 1, ROAD)
+
+
+def find_cell(grid, code):
+    """Position of the first cell with the given code, or None"""
+    numpy = load_numpy()
+    if numpy:
+        found = numpy.argwhere(as_array(grid) == code)
+        if not len(found):
+            return None
+        return int(found[0][0]), int(found[0][1])
+    return grid.find(code)
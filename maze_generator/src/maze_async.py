@@ -0,0 +1,209 @@
+"""
+asyncio facade over maze generation
+
+Generation runs in a thread or process executor so the event loop stays
+responsive. A semaphore bounds how many mazes are generated at once,
+identical seeded requests in flight share one computation, and a request
+that times out (or whose caller is cancelled) stops the generator through
+its cancel event once nobody else waits for it.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .maze_batch import generate_one
+from .maze_generator import MazeGenerator, GenerationCancelled
+
+
+def _generate(width, height, params, cancel):
+    generator = MazeGenerator(width, height, cancel=cancel, **params)
+    generator.generate()
+    return generator
+
+
+def _generate_in_process(width, height, params, cancel):
+    spec = dict(params, width=width, height=height, cancel=cancel)
+    return generate_one(0, spec)
+
+
+class _Request:
+    """One computation and the callers waiting for it"""
+
+    def __init__(self, cancel):
+        self.cancel = cancel
+        self.task = None
+        self.waiters = 0
+
+
+class MazeService:
+    """Generates mazes for coroutines with bounded concurrency"""
+
+    def __init__(self, max_concurrent=4, processes=False, executor=None, timeout=None):
+        """
+        Initialization of the service
+
+        Args:
+            max_concurrent (int): mazes generated at the same time, further
+                requests wait for a free slot
+            processes (bool): generate in worker processes instead of threads
+            executor (Executor): executor to use instead of creating one;
+                it is not shut down by close()
+            timeout (float): default seconds per request, None waits forever
+        """
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        self.max_concurrent = max_concurrent
+        self.processes = processes
+        self.timeout = timeout
+        self._own_executor = executor is None
+        if executor is None:
+            executor_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+            executor = executor_class(max_workers=max_concurrent)
+        self.executor = executor
+        # Worker processes cannot see a threading.Event, they get a manager's
+        self._manager = None
+        # Semaphore and in-flight requests belong to one event loop
+        self._loop = None
+        self._semaphore = None
+        self._inflight = {}
+        self._tasks = set()
+        # Executor futures not finished yet, cancelled by close()
+        self._futures = set()
+        self.counters = dict.fromkeys(
+            ('requests', 'coalesced', 'completed', 'timeouts', 'cancelled', 'errors'), 0)
+
+    @staticmethod
+    def key(width, height, params):
+        """Coalescing key of a request, None for random (unseeded) mazes"""
+        if params.get('seed') is None or 'rng' in params:
+            return None
+        key = width, height, tuple(sorted(params.items()))
+        try:
+            hash(key)
+        except TypeError:
+            return None  # Unhashable parameter values, the request runs alone
+        return key
+
+    async def generate(self, width, height, timeout=None, **params):
+        """
+        A finished MazeGenerator for the request
+
+        Coalesced callers receive the same generator object, so it should
+        be treated as read-only. Raises asyncio.TimeoutError when the
+        timeout passes first; the computation is cancelled if no other
+        caller still waits for it.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+            self._inflight = {}
+        timeout = self.timeout if timeout is None else timeout
+        self.counters['requests'] += 1
+
+        key = self.key(width, height, params)
+        request = self._inflight.get(key) if key is not None else None
+        if request is None:
+            request = _Request(self._cancel_event())
+            request.task = asyncio.ensure_future(self._run(width, height, params, request))
+            self._tasks.add(request.task)
+            request.task.add_done_callback(self._tasks.discard)
+            if key is not None:
+                self._inflight[key] = request
+                request.task.add_done_callback(lambda _: self._forget(key, request))
+        else:
+            self.counters['coalesced'] += 1
+
+        request.waiters += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(request.task), timeout)
+        except asyncio.TimeoutError:
+            self.counters['timeouts'] += 1
+            raise
+        finally:
+            request.waiters -= 1
+            if not request.waiters and not request.task.done():
+                self.counters['cancelled'] += 1
+                request.cancel.set()
+                request.task.cancel()
+                self._forget(key, request)
+
+    def _cancel_event(self):
+        if not self.processes:
+            return threading.Event()
+        if self._manager is None:
+            import multiprocessing
+            self._manager = multiprocessing.Manager()
+        return self._manager.Event()
+
+    def _forget(self, key, request):
+        if key is not None and self._inflight.get(key) is request:
+            del self._inflight[key]
+
+    async def _run(self, width, height, params, request):
+        async with self._semaphore:
+            if request.cancel.is_set():
+                raise asyncio.CancelledError()
+            work = _generate_in_process if self.processes else _generate
+            submitted = self.executor.submit(work, width, height, params, request.cancel)
+            self._futures.add(submitted)
+            submitted.add_done_callback(self._futures.discard)
+            future = asyncio.wrap_future(submitted)
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Keep the slot until the worker has actually stopped
+                request.cancel.set()
+                await asyncio.wait([future])
+                if not future.cancelled():
+                    future.exception()  # GenerationCancelled, nobody wants it
+                raise
+            except GenerationCancelled:
+                raise asyncio.CancelledError() from None
+            except Exception:
+                self.counters['errors'] += 1
+                raise
+        self.counters['completed'] += 1
+        return result.to_generator() if self.processes else result
+
+    def stats(self):
+        """Request counters plus computations running or waiting for a slot"""
+        stats = dict(self.counters)
+        stats['in_flight'] = len(self._tasks)
+        return stats
+
+    def close(self):
+        """Cancels waiting work and shuts down the executor (if the service created it)"""
+        # Executor.shutdown(cancel_futures=True) needs Python 3.9
+        for future in list(self._futures):
+            future.cancel()
+        if self._own_executor:
+            self.executor.shutdown(wait=True)
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+
+_default_service = None
+
+
+async def generate_async(width, height, timeout=None, service=None, **params):
+    """
+    Generates a maze without blocking the event loop
+
+    Uses a shared MazeService with default settings unless one is given;
+    see MazeService.generate() for timeouts and coalescing.
+    """
+    global _default_service
+    if service is None:
+        if _default_service is None:
+            _default_service = MazeService()
+        service = _default_service
+    return await service.generate(width, height, timeout=timeout, **params)
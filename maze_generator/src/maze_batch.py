@@ -0,0 +1,119 @@
+"""
+Batch maze generation across worker processes
+"""
+
+import os
+import time
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+from .maze_generator import MazeGenerator
+
+
+class MazeResult(namedtuple('MazeResult', 'index width height seed entrance exit cells fingerprint')):
+    """Finished maze as compact raw grid bytes, cheap to send between processes"""
+
+    __slots__ = ()
+
+    def to_generator(self):
+        """Rebuilds a MazeGenerator holding this maze"""
+        generator = MazeGenerator(self.width, self.height, seed=self.seed)
+        generator.grid.load_bytes(self.cells)
+        generator.entrance = self.entrance
+        generator.exit = self.exit
+        return generator
+
+
+def normalize_spec(spec):
+    """Turns (width, height[, seed]) tuples or dicts into MazeGenerator kwargs"""
+    if isinstance(spec, dict):
+        return dict(spec)
+    width, height, *rest = spec
+    kwargs = {'width': width, 'height': height}
+    if rest:
+        kwargs['seed'] = rest[0]
+    return kwargs
+
+
+def generate_one(index, spec):
+    """Generates a single maze described by a spec"""
+    generator = MazeGenerator(**spec)
+    generator.generate()
+    return MazeResult(index, generator.width, generator.height, generator.seed,
+                      generator.entrance, generator.exit,
+                      generator.grid.to_bytes(), generator.fingerprint())
+
+
+def _generate_chunk(chunk):
+    return [generate_one(index, spec) for index, spec in chunk]
+
+
+def _chunks(specs, chunksize):
+    items = ((index, normalize_spec(spec)) for index, spec in enumerate(specs))
+    while True:
+        chunk = list(islice(items, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def generate_batch(specs, workers=None, chunksize=1, ordered=True, report=None):
+    """
+    Generates many mazes in parallel and yields MazeResult objects
+
+    Args:
+        specs (iterable): (width, height), (width, height, seed) or
+            dicts of MazeGenerator arguments
+        workers (int): worker processes, defaults to the CPU count;
+            0 runs everything in the calling process
+        chunksize (int): specs sent to a worker at once
+        ordered (bool): yield in submission order, otherwise as completed
+        report (dict): filled with count, elapsed and mazes_per_sec at the end
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    chunksize = max(1, chunksize)
+    start = time.perf_counter()
+    count = 0
+
+    if workers == 0:
+        for chunk in _chunks(specs, chunksize):
+            for result in _generate_chunk(chunk):
+                count += 1
+                yield result
+    else:
+        # Keep a bounded number of chunks in flight so that specs can be a
+        # lazy iterable of any length
+        max_pending = workers * 4
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for chunk in _chunks(specs, chunksize):
+                pending.append(executor.submit(_generate_chunk, chunk))
+                while len(pending) >= max_pending:
+                    for result in _next_done(pending, ordered):
+                        count += 1
+                        yield result
+            while pending:
+                for result in _next_done(pending, ordered):
+                    count += 1
+                    yield result
+
+    if report is not None:
+        elapsed = time.perf_counter() - start
+        report.update({
+            'count': count,
+            'workers': workers,
+            'elapsed': elapsed,
+            'mazes_per_sec': count / elapsed if elapsed > 0 else 0.0,
+        })
+
+
+def _next_done(pending, ordered):
+    """Removes one finished chunk from pending and returns its results"""
+    if ordered:
+        return pending.popleft().result()
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    future = next(iter(done))
+    pending.remove(future)
+    return future.result()
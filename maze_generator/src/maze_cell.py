@@ -11,4 +11,15 @@ class MazeCell(int, Enum):
     ENTRANCE = 2
     EXIT = 3
     TRAP = 4
-    TREASURE = 5
\ No newline at end of file
+    TREASURE = 5
+
+
+# Text symbol of every cell type
+SYMBOLS = {
+    MazeCell.WALL: '█',
+    MazeCell.ROAD: ' ',
+    MazeCell.ENTRANCE: 'E',
+    MazeCell.EXIT: 'X',
+    MazeCell.TRAP: 'T',
+    MazeCell.TREASURE: '$'
+}
\ No newline at end of file
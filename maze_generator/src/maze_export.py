@@ -0,0 +1,212 @@
+"""
+Bulk export of mazes as text and images
+
+Everything works on whole rows of cell codes: text goes through one
+bytes.translate table, image rows are widened with strided slice
+assignments and written as binary PGM or palette PNG (zlib, standard
+library only) straight to a file object, a chunk at a time.
+"""
+
+import struct
+import zlib
+
+from .maze_cell import SYMBOLS
+from .maze_grid import ROAD
+from .maze_render import COLORS, RGB
+
+# Colour of the solution path overlay
+PATH_COLOR = "orange"
+
+# Palette index of path cells, right after the cell codes
+PATH_INDEX = max(COLORS) + 1
+
+IMAGE_FORMATS = ('png', 'pgm')
+
+# Output is written once this many bytes are pending; for PNG this is
+# also the size of the IDAT chunks
+CHUNK_SIZE = 1 << 20
+
+
+def _ascii_tables():
+    """Translate table to single bytes and the replacements for non-ASCII symbols"""
+    table = bytearray(range(256))
+    replacements = []
+    placeholder = 1
+    for code, symbol in SYMBOLS.items():
+        data = symbol.encode('utf-8')
+        if len(data) == 1:
+            table[code] = data[0]
+        else:
+            # Control bytes never occur among the symbols
+            table[code] = placeholder
+            replacements.append((bytes([placeholder]), data))
+            placeholder += 1
+    return bytes(table), replacements
+
+
+_ASCII_TABLE, _ASCII_REPLACEMENTS = _ascii_tables()
+
+
+def ascii_bytes(codes):
+    """UTF-8 text of a run of cell codes"""
+    data = codes.translate(_ASCII_TABLE)
+    for placeholder, symbol in _ASCII_REPLACEMENTS:
+        data = data.replace(placeholder, symbol)
+    return data
+
+
+def to_ascii(grid):
+    """
+    Text of a whole grid, rows separated by newlines
+
+    Rows are translated one at a time, so apart from the result only
+    one row of intermediate bytes is alive.
+    """
+    return '\n'.join([ascii_bytes(grid.row_codes(i)).decode('utf-8')
+                      for i in range(grid.height)])
+
+
+def _rows(source):
+    """Width, height and row iterator of a MazeGenerator, MazeGrid or MazeFile"""
+    grid = getattr(source, 'grid', source)
+    if hasattr(grid, 'row_codes'):
+        return grid.width, grid.height, (grid.row_codes(i) for i in range(grid.height))
+    return source.width, source.height, source.iter_rows()
+
+
+def _rgb(color):
+    return RGB[color] if isinstance(color, str) else tuple(color)
+
+
+def palette(colors=None, path_color=PATH_COLOR):
+    """RGB of every palette index: the cell codes, then the path overlay"""
+    colors = {**COLORS, **(colors or {})}
+    entries = [_rgb(colors.get(code, "black")) for code in range(PATH_INDEX)]
+    entries.append(_rgb(path_color))
+    return entries
+
+
+def _gray(rgb):
+    red, green, blue = rgb
+    return (299 * red + 587 * green + 114 * blue + 500) // 1000
+
+
+def _overlay(path):
+    """Path cells grouped by row"""
+    by_row = {}
+    for x, y in path or ():
+        by_row.setdefault(x, []).append(y)
+    return by_row
+
+
+def _pixel_rows(source, cell_size, table, path):
+    """
+    Yields every pixel row as bytes of palette indexes (or grey values)
+
+    A grid row is widened once by cell_size strided assignments and then
+    repeated cell_size times, so no Python code runs per cell.
+    """
+    width, _, rows = _rows(source)
+    overlay = _overlay(path)
+    scaled = bytearray(width * cell_size)
+    for x, codes in enumerate(rows):
+        columns = overlay.get(x)
+        if columns:
+            codes = bytearray(codes)
+            for y in columns:
+                if codes[y] == ROAD:
+                    codes[y] = PATH_INDEX
+            codes = bytes(codes)
+        if table is not None:
+            codes = codes.translate(table)
+        if cell_size == 1:
+            line = bytes(codes)
+        else:
+            for k in range(cell_size):
+                scaled[k::cell_size] = codes
+            line = bytes(scaled)
+        for _ in range(cell_size):
+            yield line
+
+
+def write_pgm(source, fp, cell_size=1, path=None, colors=None):
+    """
+    Writes a binary greyscale PGM image to a binary file object
+
+    Cells are shaded by the brightness of their palette colour.
+    Returns the number of bytes written.
+    """
+    width, height, _ = _rows(source)
+    table = bytearray(range(256))
+    for index, rgb in enumerate(palette(colors)):
+        table[index] = _gray(rgb)
+    header = f"P5\n{width * cell_size} {height * cell_size}\n255\n".encode('ascii')
+    fp.write(header)
+    written = len(header)
+
+    chunk = []
+    pending = 0
+    for line in _pixel_rows(source, cell_size, bytes(table), path):
+        chunk.append(line)
+        pending += len(line)
+        if pending >= CHUNK_SIZE:
+            fp.write(b''.join(chunk))
+            written += pending
+            chunk, pending = [], 0
+    fp.write(b''.join(chunk))
+    return written + pending
+
+
+def _png_chunk(kind, data):
+    return (struct.pack('>I', len(data)) + kind + data +
+            struct.pack('>I', zlib.crc32(data, zlib.crc32(kind)) & 0xffffffff))
+
+
+def write_png(source, fp, cell_size=1, path=None, colors=None, level=6):
+    """
+    Writes an 8-bit palette PNG to a binary file object
+
+    Rows are compressed with one zlib stream; whenever its output passes
+    CHUNK_SIZE it is written out as an IDAT chunk. Returns the number
+    of bytes written.
+    """
+    width, height, _ = _rows(source)
+    entries = palette(colors)
+    head = b'\x89PNG\r\n\x1a\n' + _png_chunk(b'IHDR', struct.pack(
+        '>IIBBBBB', width * cell_size, height * cell_size, 8, 3, 0, 0, 0))
+    head += _png_chunk(b'PLTE', b''.join(bytes(rgb) for rgb in entries))
+    fp.write(head)
+    written = len(head)
+
+    compressor = zlib.compressobj(level)
+    pending = []
+    size = 0
+    for line in _pixel_rows(source, cell_size, None, path):
+        # Filter type 0 in front of every row
+        data = compressor.compress(b'\x00' + line)
+        if data:
+            pending.append(data)
+            size += len(data)
+            if size >= CHUNK_SIZE:
+                chunk = _png_chunk(b'IDAT', b''.join(pending))
+                fp.write(chunk)
+                written += len(chunk)
+                pending, size = [], 0
+    pending.append(compressor.flush())
+    tail = _png_chunk(b'IDAT', b''.join(pending)) + _png_chunk(b'IEND', b'')
+    fp.write(tail)
+    return written + len(tail)
+
+
+def export_image(source, path, cell_size=1, solution=None, colors=None, fmt=None):
+    """
+    Saves a maze as PNG or PGM, chosen by fmt or the file extension
+
+    solution, a list of cells, is drawn over road cells in PATH_COLOR.
+    """
+    fmt = fmt or path.rsplit('.', 1)[-1].lower()
+    if fmt not in IMAGE_FORMATS:
+        raise ValueError(f"unknown image format: {fmt!r}")
+    writer = write_png if fmt == 'png' else write_pgm
+    with open(path, 'wb') as fp:
+        return writer(source, fp, cell_size, solution, colors)
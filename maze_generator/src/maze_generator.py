@@ -1,262 +1,465 @@
 """
-Maze generator using the DFS backtracking algorithm
+Maze generator, DFS backtracking by default with pluggable carving algorithms
 """
 
+import hashlib
 import random
+import struct
+import time
+import tracemalloc
 from collections import deque
+from contextlib import contextmanager
 from .maze_cell import MazeCell
+from .maze_grid import (GRID_BACKENDS, create_grid, WALL, ROAD, ENTRANCE,
+                        EXIT, TRAP, TREASURE)
+from .maze_analysis import border_cells, cell_counts, find_cell, open_border_access
+from .safe_path import SafePathEngine, safe_search, safe_search_bidirectional
+from .maze_graph import MazeGraph
+from .carving import get_strategy
+
+
+# Cells a player can walk through, traps included
+PASSABLE = (ROAD, EXIT, TRAP, TREASURE)
+
+# Generation phases reported to progress callbacks, in order
+PHASES = ('carve', 'traps', 'validate')
+
+# Finer phases of the instrumentation metrics -> phase they belong to
+METRIC_PHASES = {
+    'carve': 'carve',
+    'traps': 'traps',
+    'treasure': 'traps',
+    'validate': 'validate',
+    'regenerate': 'validate',
+}
+
+# Trap candidates tried between two progress reports
+TRAP_PROGRESS_STEP = 256
+
+
+class GenerationCancelled(Exception):
+    """Raised by generate() when the cancel event is set"""
 
 
 class MazeGenerator:
     """Class for generating random mazes"""
 
-    def __init__(self, width, height):
+    def __init__(self, width, height, backend='bytearray', seed=None, rng=None,
+                 trap_density=None, algorithm='dfs', progress=None, cancel=None,
+                 instrument=False, hooks=None):
         """
         Initialization of the maze generator
 
         Args:
             width (int)
             height (int)
+            backend (str): grid storage, 'bytearray' or 'numpy'
+            seed (int): seed for reproducible generation
+            rng (random.Random): random source, overrides seed
+            trap_density (float): share of free road cells turned into traps,
+                by default 0-5 traps are placed
+            algorithm (str or CarvingStrategy): carving algorithm, 'dfs',
+                'kruskal', 'wilson', 'eller', 'binary_tree', 'sidewinder' or 'tiled'
+            progress (callable): called as progress(phase, done, total)
+                while generate() runs
+            cancel (threading.Event): generate() raises GenerationCancelled
+                soon after it is set
+            instrument (bool or str): fill generator.metrics on generate(),
+                'memory' also traces peak memory with tracemalloc
+            hooks (callable or list): called as hook(phase, record) for
+                every metrics record, needs instrument
         """
         self.width = width if width % 2 == 1 else width + 1
         self.height = height if height % 2 == 1 else height + 1
-        self.maze = [[MazeCell.WALL for _ in range(self.width)] for _ in range(self.height)]
+        self.backend = backend
+        self.seed = seed
+        # All randomness goes through this instance, never the global random module
+        self.rng = rng if rng is not None else random.Random(seed)
+        if trap_density is not None and not 0 <= trap_density <= 1:
+            raise ValueError("trap_density must be between 0 and 1")
+        self.trap_density = trap_density
+        self.carver = get_strategy(algorithm)
+        self.algorithm = self.carver.name
+        self.grid = create_grid(self.width, self.height, backend)
         self.entrance = None
         self.exit = None
+        # (cache key, stats) of the last get_stats() call
+        self._stats_cache = None
+        # Search results, valid while grid.version == _cache_version
+        self._paths = {'bfs': {}, 'safe': {}}
+        self._cache_version = None
+        # (entrance and exit, MazeSolver), see solver()
+        self._solver = None
+        # (cache key, MazeGraph) of the finished maze, see graph()
+        self._graph = None
+        # Full-grid traversals, states they visited and cache hits, reset by generate()
+        self.search_counts = {'bfs': 0, 'safe_search': 0, 'cache_hits': 0, 'visited': 0}
+        self.regenerations = 0
+        self.progress = progress
+        self.cancel = cancel
+        # Seconds spent in every phase of the last generate() call
+        self.phase_times = {}
+        self.instrument = instrument
+        if hooks is None:
+            hooks = ()
+        elif callable(hooks):
+            hooks = (hooks,)
+        self.hooks = tuple(hooks)
+        # Per-phase records of the last generate() call, see _phase()
+        self.metrics = {}
+
+    @property
+    def maze(self):
+        """Row view of the grid, supports maze[i][j] like a list of lists"""
+        return self.grid
+
+    @maze.setter
+    def maze(self, rows):
+        self.grid = GRID_BACKENDS[self.backend].from_rows(rows)
+        self._invalidate_caches()
 
     def generate(self):
         """Generation of a maze with traps and treasures"""
-        self._carve_passages(1, 1)
+        self.search_counts = dict.fromkeys(self.search_counts, 0)
+        self.regenerations = 0
+        self.phase_times = dict.fromkeys(PHASES, 0.0)
+        self.metrics = {}
+        tracing = self.instrument == 'memory' and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        try:
+            self._generate()
+        finally:
+            if tracing:
+                tracemalloc.stop()
+        if self.instrument:
+            self._record('total', self._total_metrics())
+
+    def _generate(self):
+        with self._phase('carve'):
+            self._carve_passages(1, 1)
 
-        # Find all available cells on the border
-        border_cells = self._find_border_cells()
-        if len(border_cells) < 2:
-            self._create_border_access()
+            # Find all available cells on the border
             border_cells = self._find_border_cells()
+            if len(border_cells) < 2:
+                self._create_border_access()
+                border_cells = self._find_border_cells()
 
-        if len(border_cells) >= 2:
-            self.entrance, self.exit = random.sample(border_cells, 2)
-        else:
-            # Backup option
-            self.entrance = (1, 0)
-            self.exit = (self.height - 2, self.width - 1)
+            if len(border_cells) >= 2:
+                self.entrance, self.exit = self.rng.sample(border_cells, 2)
+            else:
+                # Backup option
+                self.entrance = (1, 0)
+                self.exit = (self.height - 2, self.width - 1)
 
-        self.maze[self.entrance[0]][self.entrance[1]] = MazeCell.ENTRANCE
-        self.maze[self.exit[0]][self.exit[1]] = MazeCell.EXIT
+            self.grid.set(self.entrance[0], self.entrance[1], ENTRANCE)
+            self.grid.set(self.exit[0], self.exit[1], EXIT)
 
-        # Find solution path without traps first
-        solution_path = self._bfs(self.entrance, self.exit)
+        with self._phase('traps'):
+            # Find solution path without traps first
+            solution_path = self._bfs(self.entrance, self.exit)
 
-        # Adding traps safely
-        self._place_traps_safely(solution_path)
+            # Adding traps safely
+            safe_path = self._place_traps_safely(solution_path)
 
-        # Add treasure safely
-        self._place_treasure_safely(solution_path)
+        with self._phase('treasure'):
+            # Add treasure safely
+            self._place_treasure_safely(solution_path, safe_path)
 
         # Final validation
-        if not self.validate_maze():
+        self._report('validate', 0, 1)
+        with self._phase('validate'):
+            valid = self.validate_maze()
+        if not valid:
             # Regenerate if validation fails
-            self._regenerate_until_valid()
+            with self._phase('regenerate'):
+                self._regenerate_until_valid()
+
+    def _report(self, phase, done, total):
+        """Passes progress to the callback and stops if cancellation was requested"""
+        if self.cancel is not None and self.cancel.is_set():
+            raise GenerationCancelled(f"generation cancelled during {phase}")
+        if self.progress is not None:
+            self.progress(phase, done, total)
+
+    @contextmanager
+    def _phase(self, name):
+        """
+        Times one part of generate()
+
+        With instrumentation a record is also stored in metrics[name]:
+        time, search counters (bfs, safe_search, cache_hits, visited),
+        regeneration attempts and peak traced memory (None unless
+        instrument == 'memory'). Without it only phase_times is updated.
+        """
+        if not self.instrument:
+            started = time.perf_counter()
+            yield
+            self.phase_times[METRIC_PHASES[name]] += time.perf_counter() - started
+            return
+
+        counts = dict(self.search_counts)
+        attempts = self.regenerations
+        memory = tracemalloc.is_tracing() and self.instrument == 'memory'
+        if memory:
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - started
+
+        self.phase_times[METRIC_PHASES[name]] += elapsed
+        record = {'time': elapsed}
+        for key, value in counts.items():
+            record[key] = self.search_counts[key] - value
+        record['attempts'] = self.regenerations - attempts
+        record['peak_memory'] = tracemalloc.get_traced_memory()[1] - baseline if memory else None
+        self._record(name, record)
+
+    def _record(self, name, record):
+        self.metrics[name] = record
+        for hook in self.hooks:
+            hook(name, record)
+
+    def _total_metrics(self):
+        """Sum of the phase records, peak memory is the largest phase peak"""
+        total = {'time': 0.0}
+        peaks = []
+        for record in self.metrics.values():
+            for key, value in record.items():
+                if key == 'peak_memory':
+                    if value is not None:
+                        peaks.append(value)
+                else:
+                    total[key] = total.get(key, 0) + value
+        total['peak_memory'] = max(peaks) if peaks else None
+        return total
 
     def _carve_passages(self, cx, cy):
-        """DFS backtracking algorithm for path creation"""
-        stack = [(cx, cy)]
-        self.maze[cx][cy] = MazeCell.ROAD
-
-        while stack:
-            cx, cy = stack[-1]
-            directions = [(2, 0), (-2, 0), (0, 2), (0, -2)]
-            random.shuffle(directions)
-            moved = False
-
-            for dx, dy in directions:
-                nx, ny = cx + dx, cy + dy
-                if 1 <= nx < self.height - 1 and 1 <= ny < self.width - 1:
-                    if self.maze[nx][ny] == MazeCell.WALL:
-                        self.maze[cx + dx // 2][cy + dy // 2] = MazeCell.ROAD
-                        self.maze[nx][ny] = MazeCell.ROAD
-                        stack.append((nx, ny))
-                        moved = True
-                        break
-
-            if not moved:
-                stack.pop()
+        """Creates the passages with the selected carving strategy"""
+        if self.progress is None and self.cancel is None:
+            self.carver.carve(self.grid, self.rng, (cx, cy))
+            return
+
+        def progress(done, total):
+            self._report('carve', done, total)
+
+        cells = ((self.height - 1) // 2) * ((self.width - 1) // 2)
+        progress(0, cells)
+        self.carver.carve(self.grid, self.rng, (cx, cy), progress)
+        progress(cells, cells)
 
     def _find_border_cells(self):
         """Finds all roads at the edge of the maze"""
-        border_cells = []
-        for y in range(self.width):
-            if self.maze[0][y] == MazeCell.ROAD:
-                border_cells.append((0, y))
-            if self.maze[self.height - 1][y] == MazeCell.ROAD:
-                border_cells.append((self.height - 1, y))
-        for x in range(self.height):
-            if self.maze[x][0] == MazeCell.ROAD:
-                border_cells.append((x, 0))
-            if self.maze[x][self.width - 1] == MazeCell.ROAD:
-                border_cells.append((x, self.width - 1))
-        return border_cells
+        return border_cells(self.grid, ROAD)
 
     def _create_border_access(self):
         """Creates additional passages to the edge of the maze"""
-        for y in range(1, self.width - 1, 2):
-            if self.maze[1][y] == MazeCell.ROAD:
-                self.maze[0][y] = MazeCell.ROAD
-            if self.maze[self.height - 2][y] == MazeCell.ROAD:
-                self.maze[self.height - 1][y] = MazeCell.ROAD
-
-        for x in range(1, self.height - 1, 2):
-            if self.maze[x][1] == MazeCell.ROAD:
-                self.maze[x][0] = MazeCell.ROAD
-            if self.maze[x][self.width - 2] == MazeCell.ROAD:
-                self.maze[x][self.width - 1] = MazeCell.ROAD
+        open_border_access(self.grid)
+
+    def _search_cache(self, kind):
+        """Cached paths of one search kind, dropped whenever the grid changes"""
+        if self._cache_version != self.grid.version:
+            self._paths = {'bfs': {}, 'safe': {}}
+            self._cache_version = self.grid.version
+        return self._paths[kind]
+
+    def _invalidate_caches(self):
+        self._stats_cache = None
+        self._cache_version = None
+        # Both hold on to the grid object, which may have been replaced
+        self._solver = None
+        self._graph = None
+
+    def clear_caches(self):
+        """Frees cached search results and statistics, e.g. before storing the maze"""
+        self._invalidate_caches()
+        self._paths = {'bfs': {}, 'safe': {}}
+
+    def graph(self):
+        """Corridor-compressed MazeGraph of the maze, cached until the grid changes"""
+        key = (self.grid.version, self.entrance, self.exit)
+        if self._graph is None or self._graph[0] != key:
+            terminals = (self.entrance, self.exit, find_cell(self.grid, TREASURE))
+            self._graph = (key, MazeGraph(self.grid, terminals))
+        return self._graph[1]
+
+    def solver(self):
+        """MazeSolver for repeated path queries, rebuilt when the maze changes"""
+        from .maze_solver import MazeSolver
+        # The solver follows grid edits itself, entrance and exit are part of the key
+        key = (self.entrance, self.exit)
+        if self._solver is None or self._solver[0] != key:
+            self._solver = (key, MazeSolver(self))
+        return self._solver[1]
 
     def _bfs(self, start, goal):
         """Finding a path from the entrance to the exit using BFS"""
+        cache = self._search_cache('bfs')
+        if (start, goal) in cache:
+            self.search_counts['cache_hits'] += 1
+            return list(cache[(start, goal)])
+        self.search_counts['bfs'] += 1
+
+        cells = self.grid.cells
+        w = self.width
         queue = deque([start])
         parents = {start: None}
         while queue:
             x, y = queue.popleft()
             if (x, y) == goal:
                 break
-            for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
+            for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
                 nx, ny = x + dx, y + dy
                 if 0 <= nx < self.height and 0 <= ny < self.width:
-                    if self.maze[nx][ny] in [MazeCell.ROAD, MazeCell.EXIT] and (nx, ny) not in parents:
+                    if cells[nx * w + ny] in PASSABLE and (nx, ny) not in parents:
                         parents[(nx, ny)] = (x, y)
                         queue.append((nx, ny))
 
-        if goal not in parents:
-            return []
-
         path = []
-        cur = goal
-        while cur is not None:
-            path.append(cur)
-            cur = parents.get(cur)
-        return path[::-1]
-
-    def _find_safe_path(self, start, goal):
+        if goal in parents:
+            cur = goal
+            while cur is not None:
+                path.append(cur)
+                cur = parents.get(cur)
+            path.reverse()
+        self.search_counts['visited'] += len(parents)
+
+        cache[(start, goal)] = path
+        if path and self.grid.count(TRAP) == 0:
+            # Without traps the safe search would walk the same states
+            self._search_cache('safe')[(start, goal)] = path
+        return list(path)
+
+    def _find_safe_path(self, start, goal, bidirectional=False, graph=None):
         """BFS with trap safety check - finds path where player won't die from traps"""
-        # Queue: (position, consecutive_traps)
-        queue = deque([(start, 0)])
-        parents = {(start, 0): None}
-
-        while queue:
-            (x, y), trap_count = queue.popleft()
-
-            if (x, y) == goal:
-                break
-
-            for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
-                nx, ny = x + dx, y + dy
-                if 0 <= nx < self.height and 0 <= ny < self.width:
-                    cell_type = self.maze[nx][ny]
-                    new_trap_count = trap_count
-
-                    if cell_type == MazeCell.TRAP:
-                        new_trap_count = trap_count + 1
-                        if new_trap_count >= 3:
-                            continue  # Skip this path - player would die
-                    elif cell_type in [MazeCell.ROAD, MazeCell.EXIT, MazeCell.TREASURE]:
-                        new_trap_count = 0  # Reset trap counter
-                    else:
-                        continue  # Skip walls and other invalid cells
-
-                    state = ((nx, ny), new_trap_count)
-                    if state not in parents:
-                        parents[state] = ((x, y), trap_count)
-                        queue.append(state)
-
-        # Reconstruct path
-        path = []
-        # Find any safe state that reached the goal
-        for (pos, traps), parent in parents.items():
-            if pos == goal:
-                current_state = (pos, traps)
-                while current_state is not None:
-                    path.append(current_state[0])  # Extract position only
-                    current_state = parents.get(current_state)
-                return path[::-1]
+        if bidirectional:
+            cache = self._search_cache('safe')
+            if (start, goal) not in cache:
+                self.search_counts['safe_search'] += 1
+                stats = {}
+                cache[(start, goal)] = safe_search_bidirectional(self.grid, start, goal, stats)
+                self.search_counts['visited'] += stats['visited']
+            return list(cache[(start, goal)])
+        return self._safe_paths(start, (goal,), graph)[goal]
+
+    def _safe_paths(self, start, goals, graph=None):
+        """
+        Safe paths from start to several goals, answered from the cache when possible
 
-        return []
+        graph=True searches the corridor graph, which pays off on a finished
+        maze; while traps are placed the grid changes after every search.
+        By default the graph is used when an up-to-date one is cached.
+        """
+        if graph is None:
+            graph = self._graph is not None and \
+                self._graph[0] == (self.grid.version, self.entrance, self.exit)
+        cache = self._search_cache('safe')
+        missing = [goal for goal in goals if (start, goal) not in cache]
+        if missing:
+            search = self._graph_search if graph else self._safe_search
+            cache.update(((start, goal), path)
+                         for goal, path in search(start, missing).items())
+        else:
+            self.search_counts['cache_hits'] += 1
+        return {goal: list(cache[(start, goal)]) for goal in goals}
+
+    def _safe_search(self, start, goals):
+        """One BFS over (cell, consecutive traps) states that serves all goals"""
+        self.search_counts['safe_search'] += 1
+        stats = {}
+        paths = safe_search(self.grid, start, goals, stats)
+        self.search_counts['visited'] += stats['visited']
+        return paths
+
+    def _graph_search(self, start, goals):
+        """The same search over the corridor graph, when all cells are its nodes"""
+        graph = self.graph()
+        if graph.node(start) == -1 or -1 in map(graph.node, goals):
+            return self._safe_search(start, goals)
+        self.search_counts['safe_search'] += 1
+        stats = {}
+        paths = graph.safe_paths(start, goals, stats)
+        self.search_counts['visited'] += stats['visited']
+        return paths
 
     def _place_traps_safely(self, solution_path):
         """Place traps ensuring there's still a safe path"""
-        traps = random.randint(0, 5)
+        cells = self.grid.cells
+        w = self.width
+
+        # Solution cells are marked in a flat mask instead of list lookups
+        on_solution = bytearray(len(cells))
+        for x, y in solution_path:
+            on_solution[x * w + y] = 1
+        road_cells = [index for index, code in enumerate(cells)
+                      if code == ROAD and not on_solution[index]]
+
+        if self.trap_density is None:
+            traps = self.rng.randint(0, 5)
+        else:
+            traps = int(len(road_cells) * self.trap_density)
         placed = 0
-        max_attempts = 50
-
-        road_cells = []
-        for i in range(self.height):
-            for j in range(self.width):
-                if self.maze[i][j] == MazeCell.ROAD and (i, j) not in solution_path:
-                    road_cells.append((i, j))
 
-        random.shuffle(road_cells)
+        self.rng.shuffle(road_cells)
 
-        for cell in road_cells:
+        # One full safe-path search, later traps are checked incrementally
+        self._report('traps', 0, traps)
+        engine = SafePathEngine(self, self.entrance, self.exit)
+        for tried, index in enumerate(road_cells):
             if placed >= traps:
                 break
+            if tried % TRAP_PROGRESS_STEP == 0 and tried:
+                self._report('traps', placed, traps)
 
-            r, c = cell
-            # Temporarily place trap
-            original_cell = self.maze[r][c]
-            self.maze[r][c] = MazeCell.TRAP
-
-            # Check if safe path still exists
-            safe_path = self._find_safe_path(self.entrance, self.exit)
-            if safe_path:
+            r, c = divmod(index, w)
+            if engine.try_place_trap(r, c):
                 placed += 1
-            else:
-                # Revert if no safe path
-                self.maze[r][c] = original_cell
+        self._report('traps', placed, traps)
+
+        return engine.witness()
 
-    def _place_treasure_safely(self, solution_path):
+    def _place_treasure_safely(self, solution_path, safe_path=None):
         """Place treasure ensuring it's reachable"""
-        if random.random() > 0.5 and solution_path and len(solution_path) > 2:
+        if self.rng.random() > 0.5 and solution_path and len(solution_path) > 2:
             # Try to place treasure on safe path
-            safe_path = self._find_safe_path(self.entrance, self.exit)
+            if safe_path is None:
+                safe_path = self._find_safe_path(self.entrance, self.exit)
             if safe_path and len(safe_path) > 2:
-                treasure_cell = random.choice(safe_path[1:-1])
+                treasure_cell = self.rng.choice(safe_path[1:-1])
                 # Don't place on entrance/exit
                 if treasure_cell != self.entrance and treasure_cell != self.exit:
-                    self.maze[treasure_cell[0]][treasure_cell[1]] = MazeCell.TREASURE
+                    self.grid.set(treasure_cell[0], treasure_cell[1], TREASURE)
 
     def validate_maze(self):
         """Validate that maze meets all requirements"""
-        # Check if there's a path from entrance to exit
-        basic_path = self._bfs(self.entrance, self.exit)
-        if not basic_path:
+        if self.entrance is None or self.exit is None:
             return False
 
-        # Check if there's a safe path (player won't die from traps)
-        safe_path = self._find_safe_path(self.entrance, self.exit)
-        if not safe_path:
+        # One safe search answers exit and treasure reachability together
+        treasure_pos = find_cell(self.grid, TREASURE)
+        goals = (self.exit, treasure_pos) if treasure_pos else (self.exit,)
+        paths = self._safe_paths(self.entrance, goals, graph=True)
+
+        # A safe path (player won't die from traps) is also a plain path
+        # from entrance to exit, so no separate BFS is needed
+        if not paths[self.exit]:
             return False
 
         # Check if treasure is reachable (if present)
-        treasure_pos = None
-        for i in range(self.height):
-            for j in range(self.width):
-                if self.maze[i][j] == MazeCell.TREASURE:
-                    treasure_pos = (i, j)
-                    break
-            if treasure_pos:
-                break
-
-        if treasure_pos:
-            treasure_path = self._find_safe_path(self.entrance, treasure_pos)
-            if not treasure_path:
-                return False
+        if treasure_pos and not paths[treasure_pos]:
+            return False
 
         return True
 
     def _regenerate_until_valid(self, max_attempts=10):
         """Regenerate maze until it meets all requirements"""
         for attempt in range(max_attempts):
+            self._report('validate', attempt + 1, max_attempts + 1)
+            self.regenerations += 1
             # Reset maze
-            self.maze = [[MazeCell.WALL for _ in range(self.width)] for _ in range(self.height)]
+            self.grid.reset(WALL)
             self.entrance = None
             self.exit = None
 
@@ -266,43 +469,57 @@ class MazeGenerator:
             # Find border cells for entrance/exit
             border_cells = self._find_border_cells()
             if len(border_cells) >= 2:
-                self.entrance, self.exit = random.sample(border_cells, 2)
+                self.entrance, self.exit = self.rng.sample(border_cells, 2)
             else:
                 self.entrance = (1, 0)
                 self.exit = (self.height - 2, self.width - 1)
 
-            self.maze[self.entrance[0]][self.entrance[1]] = MazeCell.ENTRANCE
-            self.maze[self.exit[0]][self.exit[1]] = MazeCell.EXIT
+            self.grid.set(self.entrance[0], self.entrance[1], ENTRANCE)
+            self.grid.set(self.exit[0], self.exit[1], EXIT)
 
             solution_path = self._bfs(self.entrance, self.exit)
-            self._place_traps_safely(solution_path)
-            self._place_treasure_safely(solution_path)
+            safe_path = self._place_traps_safely(solution_path)
+            self._place_treasure_safely(solution_path, safe_path)
 
             if self.validate_maze():
                 return True
 
         return False
 
+    def fingerprint(self):
+        """Stable content hash of the maze, usable as a cache key"""
+        entrance = self.entrance or (-1, -1)
+        exit_ = self.exit or (-1, -1)
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(struct.pack('<6q', self.width, self.height, *entrance, *exit_))
+        digest.update(self.grid.to_bytes())
+        return digest.hexdigest()
+
+    def save(self, path, metadata=None):
+        """Saves the maze in the packed binary format"""
+        from .maze_io import save_maze
+        save_maze(self, path, metadata)
+
+    @classmethod
+    def load(cls, path, backend='bytearray'):
+        """Loads a maze saved with save()"""
+        from .maze_io import load_maze
+        return load_maze(path, backend)
+
     def to_ascii(self):
         """Converts a maze into ASCII representation"""
-        symbols = {
-            MazeCell.WALL: '█',
-            MazeCell.ROAD: ' ',
-            MazeCell.ENTRANCE: 'E',
-            MazeCell.EXIT: 'X',
-            MazeCell.TRAP: 'T',
-            MazeCell.TREASURE: '$'
-        }
-
-        lines = []
-        for row in self.maze:
-            lines.append(''.join(symbols[cell] for cell in row))
-        return '\n'.join(lines)
+        from .maze_export import to_ascii
+        return to_ascii(self.grid)
 
     def get_stats(self):
-        """Returns maze statistics"""
+        """Returns maze statistics, cached until the grid changes"""
+        key = (self.grid.version, self.entrance, self.exit)
+        if self._stats_cache is not None and self._stats_cache[0] == key:
+            return dict(self._stats_cache[1])
+
         safe_path = self._find_safe_path(self.entrance, self.exit)
         has_safe_path = bool(safe_path)
+        counts = cell_counts(self.grid)
 
         stats = {
             'width': self.width,
@@ -310,10 +527,11 @@ class MazeGenerator:
             'entrance': self.entrance,
             'exit': self.exit,
             'total_cells': self.width * self.height,
-            'road_cells': sum(row.count(MazeCell.ROAD) for row in self.maze),
-            'trap_cells': sum(row.count(MazeCell.TRAP) for row in self.maze),
-            'has_treasure': any(MazeCell.TREASURE in row for row in self.maze),
+            'road_cells': counts[ROAD],
+            'trap_cells': counts[TRAP],
+            'has_treasure': counts[TREASURE] > 0,
             'has_safe_path': has_safe_path,
             'safe_path_length': len(safe_path) if safe_path else 0
         }
-        return stats
\ No newline at end of file
+        self._stats_cache = (key, stats)
+        return dict(stats)
\ No newline at end of file
@@ -0,0 +1,256 @@
+"""
+Corridor-compressed graph of a maze for trap-aware searches
+
+Most walkable cells are corridor cells with exactly two walkable
+neighbours. The graph keeps junctions, dead ends and the terminal cells
+(entrance, exit, treasure) as nodes; every corridor between two nodes
+becomes an edge per direction carrying its length and its trap runs: the
+one it starts with, the longest inside and the one it ends with. The safe
+search then walks (node, consecutive traps) states instead of cell states.
+"""
+
+import heapq
+from array import array
+from itertools import compress
+
+from .safe_path import SearchLayout, MAX_TRAPS_IN_ROW, _STATES, _TRAP, _WALKABLE
+
+# Search class -> 1 for walkable cells and traps
+_MASK_TABLE = bytes(1 if kind else 0 for kind in range(256))
+
+# Walkable neighbour count -> 1 unless the cell is a plain corridor cell
+_NODE_TABLE = bytes(0 if count == 2 else 1 for count in range(256))
+
+
+class MazeGraph:
+    """Junctions, dead ends and terminals of a grid joined by corridor edges"""
+
+    def __init__(self, grid, terminals=()):
+        """
+        Initialization of the graph
+
+        Args:
+            grid (MazeGrid): maze to compress
+            terminals (iterable): cells that must be nodes, e.g. the entrance;
+                they may be start-only cells like the entrance itself
+        """
+        self.version = grid.version
+        self.width = grid.width
+        self.height = grid.height
+        layout = self.layout = SearchLayout(grid)
+        classes = layout.classes
+        size = layout.size
+        stride = layout.stride
+
+        # Terminals shape corridors like walkable cells, but keep their class
+        # so that a start-only entrance is never entered
+        self._shape = shape = bytearray(classes)
+        terminals = [layout.index(cell) for cell in terminals if cell is not None]
+        for index in terminals:
+            shape[index] = shape[index] or _WALKABLE
+
+        # Walkable neighbours of every cell from a 0/1 byte mask; the blocked
+        # frame keeps rows from leaking into each other
+        mask = int.from_bytes(bytes(shape).translate(_MASK_TABLE), 'big')
+        limit = (1 << (8 * size)) - 1
+        degree = ((mask << 8) + (mask >> 8) + (mask << (8 * stride)) + (mask >> (8 * stride))) & limit
+        flags = (int.from_bytes(degree.to_bytes(size, 'big').translate(_NODE_TABLE), 'big') & mask)
+        nodes = set(compress(range(size), flags.to_bytes(size, 'big')))
+        nodes.update(terminals)
+
+        self.cells = cells = array('i', sorted(nodes))
+        self.node_of = node_of = array('i', [-1]) * size
+        for k, index in enumerate(cells):
+            node_of[index] = k
+        self.node_count = count = len(cells)
+        self.walkable = bytes(shape).translate(_MASK_TABLE).count(1)
+
+        # Directed edges grouped by source node: edges of node k are
+        # first_edge[k]..first_edge[k + 1] - 1. Trap runs beyond the limit
+        # all mean the same, so they are capped to fit a byte
+        first_edge = array('i', [0]) * (count + 1)
+        target, length, prefix, longest, suffix, start_cell = [], [], [], [], [], []
+        # Node -> walkable non-trap neighbour to step on and back, resetting the run
+        reset = array('i', [-1]) * count
+        walk = self._walk
+        offsets = layout.offsets
+
+        # Corridors are walked once; the walk also yields the opposite edge,
+        # kept here until its source node comes up: (node cell, first step) -> edge
+        opposite = {}
+        for k, index in enumerate(cells):
+            first_edge[k] = len(target)
+            for offset in offsets:
+                step = index + offset
+                if not shape[step]:
+                    continue
+                if reset[k] == -1 and classes[step] == _WALKABLE:
+                    reset[k] = step
+                edge = opposite.pop((index, step), None)
+                if edge is None:
+                    node, steps, leading, inner, trailing, last = walk(index, step)
+                    edge = (node, steps, leading, inner, trailing)
+                    if last != step or cells[node] != index:
+                        opposite[(cells[node], last)] = (k, steps, trailing, inner, leading)
+                if not classes[cells[edge[0]]]:
+                    continue  # start-only cell
+                target.append(edge[0])
+                length.append(edge[1])
+                prefix.append(edge[2])
+                longest.append(edge[3])
+                suffix.append(edge[4])
+                start_cell.append(step)
+        first_edge[count] = len(target)
+
+        self.first_edge = first_edge
+        self.target = array('i', target)
+        self.length = array('i', length)
+        self.prefix = bytes(prefix)
+        self.longest = bytes(longest)
+        self.suffix = bytes(suffix)
+        self.start_cell = array('i', start_cell)
+        self.reset = reset
+        self.trap = bytes(classes[index] == _TRAP for index in cells)
+        self.edge_count = len(target)
+
+    def _walk(self, index, step, cells=None):
+        """
+        Follows a corridor from node cell index through step to the next node
+
+        Returns (target node, length, leading traps, longest trap run,
+        trailing traps, cell before the target); trap runs are capped one
+        above the limit.
+        """
+        classes = self.layout.classes
+        shape = self._shape
+        offsets = self.layout.offsets
+        node_of = self.node_of
+        previous, current = index, step
+        length = prefix = longest = run = 0
+        leading = True
+        while node_of[current] == -1:
+            if cells is not None:
+                cells.append(current)
+            length += 1
+            if classes[current] == _TRAP:
+                run += 1
+                longest = max(longest, run)
+                if leading:
+                    prefix += 1
+            else:
+                run = 0
+                leading = False
+            for offset in offsets:
+                following = current + offset
+                if following != previous and shape[following]:
+                    break
+            previous, current = current, following
+        cap = MAX_TRAPS_IN_ROW + 1
+        return (node_of[current], length + 1, min(prefix, cap), min(longest, cap),
+                min(run, cap), previous)
+
+    def node(self, cell):
+        """Node id of a cell, -1 when it is a corridor cell or blocked"""
+        x, y = cell
+        if not (0 <= x < self.height and 0 <= y < self.width):
+            return -1
+        return self.node_of[self.layout.index(cell)]
+
+    def safe_paths(self, start, goals, stats=None):
+        """
+        Shortest safe paths from start to every goal, all of them nodes
+
+        Dijkstra over node * 3 + consecutive_traps states. A trap node
+        reached with the maximum run may step on a neighbouring road cell
+        and back, which costs two steps and leaves a run of one.
+        Returns {goal: path} like safe_search(), the number of settled
+        states is stored in stats['visited'] if given.
+        """
+        first = self.node(start) * _STATES
+        targets = {self.node(goal): goal for goal in goals}
+        if first < 0 or -1 in targets:
+            raise ValueError("start and goals must be graph nodes")
+
+        size = self.node_count * _STATES
+        distances = array('i', [-1]) * size
+        parents = array('i', [-1]) * size
+        # Edge that led to a state, -1 for the start and -2 for a reset step
+        edges = array('i', [-1]) * size
+        distances[first] = 0
+        parents[first] = first
+
+        trap = self.trap
+        first_edge = self.first_edge
+        target, length = self.target, self.length
+        prefix, longest, suffix = self.prefix, self.longest, self.suffix
+        reset = self.reset
+        found = {}
+        remaining = len(targets)
+        visited = 0
+        heap = [(0, first)]
+        while heap and remaining:
+            distance, state = heapq.heappop(heap)
+            if distance != distances[state]:
+                continue
+            visited += 1
+            node, traps = divmod(state, _STATES)
+            if node in targets and node not in found:
+                found[node] = state
+                remaining -= 1
+
+            moves = []
+            if traps == MAX_TRAPS_IN_ROW and reset[node] != -1:
+                moves.append((node * _STATES + 1, distance + 2, -2))
+            for edge in range(first_edge[node], first_edge[node + 1]):
+                inner = length[edge] - 1
+                if prefix[edge] == inner:
+                    # Only traps inside, the run just goes on
+                    run = traps + inner
+                elif traps + prefix[edge] > MAX_TRAPS_IN_ROW or longest[edge] > MAX_TRAPS_IN_ROW:
+                    continue
+                else:
+                    run = suffix[edge]
+                if run > MAX_TRAPS_IN_ROW:
+                    continue
+                following = target[edge]
+                if trap[following]:
+                    run += 1
+                    if run > MAX_TRAPS_IN_ROW:
+                        continue
+                else:
+                    run = 0
+                moves.append((following * _STATES + run, distance + length[edge], edge))
+
+            for next_state, next_distance, edge in moves:
+                known = distances[next_state]
+                if known == -1 or next_distance < known:
+                    distances[next_state] = next_distance
+                    parents[next_state] = state
+                    edges[next_state] = edge
+                    heapq.heappush(heap, (next_distance, next_state))
+
+        if stats is not None:
+            stats['visited'] = visited
+        paths = {}
+        for node, goal in targets.items():
+            state = found.get(node)
+            paths[goal] = self._path(parents, edges, state) if state is not None else []
+        return paths
+
+    def _path(self, parents, edges, state):
+        """Cells from the start state to the given state, corridors expanded"""
+        layout = self.layout
+        steps = []
+        while parents[state] != state:
+            steps.append((parents[state], edges[state]))
+            state = parents[state]
+        indexes = [self.cells[state // _STATES]]
+        for parent, edge in reversed(steps):
+            node = parent // _STATES
+            if edge == -2:
+                indexes.append(self.reset[node])
+                indexes.append(self.cells[node])
+            else:
+                self._walk(self.cells[node], self.start_cell[edge], indexes)
+                indexes.append(self.cells[self.target[edge]])
+        return [layout.cell(index) for index in indexes]
@@ -0,0 +1,256 @@
+"""
+Compact storage for the maze grid
+
+Cells are kept in one flat buffer (one byte per cell, row stride = width)
+holding the integer codes of MazeCell. Row views keep the old
+maze[i][j] interface working on top of it.
+"""
+
+import sys
+from .maze_cell import MazeCell
+
+# Plain integer cell codes, used by the hot loops instead of Enum members
+WALL = MazeCell.WALL.value
+ROAD = MazeCell.ROAD.value
+ENTRANCE = MazeCell.ENTRANCE.value
+EXIT = MazeCell.EXIT.value
+TRAP = MazeCell.TRAP.value
+TREASURE = MazeCell.TREASURE.value
+
+# Code -> MazeCell lookup
+CELLS = tuple(MazeCell)
+
+
+class GridRow:
+    """Row view over the flat buffer, behaves like a list of MazeCell"""
+
+    __slots__ = ('_grid', '_index', '_offset')
+
+    def __init__(self, grid, index):
+        self._grid = grid
+        self._index = index
+        self._offset = index * grid.stride
+
+    def __len__(self):
+        return self._grid.width
+
+    def _position(self, j):
+        width = self._grid.width
+        if j < 0:
+            j += width
+        if not 0 <= j < width:
+            raise IndexError("row index out of range")
+        return self._offset + j
+
+    def __getitem__(self, j):
+        if isinstance(j, slice):
+            return [CELLS[code] for code in self._codes()[j]]
+        return CELLS[self._grid.cells[self._position(j)]]
+
+    def __setitem__(self, j, value):
+        self._grid.cells[self._position(j)] = int(value)
+        self._grid.version += 1
+
+    def _codes(self):
+        return self._grid.row_codes(self._index)
+
+    def __iter__(self):
+        return map(CELLS.__getitem__, self._codes())
+
+    def __contains__(self, value):
+        return self.count(value) > 0
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def count(self, value):
+        """Number of cells of the given type in the row"""
+        return self._codes().count(int(value))
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class MazeGrid:
+    """Flat bytearray-backed maze grid"""
+
+    backend = 'bytearray'
+
+    def __init__(self, width, height, fill=WALL):
+        """
+        Initialization of the grid
+
+        Args:
+            width (int)
+            height (int)
+            fill (int): initial cell code
+        """
+        self.width = width
+        self.height = height
+        self.stride = width
+        self.cells = self._allocate(width * height, int(fill))
+        # Incremented on every mutation, used to invalidate cached results
+        self.version = 0
+
+    def _allocate(self, size, fill):
+        return bytearray([fill]) * size
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Builds a grid from a list of lists of cells"""
+        height = len(rows)
+        width = len(rows[0]) if height else 0
+        grid = cls(width, height)
+        for i, row in enumerate(rows):
+            offset = i * grid.stride
+            for j, cell in enumerate(row):
+                grid.cells[offset + j] = int(cell)
+        return grid
+
+    def index(self, x, y):
+        """Flat buffer index of the cell (x, y)"""
+        return x * self.stride + y
+
+    def get(self, x, y):
+        """Integer code of the cell (x, y)"""
+        return self.cells[x * self.stride + y]
+
+    def set(self, x, y, code):
+        """Sets the cell (x, y) to the given code"""
+        self.cells[x * self.stride + y] = int(code)
+        self.version += 1
+
+    def touch(self):
+        """Marks the grid as changed after direct writes to the buffer"""
+        self.version += 1
+
+    def reset(self, fill=WALL):
+        """Fills the whole grid with one cell type"""
+        self.cells = self._allocate(self.width * self.height, int(fill))
+        self.version += 1
+
+    def count(self, code):
+        """Number of cells with the given code"""
+        return self.cells.count(int(code))
+
+    def find(self, code):
+        """Position of the first cell with the given code, or None"""
+        index = self.cells.find(int(code))
+        if index < 0:
+            return None
+        return divmod(index, self.stride)
+
+    def to_bytes(self):
+        """Raw cell codes, one byte per cell, row by row"""
+        return bytes(self.cells)
+
+    def load_bytes(self, data):
+        """Replaces all cells with raw codes produced by to_bytes()"""
+        if len(data) != self.width * self.height:
+            raise ValueError("cell data does not match the grid size")
+        self.cells[:] = data
+        self.version += 1
+
+    def to_rows(self):
+        """Converts the grid into a list of lists of MazeCell"""
+        return [list(row) for row in self]
+
+    def row_codes(self, i):
+        """Integer codes of the row i as bytes"""
+        offset = i * self.stride
+        return bytes(self.cells[offset:offset + self.width])
+
+    def region(self, top, left, bottom, right):
+        """Cell codes of rows top..bottom-1 and columns left..right-1"""
+        # Windows outside the grid or inverted ones give empty rows
+        top = max(0, min(self.height, top))
+        bottom = max(top, min(self.height, bottom))
+        left = max(0, min(self.width, left))
+        right = max(left, min(self.width, right))
+        cells = self.cells
+        stride = self.stride
+        return [bytes(cells[i * stride + left:i * stride + right]) for i in range(top, bottom)]
+
+    @property
+    def nbytes(self):
+        """Memory used by the cell buffer"""
+        return sys.getsizeof(self.cells)
+
+    @property
+    def bytes_per_cell(self):
+        """Average memory per cell"""
+        return self.nbytes / max(1, self.width * self.height)
+
+    def __len__(self):
+        return self.height
+
+    def __bool__(self):
+        return self.height > 0 and self.width > 0
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [GridRow(self, k) for k in range(self.height)[i]]
+        if i < 0:
+            i += self.height
+        if not 0 <= i < self.height:
+            raise IndexError("grid index out of range")
+        return GridRow(self, i)
+
+    def __iter__(self):
+        return (GridRow(self, i) for i in range(self.height))
+
+    def __eq__(self, other):
+        if isinstance(other, MazeGrid):
+            return (self.width, self.height) == (other.width, other.height) and \
+                self.to_bytes() == other.to_bytes()
+        return self.to_rows() == [list(row) for row in other]
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.width}x{self.height})"
+
+
+class NumpyMazeGrid(MazeGrid):
+    """NumPy uint8-backed maze grid"""
+
+    backend = 'numpy'
+
+    def _allocate(self, size, fill):
+        import numpy
+        return numpy.full(size, fill, dtype=numpy.uint8)
+
+    def count(self, code):
+        return int((self.cells == int(code)).sum())
+
+    def find(self, code):
+        import numpy
+        found = numpy.flatnonzero(self.cells == int(code))
+        if not len(found):
+            return None
+        return divmod(int(found[0]), self.stride)
+
+    def row_codes(self, i):
+        offset = i * self.stride
+        return self.cells[offset:offset + self.width].tobytes()
+
+    def load_bytes(self, data):
+        import numpy
+        super().load_bytes(numpy.frombuffer(bytes(data), dtype=numpy.uint8))
+
+    @property
+    def nbytes(self):
+        return int(self.cells.nbytes)
+
+
+GRID_BACKENDS = {
+    'bytearray': MazeGrid,
+    'numpy': NumpyMazeGrid,
+}
+
+
+def create_grid(width, height, backend='bytearray', fill=WALL):
+    """Creates a grid with the requested storage backend"""
+    try:
+        grid_class = GRID_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown grid backend: {backend!r}") from None
+    return grid_class(width, height, fill)
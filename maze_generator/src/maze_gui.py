@@ -2,9 +2,27 @@
 Graphical interface for maze generator
 """
 
+import queue
+import threading
+import time
 import tkinter as tk
-from tkinter import ttk
-from .maze_generator import MazeGenerator, MazeCell
+from tkinter import filedialog, ttk
+from .maze_generator import MazeGenerator, GenerationCancelled
+from .maze_grid import MazeGrid
+from .maze_io import MazeFile
+from .maze_viewport import LodPyramid, MazeViewport
+
+# Milliseconds between two checks of the worker queue
+POLL_INTERVAL = 50
+
+VIEW_WIDTH, VIEW_HEIGHT = 500, 400
+MINIMAP_WIDTH, MINIMAP_HEIGHT = 160, 120
+
+PHASE_NAMES = {
+    'carve': "Carving",
+    'traps': "Traps",
+    'validate': "Validation",
+}
 
 
 class MazeApp:
@@ -13,6 +31,14 @@ class MazeApp:
         self.root = root
         self.root.title("maze generator")
         self.maze = None
+        self.maze_file = None
+        self.pyramid = None
+        self.render_time = 0.0
+        self.drag_start = None
+        # Background generation: worker thread, its messages and cancel flag
+        self.worker = None
+        self.messages = queue.Queue()
+        self.cancel_event = threading.Event()
 
         self.create_widgets()
 
@@ -24,13 +50,13 @@ class MazeApp:
 
         ttk.Label(control_frame, text="width:").grid(row=0, column=0, padx=5)
         self.width_var = tk.IntVar(value=21)
-        self.width_spin = ttk.Spinbox(control_frame, from_=5, to=101, width=5,
+        self.width_spin = ttk.Spinbox(control_frame, from_=5, to=10001, width=6,
                                       textvariable=self.width_var)
         self.width_spin.grid(row=0, column=1, padx=5)
 
         ttk.Label(control_frame, text="high:").grid(row=0, column=2, padx=5)
         self.height_var = tk.IntVar(value=15)
-        self.height_spin = ttk.Spinbox(control_frame, from_=5, to=101, width=5,
+        self.height_spin = ttk.Spinbox(control_frame, from_=5, to=10001, width=6,
                                        textvariable=self.height_var)
         self.height_spin.grid(row=0, column=3, padx=5)
 
@@ -38,72 +64,256 @@ class MazeApp:
                                        command=self.generate_maze)
         self.generate_btn.grid(row=0, column=4, padx=10)
 
-        self.canvas = tk.Canvas(self.root, bg="white", width=500, height=400)
+        self.cancel_btn = ttk.Button(control_frame, text="Cancel",
+                                     command=self.cancel_generation, state="disabled")
+        self.cancel_btn.grid(row=0, column=5, padx=5)
+
+        self.open_btn = ttk.Button(control_frame, text="Open...", command=self.open_file)
+        self.open_btn.grid(row=0, column=6, padx=5)
+
+        ttk.Button(control_frame, text="+", width=3,
+                   command=lambda: self.zoom(1)).grid(row=0, column=7)
+        ttk.Button(control_frame, text="-", width=3,
+                   command=lambda: self.zoom(-1)).grid(row=0, column=8)
+        ttk.Button(control_frame, text="Fit", width=4,
+                   command=self.fit_view).grid(row=0, column=9, padx=5)
+
+        # Main view: one image, only the visible window of the maze is drawn
+        self.canvas = tk.Canvas(self.root, bg="white", width=VIEW_WIDTH, height=VIEW_HEIGHT)
         self.canvas.grid(row=1, column=0, padx=10, pady=10)
+        self.image = tk.PhotoImage(master=self.root, width=VIEW_WIDTH, height=VIEW_HEIGHT)
+        self.canvas.create_image(0, 0, image=self.image, anchor="nw")
+        self.viewport = MazeViewport(self.image, VIEW_WIDTH, VIEW_HEIGHT)
+
+        self.canvas.bind("<ButtonPress-1>", self.start_drag)
+        self.canvas.bind("<B1-Motion>", self.drag)
+        self.canvas.bind("<MouseWheel>", self.wheel)
+        self.canvas.bind("<Button-4>", lambda event: self.zoom(1, (event.x, event.y)))
+        self.canvas.bind("<Button-5>", lambda event: self.zoom(-1, (event.x, event.y)))
+
+        # Overview of the whole maze, click to move the main view
+        self.minimap = tk.Canvas(self.root, bg="white", width=MINIMAP_WIDTH,
+                                 height=MINIMAP_HEIGHT)
+        self.minimap.grid(row=1, column=1, padx=10, pady=10, sticky="n")
+        self.minimap_image = tk.PhotoImage(master=self.root, width=MINIMAP_WIDTH,
+                                           height=MINIMAP_HEIGHT)
+        self.minimap.create_image(0, 0, image=self.minimap_image, anchor="nw")
+        self.minimap_view = MazeViewport(self.minimap_image, MINIMAP_WIDTH, MINIMAP_HEIGHT)
+        self.minimap.bind("<ButtonPress-1>", self.minimap_click)
+        self.minimap.bind("<B1-Motion>", self.minimap_click)
 
         # Statistic
         self.stats_label = ttk.Label(self.root, text="", padding="5")
-        self.stats_label.grid(row=2, column=0)
+        self.stats_label.grid(row=2, column=0, columnspan=2)
 
     def generate_maze(self):
-        """Generation of a new maze"""
+        """Starts generating a new maze on a worker thread"""
+        if self.worker is not None:
+            return
         width = self.width_var.get()
         height = self.height_var.get()
 
-        generator = MazeGenerator(width, height)
-        generator.generate()
-        self.maze = generator.maze
+        # Every run gets its own queue and event, so messages from a
+        # cancelled run that is still winding down are never mixed in
+        self.messages = queue.Queue()
+        self.cancel_event = threading.Event()
+        generator = MazeGenerator(width, height, progress=self._progress_callback(),
+                                  cancel=self.cancel_event)
+        self.worker = threading.Thread(target=self._run_generation,
+                                       args=(generator, self.messages), daemon=True)
+
+        self.generate_btn.config(state="disabled")
+        self.open_btn.config(state="disabled")
+        self.cancel_btn.config(state="normal")
+        self.stats_label.config(text="Generating...")
+        self.worker.start()
+        self.root.after(POLL_INTERVAL, self.poll_worker)
+
+    def open_file(self):
+        """Shows a maze saved with MazeGenerator.save(), reading only what is visible"""
+        if self.worker is not None:
+            return
+        path = filedialog.askopenfilename(filetypes=[("Maze files", "*.maze"), ("All files", "*")])
+        if not path:
+            return
+
+        self.messages = queue.Queue()
+        self.worker = threading.Thread(target=self._run_loading,
+                                       args=(path, self.messages), daemon=True)
+        self.generate_btn.config(state="disabled")
+        self.open_btn.config(state="disabled")
+        self.stats_label.config(text="Loading...")
+        self.worker.start()
+        self.root.after(POLL_INTERVAL, self.poll_worker)
+
+    def _progress_callback(self):
+        messages = self.messages
+
+        def progress(phase, done, total):
+            messages.put(('progress', phase, done, total))
+
+        return progress
+
+    @staticmethod
+    def _run_generation(generator, messages):
+        """Worker thread body, never touches tkinter"""
+        try:
+            generator.generate()
+            stats = generator.get_stats()
+        except GenerationCancelled:
+            messages.put(('cancelled',))
+        except Exception as error:
+            messages.put(('error', error))
+        else:
+            messages.put(('done', generator, stats, MazeApp._overview(generator.grid)))
 
-        self.draw_maze()
-        self.show_stats(generator)
+    @staticmethod
+    def _run_loading(path, messages):
+        """Worker thread body for opening a maze file"""
+        try:
+            maze_file = MazeFile(path)
+            pyramid = MazeApp._overview(maze_file)
+        except (OSError, ValueError) as error:
+            messages.put(('error', error))
+        else:
+            messages.put(('loaded', maze_file, pyramid))
 
-    def draw_maze(self):
-        """Displaying a maze on canvas"""
-        if not self.maze:
+    @staticmethod
+    def _overview(source):
+        """Pyramid with the minimap level already built"""
+        pyramid = LodPyramid(source)
+        pyramid.prefetch(pyramid.overview_level(MINIMAP_WIDTH, MINIMAP_HEIGHT))
+        return pyramid
+
+    def cancel_generation(self):
+        """Asks the running generation to stop"""
+        if self.worker is not None:
+            self.cancel_event.set()
+            self.cancel_btn.config(state="disabled")
+            self.stats_label.config(text="Cancelling...")
+
+    def poll_worker(self):
+        """Handles worker messages on the Tk thread"""
+        progress = None
+        finished = None
+        while True:
+            try:
+                message = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            if message[0] == 'progress':
+                progress = message
+            else:
+                finished = message
+
+        if finished is None:
+            if progress is not None and not self.cancel_event.is_set():
+                _, phase, done, total = progress
+                percent = 100 * done // total if total else 100
+                self.stats_label.config(text=f"{PHASE_NAMES[phase]}: {percent}%")
+            self.root.after(POLL_INTERVAL, self.poll_worker)
+            return
+
+        self.worker = None
+        self.generate_btn.config(state="normal")
+        self.open_btn.config(state="normal")
+        self.cancel_btn.config(state="disabled")
+        if finished[0] == 'cancelled':
+            self.stats_label.config(text="Generation cancelled")
+        elif finished[0] == 'error':
+            self.stats_label.config(text=f"Failed: {finished[1]}")
+        elif finished[0] == 'loaded':
+            _, maze_file, pyramid = finished
+            self._close_file()
+            self.maze_file = maze_file
+            self.maze = None
+            self.draw_maze(pyramid)
+            self.stats_label.config(text=(
+                f"Size: {maze_file.width}x{maze_file.height} | "
+                f"Entrance: {maze_file.entrance} | Exit: {maze_file.exit} | "
+                f"Render: {self.render_time * 1000:.0f} ms"))
+        else:
+            _, generator, stats, pyramid = finished
+            self._close_file()
+            self.maze = generator.maze
+            self.draw_maze(pyramid)
+            self.show_stats(generator, stats)
+
+    def _close_file(self):
+        if self.maze_file is not None:
+            self.maze_file.close()
+            self.maze_file = None
+
+    def draw_maze(self, pyramid=None):
+        """Displaying a maze on canvas, fitted into the view"""
+        if pyramid is None:
+            if not self.maze:
+                return
+            grid = self.maze if isinstance(self.maze, MazeGrid) else MazeGrid.from_rows(self.maze)
+            pyramid = LodPyramid(grid)
+        self.pyramid = pyramid
+        self.viewport.show(pyramid)
+        self.minimap_view.show(pyramid)
+        self.minimap_view.render()
+        self.redraw()
+
+    def redraw(self):
+        """Draws the visible window, its letters and the minimap frame"""
+        if self.pyramid is None:
+            return
+        started = time.perf_counter()
+        self.viewport.render()
+
+        self.canvas.delete("label")
+        for x, y, text, font_size in self.viewport.labels():
+            self.canvas.create_text(x, y, text=text, font=("Arial", font_size, "bold"),
+                                    tags="label")
+
+        top, left, bottom, right = self.viewport.visible()
+        x1, y1 = self.minimap_view.to_pixel(top, left)
+        x2, y2 = self.minimap_view.to_pixel(bottom, right)
+        self.minimap.delete("frame")
+        self.minimap.create_rectangle(x1, y1, x2, y2, outline="red", tags="frame")
+
+        self.render_time = time.perf_counter() - started
+
+    def zoom(self, steps, anchor=None):
+        if self.pyramid is not None:
+            self.viewport.zoom(steps, anchor)
+            self.redraw()
+
+    def fit_view(self):
+        if self.pyramid is not None:
+            self.viewport.fit()
+            self.redraw()
+
+    def wheel(self, event):
+        self.zoom(1 if event.delta > 0 else -1, (event.x, event.y))
+
+    def start_drag(self, event):
+        self.drag_start = (event.x, event.y)
+
+    def drag(self, event):
+        if self.pyramid is None or self.drag_start is None:
             return
+        self.viewport.pan(event.x - self.drag_start[0], event.y - self.drag_start[1])
+        self.drag_start = (event.x, event.y)
+        self.redraw()
+
+    def minimap_click(self, event):
+        """Centres the main view on the clicked part of the overview"""
+        if self.pyramid is not None:
+            self.viewport.center_on(*self.minimap_view.to_cell(event.x, event.y))
+            self.redraw()
 
-        self.canvas.delete("all")
-
-        cell_size = min(500 // len(self.maze[0]), 400 // len(self.maze))
-
-        colors = {
-            MazeCell.WALL: "black",
-            MazeCell.ROAD: "white",
-            MazeCell.ENTRANCE: "green",
-            MazeCell.EXIT: "red",
-            MazeCell.TRAP: "yellow",
-            MazeCell.TREASURE: "blue"
-        }
-
-        for i, row in enumerate(self.maze):
-            for j, cell in enumerate(row):
-                x1 = j * cell_size
-                y1 = i * cell_size
-                x2 = x1 + cell_size
-                y2 = y1 + cell_size
-
-                self.canvas.create_rectangle(x1, y1, x2, y2,
-                                             fill=colors[cell],
-                                             outline="gray",
-                                             width=1)
-
-                if cell == MazeCell.ENTRANCE:
-                    self.canvas.create_text(x1 + cell_size // 2, y1 + cell_size // 2,
-                                            text="E", font=("Arial", 10, "bold"))
-                elif cell == MazeCell.EXIT:
-                    self.canvas.create_text(x1 + cell_size // 2, y1 + cell_size // 2,
-                                            text="X", font=("Arial", 10, "bold"))
-                elif cell == MazeCell.TRAP:
-                    self.canvas.create_text(x1 + cell_size // 2, y1 + cell_size // 2,
-                                            text="T", font=("Arial", 8, "bold"))
-                elif cell == MazeCell.TREASURE:
-                    self.canvas.create_text(x1 + cell_size // 2, y1 + cell_size // 2,
-                                            text="$", font=("Arial", 10, "bold"))
-
-    def show_stats(self, generator):
+    def show_stats(self, generator, stats=None):
         """Displaying maze statistics"""
-        stats = generator.get_stats()
+        if stats is None:
+            stats = generator.get_stats()
+        phases = " | ".join(f"{PHASE_NAMES[phase]}: {seconds * 1000:.0f} ms"
+                            for phase, seconds in generator.phase_times.items())
         stats_text = (f"Size: {stats['width']}x{stats['height']} | "
                       f"Entrance: {stats['entrance']} | Exit: {stats['exit']} | "
-                      f"Traps: {stats['trap_cells']} | Treasure: {'Так' if stats['has_treasure'] else 'Ні'}")
+                      f"Traps: {stats['trap_cells']} | Treasure: {'Так' if stats['has_treasure'] else 'Ні'}\n"
+                      f"{phases} | Render: {self.render_time * 1000:.0f} ms")
         self.stats_label.config(text=stats_text)
\ No newline at end of file
@@ -0,0 +1,207 @@
+"""
+Binary maze file format with memory-mapped loading
+
+Layout (little endian):
+    header   magic b'MAZB', format version, bits per cell, flags,
+             width, height, entrance, exit, seed, metadata length
+    metadata UTF-8 JSON object
+    cells    4-bit packed codes, two cells per byte (high nibble first),
+             every row padded to a whole number of bytes
+"""
+
+import json
+import mmap
+import struct
+
+from .maze_export import ascii_bytes
+from .maze_generator import MazeGenerator
+
+MAGIC = b'MAZB'
+FORMAT_VERSION = 1
+BITS_PER_CELL = 4
+
+HEADER = struct.Struct('<4sHBBIIiiiiqI')
+
+FLAG_SEED = 1
+
+# Nibble tables for packing and unpacking with bytes.translate
+_SHIFT_HIGH = bytes((value << 4) & 0xFF for value in range(256))
+_HIGH = bytes(value >> 4 for value in range(256))
+_LOW = bytes(value & 0x0F for value in range(256))
+
+
+def row_nbytes(width):
+    """Bytes used by one packed row"""
+    return (width + 1) // 2
+
+
+def pack_row(codes):
+    """Packs a row of cell codes into 4-bit pairs"""
+    if len(codes) % 2:
+        codes = bytes(codes) + b'\x00'
+    high = bytes(codes[0::2]).translate(_SHIFT_HIGH)
+    low = bytes(codes[1::2])
+    size = len(low)
+    value = int.from_bytes(high, 'big') | int.from_bytes(low, 'big')
+    return value.to_bytes(size, 'big')
+
+
+def unpack_row(packed, width):
+    """Unpacks 4-bit pairs into a row of cell codes"""
+    packed = bytes(packed)
+    codes = bytearray(len(packed) * 2)
+    codes[0::2] = packed.translate(_HIGH)
+    codes[1::2] = packed.translate(_LOW)
+    return bytes(codes[:width])
+
+
+def save_maze(generator, path, metadata=None):
+    """Writes the maze to a binary file (path or binary file object)"""
+    if hasattr(path, 'write'):
+        _write(generator, path, metadata)
+    else:
+        with open(path, 'wb') as fp:
+            _write(generator, fp, metadata)
+
+
+def write_header(fp, width, height, entrance, exit_, seed=None, metadata=None):
+    """Writes the file header and metadata, packed rows must follow"""
+    flags = 0
+    if isinstance(seed, int) and -2 ** 63 <= seed < 2 ** 63:
+        flags |= FLAG_SEED
+    else:
+        seed = 0
+    entrance = entrance or (-1, -1)
+    exit_ = exit_ or (-1, -1)
+    meta = json.dumps(metadata or {}, sort_keys=True).encode('utf-8')
+
+    fp.write(HEADER.pack(MAGIC, FORMAT_VERSION, BITS_PER_CELL, flags, width, height,
+                         entrance[0], entrance[1], exit_[0], exit_[1], seed, len(meta)))
+    fp.write(meta)
+
+
+def _write(generator, fp, metadata):
+    write_header(fp, generator.width, generator.height, generator.entrance,
+                 generator.exit, generator.seed, metadata)
+
+    # Rows are written in chunks instead of building one large buffer
+    grid = generator.grid
+    chunk = []
+    for i in range(generator.height):
+        chunk.append(pack_row(grid.row_codes(i)))
+        if len(chunk) >= 256:
+            fp.write(b''.join(chunk))
+            chunk = []
+    fp.write(b''.join(chunk))
+
+
+def load_maze(path, backend='bytearray'):
+    """Reads a whole maze file into a MazeGenerator"""
+    with MazeFile(path) as maze_file:
+        return maze_file.to_generator(backend)
+
+
+class MazeFile:
+    """Memory-mapped maze file, rows are decoded only when they are read"""
+
+    def __init__(self, path):
+        self._fp = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._fp.close()
+            raise ValueError(f"{path} is not a maze file") from None
+        try:
+            self._read_header()
+        except ValueError:
+            self.close()
+            raise
+
+    def _read_header(self):
+        if len(self._map) < HEADER.size:
+            raise ValueError("maze file is truncated")
+        (magic, version, bits, flags, width, height, ex, ey, xx, xy,
+         seed, meta_size) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError("not a maze file")
+        if version != FORMAT_VERSION or bits != BITS_PER_CELL:
+            raise ValueError(f"unsupported maze file version {version}")
+
+        self.width = width
+        self.height = height
+        self.entrance = (ex, ey) if ex >= 0 else None
+        self.exit = (xx, xy) if xx >= 0 else None
+        self.seed = seed if flags & FLAG_SEED else None
+        meta_start = HEADER.size
+        self.metadata = json.loads(self._map[meta_start:meta_start + meta_size].decode('utf-8'))
+        self._offset = meta_start + meta_size
+        self._row_size = row_nbytes(width)
+        if len(self._map) < self._offset + self._row_size * height:
+            raise ValueError("maze file is truncated")
+
+    def row(self, i):
+        """Cell codes of row i"""
+        if not 0 <= i < self.height:
+            raise IndexError("row index out of range")
+        start = self._offset + i * self._row_size
+        return unpack_row(self._map[start:start + self._row_size], self.width)
+
+    def region(self, top, left, bottom, right):
+        """Cell codes of rows top..bottom-1 and columns left..right-1"""
+        # Windows outside the grid or inverted ones give empty rows
+        top = max(0, min(self.height, top))
+        bottom = max(top, min(self.height, bottom))
+        left = max(0, min(self.width, left))
+        right = max(left, min(self.width, right))
+        first_byte = left // 2
+        last_byte = (right + 1) // 2
+        skip = left - first_byte * 2
+        rows = []
+        for i in range(top, bottom):
+            start = self._offset + i * self._row_size
+            packed = self._map[start + first_byte:start + last_byte]
+            rows.append(unpack_row(packed, skip + right - left)[skip:])
+        return rows
+
+    def iter_rows(self):
+        """Yields the cell codes of every row"""
+        for i in range(self.height):
+            yield self.row(i)
+
+    def to_generator(self, backend='bytearray'):
+        """Decodes the whole file into a MazeGenerator"""
+        generator = MazeGenerator(self.width, self.height, backend=backend, seed=self.seed)
+        generator.grid.load_bytes(b''.join(self.iter_rows()))
+        generator.entrance = self.entrance
+        generator.exit = self.exit
+        return generator
+
+    def close(self):
+        self._map.close()
+        self._fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def iter_ascii(source):
+    """Yields ASCII lines of a MazeGenerator or MazeFile one row at a time"""
+    if isinstance(source, MazeFile):
+        rows = source.iter_rows()
+    else:
+        rows = (source.grid.row_codes(i) for i in range(source.height))
+    for codes in rows:
+        yield ascii_bytes(codes).decode('utf-8')
+
+
+def write_ascii(source, fp):
+    """Streams the ASCII representation into a text file object"""
+    first = True
+    for line in iter_ascii(source):
+        if not first:
+            fp.write('\n')
+        fp.write(line)
+        first = False
@@ -0,0 +1,303 @@
+"""
+Pool of pre-generated mazes for low-latency serving
+"""
+
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .maze_batch import generate_one
+from .maze_generator import MazeGenerator
+from .maze_io import load_maze
+
+
+class MazePool:
+    """
+    Keeps ready mazes per (width, height, parameters) key
+
+    get() takes a maze from the key's deque and schedules a replacement,
+    which background threads generate. When the mazes in memory exceed
+    the budget, keys that were not asked for recently lose mazes first;
+    with a spill directory those mazes are written to disk and served
+    from there before anything is generated in the caller's thread.
+    """
+
+    def __init__(self, size=4, workers=1, memory_budget=None, spill_dir=None,
+                 processes=False):
+        """
+        Initialization of the pool
+
+        Args:
+            size (int): ready mazes kept per key
+            workers (int): background refill threads
+            memory_budget (int): bytes of grid data kept in memory, unlimited by default
+            spill_dir (str): directory for evicted mazes; True uses a temporary
+                directory, None drops evicted mazes
+            processes (bool): generate in worker processes instead of the
+                refill threads themselves
+        """
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self.size = size
+        self.memory_budget = memory_budget
+        self._own_spill_dir = spill_dir is True
+        self.spill_dir = tempfile.mkdtemp(prefix='maze_pool_') if spill_dir is True else spill_dir
+        if self.spill_dir is not None:
+            os.makedirs(self.spill_dir, exist_ok=True)
+
+        # key -> deque of ready generators; order of keys is least recently used first
+        self._ready = OrderedDict()
+        self._spilled = {}
+        self._pending = {}
+        # key -> evicted mazes still being written to the spill directory
+        self._spilling = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._spill_count = 0
+
+        self.counters = dict.fromkeys(
+            ('hits', 'disk_hits', 'misses', 'refills', 'evicted', 'spilled', 'errors'), 0)
+        self._lag_total = 0.0
+        self._lag_max = 0.0
+
+        self._executor = ProcessPoolExecutor(max_workers=workers) if processes else None
+        self._tasks = queue.Queue()
+        self._closed = False
+        self._threads = [threading.Thread(target=self._worker, daemon=True)
+                         for _ in range(max(1, workers))]
+        for thread in self._threads:
+            thread.start()
+
+    @staticmethod
+    def key(width, height, params):
+        """
+        Pool key of a request; sizes are made odd like MazeGenerator does
+
+        None for unhashable parameter values, such requests bypass the pool.
+        """
+        if 'seed' in params or 'rng' in params:
+            raise ValueError("pooled mazes are random, seed and rng are not supported")
+        width = width if width % 2 == 1 else width + 1
+        height = height if height % 2 == 1 else height + 1
+        key = width, height, tuple(sorted(params.items()))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def get(self, width, height, **params):
+        """
+        A finished maze for the request
+
+        Served from memory, then from the spill directory, and generated
+        in the calling thread only when the pool has nothing ready.
+        """
+        key = self.key(width, height, params)
+        if key is None:
+            with self._lock:
+                self.counters['misses'] += 1
+            generator = MazeGenerator(width, height, **params)
+            generator.generate()
+            return generator
+        with self._lock:
+            ready = self._ready.get(key)
+            if ready:
+                generator = ready.popleft()
+                self._bytes -= generator.grid.nbytes
+                self._ready.move_to_end(key)
+                self.counters['hits'] += 1
+                self._top_up(key)
+                return generator
+            spilled = self._spilled.get(key)
+            path = spilled.popleft() if spilled else None
+            self.counters['disk_hits' if path else 'misses'] += 1
+            if key not in self._ready:
+                self._ready[key] = deque()
+            self._ready.move_to_end(key)
+            self._top_up(key)
+
+        if path is not None:
+            generator = load_maze(path, params.get('backend', 'bytearray'))
+            os.remove(path)
+            return generator
+        generator = MazeGenerator(key[0], key[1], **params)
+        generator.generate()
+        return generator
+
+    def warm(self, width, height, wait=False, **params):
+        """Schedules mazes for a key up to the pool size, optionally waits for them"""
+        key = self.key(width, height, params)
+        if key is None:
+            return
+        with self._lock:
+            if key not in self._ready:
+                self._ready[key] = deque()
+            self._top_up(key)
+        if wait:
+            self.join()
+
+    def join(self):
+        """Blocks until every scheduled refill is finished"""
+        self._tasks.join()
+
+    def _top_up(self, key):
+        """Schedules refills so that ready, spilled and in-flight mazes reach size"""
+        have = (len(self._ready[key]) + len(self._spilled.get(key, ())) +
+                self._spilling.get(key, 0) + self._pending.get(key, 0))
+        missing = self.size - have
+        if missing > 0 and not self._closed:
+            self._pending[key] = self._pending.get(key, 0) + missing
+            now = time.perf_counter()
+            for _ in range(missing):
+                self._tasks.put((key, now))
+
+    def _worker(self):
+        while True:
+            task = self._tasks.get()
+            try:
+                if task is None:
+                    return
+                key, scheduled = task
+                try:
+                    generator = self._produce(key)
+                except Exception:
+                    generator = None
+                self._store(key, generator, time.perf_counter() - scheduled)
+            finally:
+                self._tasks.task_done()
+
+    def _produce(self, key):
+        width, height, params = key
+        params = dict(params)
+        if self._executor is None:
+            generator = MazeGenerator(width, height, **params)
+            generator.generate()
+        else:
+            spec = dict(params, width=width, height=height)
+            result = self._executor.submit(generate_one, 0, spec).result()
+            generator = result.to_generator()
+        # Search caches are not needed by whoever takes the maze
+        generator.clear_caches()
+        return generator
+
+    def _store(self, key, generator, lag):
+        with self._lock:
+            self._pending[key] -= 1
+            if generator is None:
+                self.counters['errors'] += 1
+                return
+            if self._closed:
+                return
+            self.counters['refills'] += 1
+            self._lag_total += lag
+            self._lag_max = max(self._lag_max, lag)
+            if key not in self._ready:
+                self._ready[key] = deque()
+            self._ready[key].append(generator)
+            self._bytes += generator.grid.nbytes
+            evicted = self._evict(key)
+
+        for evicted_key, maze in evicted:
+            self._spill(evicted_key, maze)
+
+    def _evict(self, newest):
+        """Takes mazes out of memory until the budget holds, least recently used keys first"""
+        evicted = []
+        if self.memory_budget is None:
+            return evicted
+        keys = [key for key in self._ready if key != newest] + [newest]
+        for key in keys:
+            ready = self._ready[key]
+            while ready and self._bytes > self.memory_budget:
+                maze = ready.pop()
+                self._bytes -= maze.grid.nbytes
+                self.counters['evicted'] += 1
+                evicted.append((key, maze))
+                if self.spill_dir is not None:
+                    self._spilling[key] = self._spilling.get(key, 0) + 1
+            if self._bytes <= self.memory_budget:
+                break
+        return evicted
+
+    def _spill(self, key, generator):
+        """Writes an evicted maze to the spill directory, if there is one"""
+        if self.spill_dir is None:
+            return
+        with self._lock:
+            self._spill_count += 1
+            number = self._spill_count
+        path = os.path.join(self.spill_dir, f'{os.getpid()}-{number}.maze')
+        try:
+            generator.save(path)
+        except Exception:
+            with self._lock:
+                self._spilling[key] -= 1
+                self.counters['errors'] += 1
+            return
+        with self._lock:
+            self._spilling[key] -= 1
+            if self._closed:
+                os.remove(path)
+                return
+            self._spilled.setdefault(key, deque()).append(path)
+            self.counters['spilled'] += 1
+
+    def stats(self):
+        """Hit/miss rates, pool contents and refill lag in seconds"""
+        with self._lock:
+            counters = dict(self.counters)
+            requests = counters['hits'] + counters['disk_hits'] + counters['misses']
+            refills = counters['refills']
+            counters.update({
+                'requests': requests,
+                'hit_rate': (counters['hits'] + counters['disk_hits']) / requests if requests else 0.0,
+                'ready': sum(len(ready) for ready in self._ready.values()),
+                'on_disk': sum(len(paths) for paths in self._spilled.values()),
+                'pending': sum(self._pending.values()),
+                'memory': self._bytes,
+                'refill_lag_avg': self._lag_total / refills if refills else 0.0,
+                'refill_lag_max': self._lag_max,
+            })
+        return counters
+
+    def close(self):
+        """Stops the refill threads and removes spilled files"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        # Drop queued refills, then wake every thread with a sentinel
+        while True:
+            try:
+                self._tasks.get_nowait()
+            except queue.Empty:
+                break
+            self._tasks.task_done()
+        for _ in self._threads:
+            self._tasks.put(None)
+        for thread in self._threads:
+            thread.join()
+        if self._executor is not None:
+            self._executor.shutdown()
+
+        for paths in self._spilled.values():
+            for path in paths:
+                if os.path.exists(path):
+                    os.remove(path)
+        self._spilled.clear()
+        self._ready.clear()
+        self._bytes = 0
+        if self._own_spill_dir:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,137 @@
+"""
+Bitmap rendering of the maze for the graphical interface
+
+Kept free of tkinter imports: the renderer only needs an image object
+with a PhotoImage-like put(data, to=...) method, so it can be driven by
+a stub without a display.
+"""
+
+from .maze_grid import WALL, ROAD, ENTRANCE, EXIT, TRAP, TREASURE
+
+# Cell colours of the interface
+COLORS = {
+    WALL: "black",
+    ROAD: "white",
+    ENTRANCE: "green",
+    EXIT: "red",
+    TRAP: "yellow",
+    TREASURE: "blue",
+}
+
+# The same colours as RGB, for image output
+RGB = {
+    "black": (0, 0, 0),
+    "white": (255, 255, 255),
+    "green": (0, 128, 0),
+    "red": (255, 0, 0),
+    "yellow": (255, 255, 0),
+    "blue": (0, 0, 255),
+    "gray": (190, 190, 190),
+    "darkgray": (96, 96, 96),
+    "orange": (255, 165, 0),
+}
+
+OUTLINE = "gray"
+
+# Letters drawn on special cells: (text, font size)
+LABELS = {
+    ENTRANCE: ("E", 10),
+    EXIT: ("X", 10),
+    TRAP: ("T", 8),
+    TREASURE: ("$", 10),
+}
+
+
+def hex_color(name):
+    """Tk colour string for a colour name"""
+    return '#%02x%02x%02x' % RGB[name]
+
+
+def cell_size_for(columns, rows, max_width=500, max_height=400):
+    """Largest cell size that fits the canvas, never below one pixel"""
+    return max(1, min(max_width // max(1, columns), max_height // max(1, rows)))
+
+
+class BitmapRenderer:
+    """Draws the grid into one image and redraws only rows that changed"""
+
+    def __init__(self, image, cell_size, colors=None):
+        """
+        Initialization of the renderer
+
+        Args:
+            image: tk.PhotoImage (or anything with put(data, to=...))
+            cell_size (int): pixels per cell
+            colors (dict): byte value -> Tk colour string, cell colours
+                by default
+        """
+        self.image = image
+        self.cell_size = cell_size
+        if colors is None:
+            colors = {code: hex_color(name) for code, name in COLORS.items()}
+        # Cells get a one pixel outline when they are big enough to show it
+        self.outline = cell_size >= 4
+        fill = cell_size - 1 if self.outline else cell_size
+        outline = hex_color(OUTLINE)
+        self._pixels = {}
+        for value, color in colors.items():
+            pixels = [color] * fill
+            if self.outline:
+                pixels.append(outline)
+            self._pixels[value] = ' '.join(pixels)
+        self._outline = outline
+        self._rows = []
+
+    def _put_span(self, i, start, stop, codes):
+        """Draws cells start..stop-1 of row i"""
+        size = self.cell_size
+        data = '{' + ' '.join(map(self._pixels.__getitem__, codes[start:stop])) + '}'
+        y = i * size
+        fill = size - 1 if self.outline else size
+        self.image.put(data, to=(start * size, y, stop * size, y + fill))
+        if self.outline:
+            self.image.put(self._outline, to=(start * size, y + fill, stop * size, y + size))
+
+    def render(self, grid):
+        """Brings the image up to date, returns the number of redrawn rows"""
+        return self.render_rows([grid.row_codes(i) for i in range(grid.height)])
+
+    def render_rows(self, rows):
+        """Same as render() for a list of rows given as bytes"""
+        if len(self._rows) != len(rows):
+            self._rows = [None] * len(rows)
+
+        redrawn = 0
+        for i, codes in enumerate(rows):
+            previous = self._rows[i]
+            if previous == codes:
+                continue
+            if previous is None or len(previous) != len(codes):
+                start, stop = 0, len(codes)
+            else:
+                start = 0
+                while previous[start] == codes[start]:
+                    start += 1
+                stop = len(codes)
+                while previous[stop - 1] == codes[stop - 1]:
+                    stop -= 1
+            self._put_span(i, start, stop, codes)
+            self._rows[i] = codes
+            redrawn += 1
+        return redrawn
+
+    def labels(self, grid):
+        """(x, y, text, font size) of the letters on special cells"""
+        if self.cell_size < 8:
+            return []
+        size = self.cell_size
+        found = []
+        for i in range(grid.height):
+            codes = grid.row_codes(i)
+            if codes.count(WALL) + codes.count(ROAD) == len(codes):
+                continue
+            for j, code in enumerate(codes):
+                if code in LABELS:
+                    text, font_size = LABELS[code]
+                    found.append((j * size + size // 2, i * size + size // 2, text, font_size))
+        return found
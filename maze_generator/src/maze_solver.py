@@ -0,0 +1,291 @@
+"""
+Repeated path queries on a finished maze
+
+Carved mazes are perfect: the walkable cells form a tree, so the path
+between two cells is unique and its length follows from the depths of
+the cells and their lowest common ancestor, found by binary lifting in
+O(log n). Prefix counts of trap triples along the root paths tell, also
+without a search, whether that path is safe; if it is, nothing shorter
+exists. Otherwise a safe walk may still step aside to reset its trap run,
+so such queries, and every query on mazes with loops (edited or loaded
+ones), are answered from safe BFS trees cached per start cell. The trees
+of the entrance, exit and treasure are always kept.
+"""
+
+from array import array
+from collections import OrderedDict
+
+from .maze_analysis import find_cell
+from .maze_grid import TREASURE
+from .safe_path import SearchLayout, safe_search_tree, _STATES, _TRAP, _WALKABLE
+
+# Search class -> 1 for walkable cells and traps
+_MASK_TABLE = bytes(1 if kind else 0 for kind in range(256))
+
+
+class MazeSolver:
+    """
+    Distance fields and path queries over one maze
+
+    Paths follow the rules of the generator's safe search: three traps in
+    a row kill the player, the trap a path starts on does not count. The
+    entrance is walkable here as well, so it can be a goal. Distances are
+    numbers of steps, -1 when there is no safe path.
+    """
+
+    def __init__(self, maze, max_trees=8):
+        """
+        Initialization of the solver
+
+        Args:
+            maze: MazeGenerator, or a MazeGrid (then there are no named sources)
+            max_trees (int): BFS trees of other start cells kept for reuse
+        """
+        self.maze = maze
+        self.grid = getattr(maze, 'grid', maze)
+        self.max_trees = max_trees
+        self.version = None
+        self._build()
+
+    def _build(self):
+        grid = self.grid
+        self.version = grid.version
+        self.width = grid.width
+        self.height = grid.height
+        self.sources = {
+            'entrance': getattr(self.maze, 'entrance', None),
+            'exit': getattr(self.maze, 'exit', None),
+            'treasure': find_cell(grid, TREASURE),
+        }
+
+        layout = self.layout = SearchLayout(grid)
+        entrance = self.sources['entrance']
+        if entrance is not None:
+            layout.classes[layout.index(entrance)] = _WALKABLE
+        self._trees = OrderedDict()
+        self._build_forest()
+
+        # Fields of the named sources are precomputed and never evicted
+        self._pinned = {}
+        self.fields = {}
+        for name, cell in self.sources.items():
+            if cell is not None:
+                self._pinned[cell] = safe_search_tree(layout, cell)
+                self.fields[name] = self._unpad(self._pinned[cell][2])
+
+    def _check_version(self):
+        if self.grid.version != self.version:
+            self._build()
+
+    def _unpad(self, values):
+        """Layout-ordered values -> row-major values of the grid"""
+        stride = self.layout.stride
+        result = array('i')
+        for x in range(self.height):
+            start = (x + 1) * stride + 1
+            result.extend(values[start:start + self.width])
+        return result
+
+    def _build_forest(self):
+        """Roots every component of walkable cells and checks whether it is a tree"""
+        layout = self.layout
+        classes = layout.classes
+        size = layout.size
+        offsets = layout.offsets
+
+        # Walkable cells get compact node ids
+        self._cells = cells = array('i', (i for i in range(size) if classes[i]))
+        self._node = node = array('i', [-1]) * size
+        for k, index in enumerate(cells):
+            node[index] = k
+        count = len(cells)
+
+        # Edges between walkable neighbours, counted on a 0/1 byte mask
+        mask = int.from_bytes(bytes(classes).translate(_MASK_TABLE), 'big')
+        edges = sum((mask & (mask >> (8 * shift))).to_bytes(size, 'big').count(1)
+                    for shift in (1, layout.stride))
+
+        parent = array('i', [-1]) * count
+        depth = array('i', [0]) * count
+        component = array('i', [-1]) * count
+        order = []
+        components = 0
+        for root in range(count):
+            if component[root] != -1:
+                continue
+            parent[root] = root
+            component[root] = components
+            head = len(order)
+            order.append(root)
+            while head < len(order):
+                v = order[head]
+                head += 1
+                index = cells[v]
+                for offset in offsets:
+                    u = node[index + offset]
+                    if u != -1 and component[u] == -1:
+                        component[u] = components
+                        parent[u] = v
+                        depth[u] = depth[v] + 1
+                        order.append(u)
+            components += 1
+
+        self.node_count = count
+        self.is_tree = edges == count - components
+        self._parent = parent
+        self._depth = depth
+        self._component = component
+        self._up = None
+        if not self.is_tree:
+            return
+
+        # up[k][v] is the 2**k-th ancestor of v, roots point to themselves
+        up = [parent]
+        for _ in range(max(depth, default=0).bit_length() - 1):
+            previous = up[-1]
+            up.append(array('i', map(previous.__getitem__, previous)))
+        self._up = up
+
+        # bad[v]: v, its parent and grandparent are all traps;
+        # triples[v] counts bad nodes from v up to the root
+        trap = bytes(classes[cells[v]] == _TRAP for v in range(count))
+        self._trap = trap
+        triples = array('i', [0]) * count
+        for v in order:
+            p = parent[v]
+            bad = depth[v] >= 2 and trap[v] and trap[p] and trap[parent[p]]
+            triples[v] = triples[p] + bad if p != v else bad
+        self._triples = triples
+
+    def _ancestor(self, v, steps):
+        k = 0
+        while steps:
+            if steps & 1:
+                v = self._up[k][v]
+            steps >>= 1
+            k += 1
+        return v
+
+    def _lca(self, u, v):
+        depth = self._depth
+        if depth[u] < depth[v]:
+            u, v = v, u
+        u = self._ancestor(u, depth[u] - depth[v])
+        if u == v:
+            return u
+        for level in reversed(self._up):
+            if level[u] != level[v]:
+                u, v = level[u], level[v]
+        return self._parent[u]
+
+    def _tree_distance(self, u, v):
+        """Length of the tree path u -> v, -1 if it runs over three traps in a row"""
+        if u == v:
+            return 0
+        depth = self._depth
+        triples = self._triples
+        trap = self._trap
+        lca = self._lca(u, v)
+        du = depth[u] - depth[lca]
+        dv = depth[v] - depth[lca]
+
+        # Triples of entered cells on the way up from u; u itself is not entered
+        bad = 0
+        if du >= 3:
+            bad += triples[self._parent[u]] - triples[self._ancestor(u, du - 1)]
+        # Triples on the way down to v; the lca counts unless the path starts there
+        if du and dv >= 2:
+            bad += triples[v] - triples[self._ancestor(v, dv - 1)]
+        elif not du and dv >= 3:
+            bad += triples[v] - triples[self._ancestor(v, dv - 2)]
+        # The triple with the lca in the middle
+        if du >= 2 and dv and trap[lca]:
+            if trap[self._ancestor(u, du - 1)] and trap[self._ancestor(v, dv - 1)]:
+                bad += 1
+        return du + dv if not bad else -1
+
+    def _resolve(self, cell):
+        if isinstance(cell, str):
+            resolved = self.sources.get(cell)
+            if resolved is None:
+                raise ValueError(f"maze has no {cell}")
+            return resolved
+        return tuple(cell)
+
+    def _node_of(self, cell):
+        x, y = cell
+        if not (0 <= x < self.height and 0 <= y < self.width):
+            return -1
+        return self._node[self.layout.index(cell)]
+
+    def tree(self, start):
+        """Cached safe BFS tree (parents, distances, cell distances) of a start cell"""
+        self._check_version()
+        start = self._resolve(start)
+        if start in self._pinned:
+            return self._pinned[start]
+        trees = self._trees
+        if start in trees:
+            trees.move_to_end(start)
+            return trees[start]
+        tree = trees[start] = safe_search_tree(self.layout, start)
+        while len(trees) > self.max_trees:
+            trees.popitem(last=False)
+        return tree
+
+    def field(self, source):
+        """Safe distance from source to every cell, row-major, -1 where unreachable"""
+        self._check_version()
+        if isinstance(source, str) and source in self.fields:
+            return self.fields[source]
+        return self._unpad(self.tree(source)[2])
+
+    def distance(self, start, goal):
+        """Number of steps of the shortest safe path, -1 if there is none"""
+        self._check_version()
+        start, goal = self._resolve(start), self._resolve(goal)
+        u, v = self._node_of(start), self._node_of(goal)
+        if u == -1 or v == -1:
+            return -1
+        if self.is_tree:
+            if self._component[u] != self._component[v]:
+                return -1
+            distance = self._tree_distance(u, v)
+            if distance != -1:
+                return distance
+        return self.tree(start)[2][self.layout.index(goal)]
+
+    def path(self, start, goal):
+        """Cells of the shortest safe path, empty if there is none"""
+        self._check_version()
+        start, goal = self._resolve(start), self._resolve(goal)
+        if self.distance(start, goal) == -1:
+            return []
+        u, v = self._node_of(start), self._node_of(goal)
+        if self.is_tree and self._tree_distance(u, v) != -1:
+            lca = self._lca(u, v)
+            up, down = [], []
+            while u != lca:
+                up.append(u)
+                u = self._parent[u]
+            while v != lca:
+                down.append(v)
+                v = self._parent[v]
+            nodes = up + [lca] + down[::-1]
+            return [self.layout.cell(self._cells[k]) for k in nodes]
+
+        parents, distances, _ = self.tree(start)
+        index = self.layout.index(goal)
+        state = min((s for s in range(index * _STATES, (index + 1) * _STATES)
+                     if distances[s] != -1), key=distances.__getitem__)
+        return self.layout.path(parents, state)
+
+    def lca(self, a, b):
+        """Meeting cell of the paths from the root to a and b, tree mazes only"""
+        self._check_version()
+        if not self.is_tree:
+            raise ValueError("maze has loops, it is not a tree")
+        u, v = self._node_of(self._resolve(a)), self._node_of(self._resolve(b))
+        if u == -1 or v == -1 or self._component[u] != self._component[v]:
+            return None
+        return self.layout.cell(self._cells[self._lca(u, v)])
@@ -0,0 +1,126 @@
+"""
+Row-streaming maze generation with memory bounded by the width
+
+Rows are produced with Eller's algorithm and handed out as soon as they
+are finished. Only the previous grid row is kept, which is enough to
+place traps so that no two of them touch: then no path can ever cross
+three traps in a row, and every path from the entrance is safe.
+"""
+
+import random
+
+from .carving import eller_rows
+from .maze_export import ascii_bytes
+from .maze_grid import ROAD, ENTRANCE, EXIT, TRAP, TREASURE
+from .maze_io import pack_row, write_header
+
+ROW_FORMATS = ('codes', 'ascii', 'packed')
+
+
+class MazeStream:
+    """Perfect maze of any height generated one grid row at a time"""
+
+    def __init__(self, width, height, seed=None, rng=None, trap_density=0.02,
+                 treasure=True):
+        """
+        Initialization of the stream
+
+        Args:
+            width (int)
+            height (int): number of grid rows, may be very large
+            seed (int): seed for reproducible output
+            rng (random.Random): random source, overrides seed
+            trap_density (float): chance for a road cell to become a trap
+            treasure (bool): allow placing one treasure
+        """
+        self.width = width if width % 2 == 1 else width + 1
+        self.height = height if height % 2 == 1 else height + 1
+        if self.width < 3 or self.height < 3:
+            raise ValueError("maze must be at least 3x3")
+        if not 0 <= trap_density <= 1:
+            raise ValueError("trap_density must be between 0 and 1")
+        self.seed = seed
+        self.rng = rng if rng is not None else random.Random(seed)
+        self.trap_density = trap_density
+
+        rows, cols = (self.height - 1) // 2, (self.width - 1) // 2
+        # Entrance and exit are fixed up front, on the top and bottom borders
+        self.entrance = (0, 2 * self.rng.randrange(cols) + 1)
+        self.exit = (self.height - 1, 2 * self.rng.randrange(cols) + 1)
+        self.treasure = None
+        if treasure and self.rng.random() > 0.5:
+            self.treasure = (2 * self.rng.randrange(rows) + 1, 2 * self.rng.randrange(cols) + 1)
+
+    def _place_traps(self, line, above):
+        """Turns road cells into traps, never next to another trap"""
+        if not self.trap_density:
+            return
+        random_value = self.rng.random
+        density = self.trap_density
+        for y in range(1, self.width - 1):
+            if line[y] == ROAD and above[y] != TRAP and line[y - 1] != TRAP \
+                    and random_value() < density:
+                line[y] = TRAP
+
+    def rows(self):
+        """Yields every grid row as bytes of cell codes"""
+        width = self.width
+        rows, cols = (self.height - 1) // 2, (width - 1) // 2
+
+        top = bytearray(width)
+        top[self.entrance[1]] = ENTRANCE
+        yield bytes(top)
+
+        above = top
+        for r, (east, south) in enumerate(eller_rows(rows, cols, self.rng)):
+            x = 2 * r + 1
+            line = bytearray(width)
+            for c in range(cols):
+                line[2 * c + 1] = ROAD
+                if c < cols - 1 and east[c]:
+                    line[2 * c + 2] = ROAD
+            if self.treasure is not None and self.treasure[0] == x:
+                line[self.treasure[1]] = TREASURE
+            self._place_traps(line, above)
+            yield bytes(line)
+
+            below = bytearray(width)
+            if south is None:
+                below[self.exit[1]] = EXIT
+            else:
+                for c in range(cols):
+                    if south[c]:
+                        below[2 * c + 1] = ROAD
+                self._place_traps(below, line)
+            yield bytes(below)
+            above = below
+
+    def iter_rows(self, fmt='codes'):
+        """Yields rows as cell codes, ASCII strings or 4-bit packed bytes"""
+        if fmt not in ROW_FORMATS:
+            raise ValueError(f"Unknown row format: {fmt!r}")
+        for codes in self.rows():
+            if fmt == 'codes':
+                yield codes
+            elif fmt == 'ascii':
+                yield ascii_bytes(codes).decode('utf-8')
+            else:
+                yield pack_row(codes)
+
+    def write_ascii(self, fp):
+        """Streams the maze as text lines"""
+        for line in self.iter_rows('ascii'):
+            fp.write(line)
+            fp.write('\n')
+
+    def write_packed(self, fp, metadata=None):
+        """Streams the maze in the maze_io binary file format"""
+        write_header(fp, self.width, self.height, self.entrance, self.exit,
+                     self.seed, metadata)
+        for packed in self.iter_rows('packed'):
+            fp.write(packed)
+
+
+def stream_maze(width, height, seed=None, fmt='codes', **kwargs):
+    """Yields the rows of a new maze in the requested format"""
+    return MazeStream(width, height, seed=seed, **kwargs).iter_rows(fmt)
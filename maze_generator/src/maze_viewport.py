@@ -0,0 +1,335 @@
+"""
+Zoomable view of mazes far larger than the canvas
+
+Cells are summarized in a level-of-detail pyramid: level 0 holds one flag
+byte per cell (bit 1 << code), level k one byte per 2**k x 2**k block of
+cells, the OR of the flags below it. Levels are cut into square tiles that
+are built the first time they are looked at, from an in-memory grid or a
+memory-mapped MazeFile alike.
+"""
+
+import math
+import threading
+from collections import OrderedDict
+
+from .maze_grid import WALL, ROAD, ENTRANCE, EXIT, TRAP, TREASURE
+from .maze_render import BitmapRenderer, COLORS, LABELS, hex_color
+
+TILE_SIZE = 256
+
+# Tiles of this level and above are small and never evicted
+PINNED_LEVEL = 3
+
+# Largest zoom, in pixels per cell
+MAX_CELL_SIZE = 32
+
+# Cell code -> flag bit
+_FLAG_TABLE = bytes((1 << code) if code < 8 else 0 for code in range(256))
+
+# Special cells stay visible at every level, in this order
+_PRIORITY = (EXIT, ENTRANCE, TREASURE, TRAP)
+
+# Blocks holding both walls and roads
+MIXED = "darkgray"
+
+# Pixels outside the maze
+BACKGROUND = "white"
+
+
+def flag_colors():
+    """Tk colour of every flag byte"""
+    colors = {}
+    for flags in range(256):
+        special = [code for code in _PRIORITY if flags & (1 << code)]
+        if special:
+            name = COLORS[special[0]]
+        elif flags & (1 << WALL) and flags & (1 << ROAD):
+            name = MIXED
+        elif flags & (1 << WALL):
+            name = COLORS[WALL]
+        elif flags & (1 << ROAD):
+            name = COLORS[ROAD]
+        else:
+            name = BACKGROUND
+        colors[flags] = hex_color(name)
+    return colors
+
+
+def _or_bytes(a, b):
+    return (int.from_bytes(a, 'big') | int.from_bytes(b, 'big')).to_bytes(len(a), 'big')
+
+
+def downsample(rows):
+    """Halves rows of flags in both directions, ORing every 2x2 block"""
+    result = []
+    for k in range(0, len(rows), 2):
+        row = rows[k]
+        if k + 1 < len(rows):
+            row = _or_bytes(row, rows[k + 1])
+        if len(row) % 2:
+            row += b'\x00'
+        result.append(_or_bytes(row[0::2], row[1::2]))
+    return result
+
+
+class LodPyramid:
+    """Lazily built level-of-detail tiles over a MazeGrid or MazeFile"""
+
+    def __init__(self, source, tile_size=TILE_SIZE, max_tiles=512):
+        """
+        Initialization of the pyramid
+
+        Args:
+            source: MazeGrid or MazeFile, anything with width, height and
+                region(top, left, bottom, right)
+            tile_size (int): tile edge in cells of its level
+            max_tiles (int): cached tiles below PINNED_LEVEL
+        """
+        self.source = source
+        self.width = source.width
+        self.height = source.height
+        self.tile_size = tile_size
+        self.max_tiles = max_tiles
+        self.levels = 1
+        while max(self.shape(self.levels - 1)) > 1:
+            self.levels += 1
+        self.built = 0
+        self._tiles = OrderedDict()
+        self._pinned = {}
+        # The GUI renders on the Tk thread while a worker prepares the overview
+        self._lock = threading.Lock()
+        self._version = getattr(source, 'version', None)
+
+    def shape(self, level):
+        """(height, width) of a level in blocks"""
+        span = 1 << level
+        return -(-self.height // span), -(-self.width // span)
+
+    def _check_version(self):
+        """Drops every tile after the source grid was modified"""
+        version = getattr(self.source, 'version', None)
+        if version != self._version:
+            with self._lock:
+                self._tiles.clear()
+                self._pinned.clear()
+                self._version = version
+
+    def tile(self, level, ti, tj):
+        """Rows of flags of one tile, built on first use"""
+        key = (level, ti, tj)
+        with self._lock:
+            if key in self._pinned:
+                return self._pinned[key]
+            if key in self._tiles:
+                self._tiles.move_to_end(key)
+                return self._tiles[key]
+
+        rows = self._build(level, ti, tj)
+        with self._lock:
+            self.built += 1
+            if level >= PINNED_LEVEL:
+                self._pinned[key] = rows
+            else:
+                self._tiles[key] = rows
+                while len(self._tiles) > self.max_tiles:
+                    self._tiles.popitem(last=False)
+        return rows
+
+    def _build(self, level, ti, tj):
+        size = self.tile_size
+        if level == 0:
+            codes = self.source.region(ti * size, tj * size, (ti + 1) * size, (tj + 1) * size)
+            return [row.translate(_FLAG_TABLE) for row in codes]
+        return downsample(self.region(level - 1, 2 * ti * size, 2 * tj * size,
+                                      2 * (ti + 1) * size, 2 * (tj + 1) * size))
+
+    def region(self, level, top, left, bottom, right):
+        """Flags of blocks top..bottom-1 and left..right-1 of a level"""
+        self._check_version()
+        height, width = self.shape(level)
+        top, bottom = max(0, top), min(height, bottom)
+        left, right = max(0, left), min(width, right)
+        if top >= bottom or left >= right:
+            return []
+
+        size = self.tile_size
+        first_column = left // size
+        skip = left - first_column * size
+        rows = []
+        for ti in range(top // size, (bottom - 1) // size + 1):
+            tiles = [self.tile(level, ti, tj)
+                     for tj in range(first_column, (right - 1) // size + 1)]
+            for r in range(max(top, ti * size), min(bottom, (ti + 1) * size)):
+                line = b''.join(tile[r - ti * size] for tile in tiles)
+                rows.append(line[skip:skip + right - left])
+        return rows
+
+    def overview_level(self, max_width, max_height):
+        """Finest level that fits into max_width x max_height pixels"""
+        for level in range(self.levels):
+            height, width = self.shape(level)
+            if width <= max_width and height <= max_height:
+                return level
+        return self.levels - 1
+
+    def prefetch(self, level):
+        """Builds every tile of a level, e.g. on a worker thread"""
+        height, width = self.shape(level)
+        self.region(level, 0, 0, height, width)
+
+
+class MazeViewport:
+    """Zoom and pan state over a pyramid, draws only the visible window"""
+
+    def __init__(self, image, width, height):
+        """
+        Initialization of the viewport
+
+        Args:
+            image: tk.PhotoImage of width x height pixels (or a stub with put)
+            width (int): view width in pixels
+            height (int): view height in pixels
+        """
+        self.image = image
+        self.width = width
+        self.height = height
+        self.pyramid = None
+        # Each pixel shows 2**level cells per side, or one cell covers cell_size pixels
+        self.level = 0
+        self.cell_size = 1
+        # Top left corner of the view in cells
+        self.top = 0.0
+        self.left = 0.0
+        self.colors = flag_colors()
+        self._renderer = None
+
+    def show(self, pyramid):
+        """Switches to another maze and fits it into the view"""
+        self.pyramid = pyramid
+        self.fit()
+
+    @property
+    def cells_per_pixel(self):
+        return (1 << self.level) / self.cell_size
+
+    def fit(self):
+        """Zooms so that the whole maze is visible"""
+        pyramid = self.pyramid
+        size = min(self.width // pyramid.width, self.height // pyramid.height)
+        if size >= 1:
+            self.level, self.cell_size = 0, min(size, MAX_CELL_SIZE)
+        else:
+            self.level = pyramid.overview_level(self.width, self.height)
+            self.cell_size = 1
+        self.center_on(pyramid.height / 2, pyramid.width / 2)
+
+    def center_on(self, x, y):
+        """Moves the view so that cell (x, y) is in the middle"""
+        scale = self.cells_per_pixel
+        self.top = x - self.height * scale / 2
+        self.left = y - self.width * scale / 2
+        self._clamp()
+
+    def _clamp(self):
+        """Keeps the maze in view, centred when it is smaller than the view"""
+        scale = self.cells_per_pixel
+        for attr, view, size in (('top', self.height * scale, self.pyramid.height),
+                                 ('left', self.width * scale, self.pyramid.width)):
+            if size <= view:
+                setattr(self, attr, (size - view) / 2)
+            else:
+                setattr(self, attr, min(max(getattr(self, attr), 0), size - view))
+
+    def zoom(self, steps, anchor=None):
+        """Zooms in (steps > 0) or out, keeping the cell under anchor in place"""
+        px, py = anchor if anchor is not None else (self.width / 2, self.height / 2)
+        x, y = self.to_cell(px, py)
+        for _ in range(abs(steps)):
+            if steps > 0:
+                if self.level:
+                    self.level -= 1
+                else:
+                    self.cell_size = min(MAX_CELL_SIZE, self.cell_size * 2)
+            elif self.cell_size > 1:
+                self.cell_size = max(1, self.cell_size // 2)
+            elif self.level < self.pyramid.levels - 1:
+                self.level += 1
+        scale = self.cells_per_pixel
+        self.top = x - py * scale
+        self.left = y - px * scale
+        self._clamp()
+
+    def pan(self, dx, dy):
+        """Moves the content by dx, dy pixels"""
+        scale = self.cells_per_pixel
+        self.left -= dx * scale
+        self.top -= dy * scale
+        self._clamp()
+
+    def to_cell(self, px, py):
+        """Cell (x, y) under a pixel of the view"""
+        scale = self.cells_per_pixel
+        return self.top + py * scale, self.left + px * scale
+
+    def to_pixel(self, x, y):
+        """Pixel (px, py) of a cell position"""
+        scale = self.cells_per_pixel
+        return (y - self.left) / scale, (x - self.top) / scale
+
+    def visible(self):
+        """(top, left, bottom, right) of the visible cells"""
+        scale = self.cells_per_pixel
+        return self.top, self.left, self.top + self.height * scale, self.left + self.width * scale
+
+    def _window(self):
+        """Level rows of the view, padded with background outside the maze"""
+        span = 1 << self.level
+        size = self.cell_size
+        top = math.floor(self.top / span)
+        left = math.floor(self.left / span)
+        rows_count = -(-self.height // size)
+        columns = -(-self.width // size)
+
+        fetched = self.pyramid.region(self.level, top, left, top + rows_count, left + columns)
+        first = max(0, top)
+        pad_left = bytes(max(0, -left))
+        blank = bytes(columns)
+        rows = []
+        for i in range(top, top + rows_count):
+            if first <= i < first + len(fetched):
+                row = pad_left + fetched[i - first]
+                rows.append(row + bytes(columns - len(row)))
+            else:
+                rows.append(blank)
+        return rows
+
+    def render(self):
+        """Draws the visible window, returns the number of redrawn rows"""
+        if self.pyramid is None:
+            return 0
+        if self._renderer is None or self._renderer.cell_size != self.cell_size:
+            self._renderer = BitmapRenderer(self.image, self.cell_size, self.colors)
+        return self._renderer.render_rows(self._window())
+
+    def labels(self):
+        """(x, y, text, font size) of the letters on visible special cells"""
+        if self.level or self.cell_size < 8:
+            return []
+        size = self.cell_size
+        top = math.floor(self.top)
+        left = math.floor(self.left)
+        found = []
+        window = self.pyramid.region(0, top, left, top + -(-self.height // size),
+                                     left + -(-self.width // size))
+        first, start = max(0, top), max(0, left)
+        plain = (1 << WALL) | (1 << ROAD)
+        for i, row in enumerate(window):
+            if max(row, default=0) <= plain:
+                continue
+            for j, flags in enumerate(row):
+                code = flags.bit_length() - 1
+                if code in LABELS:
+                    text, font_size = LABELS[code]
+                    found.append(((start + j - left) * size + size // 2,
+                                  (first + i - top) * size + size // 2, text, font_size))
+        return found
@@ -0,0 +1,224 @@
+"""
+Chunked, unbounded maze world generated on demand
+
+The world is cut into square chunks of chunk_size x chunk_size cells.
+Every chunk is carved from its own seed, a hash of the world seed and the
+chunk coordinates, so any chunk can be produced alone and always comes
+out the same. A chunk owns the wall row above it and the wall column to
+its left; one door is opened in each of them at a position that is also
+derived from the hash, so neighbouring chunks agree on their connections
+without looking at each other.
+
+Traps follow the rule of MazeStream: no two traps touch, and chunk
+boundaries never hold one, so no path anywhere crosses more than one trap
+in a row.
+"""
+
+import hashlib
+import queue
+import random
+import struct
+import threading
+from collections import OrderedDict
+
+from .carving import get_strategy
+from .maze_export import ascii_bytes
+from .maze_grid import ROAD, TRAP, TREASURE, create_grid
+
+# Hash purposes: chunk seed, door in the top wall row, door in the left wall column
+_SEED, _TOP_DOOR, _LEFT_DOOR = 0, 1, 2
+
+
+class MazeWorld:
+    """Unbounded maze addressed by world cells, world[x, y] -> cell code"""
+
+    def __init__(self, seed=0, chunk_size=64, algorithm='dfs', trap_density=0.02,
+                 treasure_chance=0.1, memory_budget=64 * 2**20, prefetch_threads=1):
+        """
+        Initialization of the world
+
+        Args:
+            seed (int): world seed
+            chunk_size (int): chunk edge in cells, even and at least 4
+            algorithm (str or CarvingStrategy): carving inside every chunk
+            trap_density (float): chance for a free road cell to become a trap
+            treasure_chance (float): chance of a chunk to hold one treasure
+            memory_budget (int): bytes of chunk data kept in the cache
+            prefetch_threads (int): background threads generating chunks
+                asked for with prefetch(), 0 disables prefetching
+        """
+        if chunk_size < 4 or chunk_size % 2:
+            raise ValueError("chunk_size must be even and at least 4")
+        if not 0 <= trap_density <= 1:
+            raise ValueError("trap_density must be between 0 and 1")
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.carver = get_strategy(algorithm)
+        self.trap_density = trap_density
+        self.treasure_chance = treasure_chance
+        self.max_chunks = max(1, memory_budget // (chunk_size * chunk_size))
+
+        # (cx, cy) -> bytes of chunk_size rows; order is least recently used first
+        self._chunks = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = dict.fromkeys(('hits', 'misses', 'generated', 'prefetched', 'evicted'), 0)
+
+        self._pending = set()
+        self._tasks = queue.Queue()
+        self._closed = False
+        self._threads = [threading.Thread(target=self._worker, daemon=True)
+                         for _ in range(prefetch_threads)]
+        for thread in self._threads:
+            thread.start()
+
+    def _hash(self, purpose, cx, cy):
+        digest = hashlib.blake2b(struct.pack('<qqqB', self.seed, cx, cy, purpose), digest_size=8)
+        return int.from_bytes(digest.digest(), 'little')
+
+    def chunk_seed(self, cx, cy):
+        """Seed of one chunk, the same on every machine and run"""
+        return self._hash(_SEED, cx, cy)
+
+    def chunk_of(self, x, y):
+        """(cx, cy) of the chunk holding world cell (x, y)"""
+        return x // self.chunk_size, y // self.chunk_size
+
+    def _generate(self, cx, cy):
+        """Cells of one chunk as bytes, row by row"""
+        size = self.chunk_size
+        half = size // 2
+        rng = random.Random(self.chunk_seed(cx, cy))
+        # One extra row and column: the chunk below and to the right own them
+        grid = create_grid(size + 1, size + 1)
+        self.carver.carve(grid, rng)
+        grid.set(0, 2 * (self._hash(_TOP_DOOR, cx, cy) % half) + 1, ROAD)
+        grid.set(2 * (self._hash(_LEFT_DOOR, cx, cy) % half) + 1, 0, ROAD)
+
+        rows = [bytearray(grid.row_codes(x)[:size]) for x in range(size)]
+        if self.trap_density:
+            density = self.trap_density
+            for x in range(1, size):
+                row, above = rows[x], rows[x - 1]
+                for y in range(1, size):
+                    # Cells further right and down are still free of traps
+                    if row[y] == ROAD and rng.random() < density and \
+                            above[y] != TRAP and row[y - 1] != TRAP:
+                        row[y] = TRAP
+        if rng.random() < self.treasure_chance:
+            x, y = 2 * rng.randrange(half) + 1, 2 * rng.randrange(half) + 1
+            if rows[x][y] == ROAD:
+                rows[x][y] = TREASURE
+        return b''.join(rows)
+
+    def chunk(self, cx, cy):
+        """Bytes of one chunk, from the cache or generated now"""
+        key = (cx, cy)
+        with self._lock:
+            data = self._chunks.get(key)
+            if data is not None:
+                self._chunks.move_to_end(key)
+                self.counters['hits'] += 1
+                return data
+            self.counters['misses'] += 1
+        data = self._generate(cx, cy)
+        self._store(key, data, 'generated')
+        return data
+
+    def _store(self, key, data, counter):
+        with self._lock:
+            self.counters[counter] += 1
+            self._chunks[key] = data
+            self._chunks.move_to_end(key)
+            while len(self._chunks) > self.max_chunks:
+                self._chunks.popitem(last=False)
+                self.counters['evicted'] += 1
+
+    def __getitem__(self, cell):
+        x, y = cell
+        size = self.chunk_size
+        cx, lx = divmod(x, size)
+        cy, ly = divmod(y, size)
+        return self.chunk(cx, cy)[lx * size + ly]
+
+    def region(self, top, left, bottom, right):
+        """Rows top..bottom-1 of columns left..right-1 as bytes"""
+        size = self.chunk_size
+        rows = []
+        for x in range(top, bottom):
+            cx, lx = divmod(x, size)
+            parts = []
+            y = left
+            while y < right:
+                cy, ly = divmod(y, size)
+                stop = min(size, ly + right - y)
+                start = lx * size
+                parts.append(self.chunk(cx, cy)[start + ly:start + stop])
+                y += stop - ly
+            rows.append(b''.join(parts))
+        return rows
+
+    def to_ascii(self, top, left, bottom, right):
+        """Text of a window of the world"""
+        return '\n'.join([ascii_bytes(row).decode('utf-8')
+                          for row in self.region(top, left, bottom, right)])
+
+    def prefetch(self, x, y, radius=1):
+        """Queues the chunks around world cell (x, y) for the background threads"""
+        if not self._threads:
+            return
+        cx, cy = self.chunk_of(x, y)
+        with self._lock:
+            for i in range(cx - radius, cx + radius + 1):
+                for j in range(cy - radius, cy + radius + 1):
+                    key = (i, j)
+                    if key not in self._chunks and key not in self._pending:
+                        self._pending.add(key)
+                        self._tasks.put(key)
+
+    def _worker(self):
+        while True:
+            key = self._tasks.get()
+            try:
+                if key is None:
+                    return
+                with self._lock:
+                    cached = key in self._chunks
+                if not cached and not self._closed:
+                    self._store(key, self._generate(*key), 'prefetched')
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+                self._tasks.task_done()
+
+    def join(self):
+        """Blocks until every queued prefetch is done"""
+        self._tasks.join()
+
+    def stats(self):
+        """Cache counters, hit rate and memory held by chunks"""
+        with self._lock:
+            stats = dict(self.counters)
+            requests = stats['hits'] + stats['misses']
+            stats.update({
+                'hit_rate': stats['hits'] / requests if requests else 0.0,
+                'chunks': len(self._chunks),
+                'memory': len(self._chunks) * self.chunk_size * self.chunk_size,
+                'pending': len(self._pending),
+            })
+        return stats
+
+    def close(self):
+        """Stops the prefetch threads"""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._threads:
+            self._tasks.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,407 @@
+"""
+Incremental safe-path maintenance for trap placement
+"""
+
+from array import array
+
+from .maze_grid import ROAD, EXIT, TRAP, TREASURE
+
+# A player dies on the third trap in a row
+MAX_TRAPS_IN_ROW = 2
+
+# Cells around a broken witness stretch searched first for a detour
+REPAIR_MARGIN = 8
+
+
+class SafePathEngine:
+    """Keeps one safe path (witness) up to date while traps are added
+
+    The witness is found with a single full search. A new trap that is
+    not on the witness cannot break it, so it is accepted without any
+    search. A trap on the witness is accepted as long as the run of traps
+    around every visit of the cell stays short enough (a witness may pass
+    a cell twice, e.g. to step off a trap run and back); otherwise the
+    broken stretch is searched again inside a window around it, growing
+    up to the whole grid, and a detour is spliced into the witness.
+    """
+
+    def __init__(self, generator, start, goal):
+        """
+        Initialization of the engine
+
+        Args:
+            generator (MazeGenerator): maze whose grid is modified
+            start (tuple): start cell of the safe path
+            goal (tuple): goal cell of the safe path
+        """
+        self.generator = generator
+        self.grid = generator.grid
+        self.start = start
+        self.goal = goal
+        self.searches = 0
+        self._set_path(self._search(start, goal))
+
+    def _search(self, start, goal):
+        self.searches += 1
+        return self.generator._find_safe_path(start, goal)
+
+    def _set_path(self, path):
+        stride = self.grid.stride
+        self.path = [x * stride + y for x, y in path]
+        # Cell index -> every position of the cell on the witness
+        self.position = {}
+        for k, index in enumerate(self.path):
+            self.position.setdefault(index, []).append(k)
+
+    def witness(self):
+        """Current safe path as a list of cells"""
+        stride = self.grid.stride
+        return [divmod(index, stride) for index in self.path]
+
+    def on_path(self, x, y):
+        """Checks whether the cell is part of the current witness"""
+        return x * self.grid.stride + y in self.position
+
+    def try_place_trap(self, x, y):
+        """Places a trap if a safe path survives, returns True on success"""
+        if not self.path:
+            return False
+
+        index = x * self.grid.stride + y
+        original = self.grid.get(x, y)
+        self.grid.set(x, y, TRAP)
+
+        # Every repair removes one broken run, the detour itself is safe
+        while True:
+            broken = self._broken_run(index)
+            if broken is None:
+                return True
+            if not self._repair(broken[0] - 1, broken[1] + 1):
+                self.grid.set(x, y, original)
+                return False
+
+    def _broken_run(self, index):
+        """(first, last) of a too long trap run through any visit of the cell, or None"""
+        cells = self.grid.cells
+        path = self.path
+        for k in self.position.get(index, ()):
+            first = k
+            while first > 0 and cells[path[first - 1]] == TRAP:
+                first -= 1
+            last = k
+            while last < len(path) - 1 and cells[path[last + 1]] == TRAP:
+                last += 1
+            if last - first + 1 > MAX_TRAPS_IN_ROW:
+                return first, last
+        return None
+
+    def _repair(self, before, after):
+        """Replaces the broken stretch of the witness by a safe detour"""
+        stride = self.grid.stride
+        if before >= 0 and after < len(self.path):
+            # Both ends are non-trap cells, so the trap counter is zero there
+            # and a detour between them can be spliced in directly
+            detour = self._local_search(divmod(self.path[before], stride),
+                                        divmod(self.path[after], stride))
+            if detour:
+                head = [divmod(index, stride) for index in self.path[:before]]
+                tail = [divmod(index, stride) for index in self.path[after + 1:]]
+                self._set_path(head + detour + tail)
+                return True
+
+        # No local detour, another route may still exist
+        path = self._search(self.start, self.goal)
+        if path:
+            self._set_path(path)
+            return True
+        return False
+
+    def _local_search(self, start, goal):
+        """Safe path between two cells within windows around them, doubled on failure"""
+        grid = self.grid
+        margin = REPAIR_MARGIN
+        while True:
+            top = max(0, min(start[0], goal[0]) - margin)
+            left = max(0, min(start[1], goal[1]) - margin)
+            bottom = min(grid.height, max(start[0], goal[0]) + margin + 1)
+            right = min(grid.width, max(start[1], goal[1]) + margin + 1)
+            if (top, left, bottom, right) == (0, 0, grid.height, grid.width):
+                # The window became the grid, the full search is left to the caller
+                return []
+            self.searches += 1
+            target = (goal[0] - top, goal[1] - left)
+            window = _Window(grid, top, left, bottom, right)
+            path = safe_search(window, (start[0] - top, start[1] - left), [target])[target]
+            if path:
+                return [(x + top, y + left) for x, y in path]
+            margin *= 2
+
+
+class _Window:
+    """Rectangle of a grid that the searches accept like a whole grid"""
+
+    def __init__(self, grid, top, left, bottom, right):
+        self.width = right - left
+        self.height = bottom - top
+        self._rows = grid.region(top, left, bottom, right)
+
+    def to_bytes(self):
+        return b''.join(self._rows)
+
+
+# Cell code -> search class: 0 blocked, 1 walkable (resets the trap run), 2 trap
+_BLOCKED, _WALKABLE, _TRAP = 0, 1, 2
+_CLASS_TABLE = bytes(
+    _TRAP if code == TRAP else _WALKABLE if code in (ROAD, EXIT, TREASURE) else _BLOCKED
+    for code in range(256))
+
+# Trap counts 0..MAX_TRAPS_IN_ROW per cell
+_STATES = MAX_TRAPS_IN_ROW + 1
+
+
+class SearchLayout:
+    """Grid classes with a one-cell blocked frame, so neighbours need no bounds checks"""
+
+    def __init__(self, grid):
+        width, height = grid.width, grid.height
+        self.stride = stride = width + 2
+        self.size = stride * (height + 2)
+        self.classes = bytearray(self.size)
+        data = grid.to_bytes().translate(_CLASS_TABLE)
+        for x in range(height):
+            start = (x + 1) * stride + 1
+            self.classes[start:start + width] = data[x * width:(x + 1) * width]
+        self.offsets = (stride, -stride, 1, -1)
+
+    def index(self, cell):
+        return (cell[0] + 1) * self.stride + cell[1] + 1
+
+    def cell(self, index):
+        x, y = divmod(index, self.stride)
+        return x - 1, y - 1
+
+    def path(self, parents, state):
+        """Cells from the start state to the given state"""
+        path = []
+        while True:
+            path.append(self.cell(state // _STATES))
+            parent = parents[state]
+            if parent == state:
+                break
+            state = parent
+        path.reverse()
+        return path
+
+
+def safe_search(grid, start, goals, stats=None):
+    """
+    Shortest safe paths from start to every goal
+
+    Every state is one int, cell_index * 3 + consecutive_traps, and the
+    parent of each state lives in a preallocated array ('i'); -1 marks
+    unvisited states. The search stops as soon as the last goal is reached.
+    Returns {goal: path}, with an empty path for unreachable goals.
+    The number of visited states is stored in stats['visited'] if given.
+    """
+    layout = SearchLayout(grid)
+    classes = layout.classes
+    offsets = layout.offsets
+    parents = array('i', [-1]) * (layout.size * _STATES)
+
+    targets = bytearray(layout.size)
+    for goal in goals:
+        targets[layout.index(goal)] = 1
+    found = {}
+
+    first = layout.index(start) * _STATES
+    parents[first] = first
+    if targets[first // _STATES]:
+        found[first // _STATES] = first
+    remaining = len(set(goals)) - len(found)
+
+    queue = [first]
+    push = queue.append
+    for state in queue:
+        if not remaining:
+            break
+        index, traps = divmod(state, _STATES)
+        for offset in offsets:
+            neighbour = index + offset
+            kind = classes[neighbour]
+            if not kind:
+                continue
+            if kind == _WALKABLE:
+                next_state = neighbour * _STATES
+            elif traps == MAX_TRAPS_IN_ROW:
+                continue  # Player would die on this trap
+            else:
+                next_state = neighbour * _STATES + traps + 1
+            if parents[next_state] == -1:
+                parents[next_state] = state
+                push(next_state)
+                if targets[neighbour] and neighbour not in found:
+                    found[neighbour] = next_state
+                    remaining -= 1
+
+    if stats is not None:
+        stats['visited'] = len(queue)
+    paths = {}
+    for goal in goals:
+        state = found.get(layout.index(goal))
+        paths[goal] = layout.path(parents, state) if state is not None else []
+    return paths
+
+
+def safe_search_tree(layout, start):
+    """
+    Safe BFS from start over every reachable state
+
+    Returns (parents, distances) indexed by state and the distance of
+    every cell in layout order (its cheapest state); -1 marks unreached
+    entries. Paths to any goal can then be read with layout.path().
+    """
+    classes = layout.classes
+    offsets = layout.offsets
+    size = layout.size * _STATES
+    parents = array('i', [-1]) * size
+    distances = array('i', [-1]) * size
+    cell_distances = array('i', [-1]) * layout.size
+
+    first = layout.index(start) * _STATES
+    parents[first] = first
+    distances[first] = 0
+    cell_distances[first // _STATES] = 0
+
+    queue = [first]
+    push = queue.append
+    for state in queue:
+        index, traps = divmod(state, _STATES)
+        step = distances[state] + 1
+        for offset in offsets:
+            neighbour = index + offset
+            kind = classes[neighbour]
+            if not kind:
+                continue
+            if kind == _WALKABLE:
+                next_state = neighbour * _STATES
+            elif traps == MAX_TRAPS_IN_ROW:
+                continue
+            else:
+                next_state = neighbour * _STATES + traps + 1
+            if parents[next_state] == -1:
+                parents[next_state] = state
+                distances[next_state] = step
+                if cell_distances[neighbour] == -1:
+                    cell_distances[neighbour] = step
+                push(next_state)
+    return parents, distances, cell_distances
+
+
+def safe_search_bidirectional(grid, start, goal, stats=None):
+    """
+    Safe path between two cells, searching from both ends at once
+
+    The backward search walks the state graph in reverse from every valid
+    goal state. The smaller frontier is expanded first and the search stops
+    when the two sides meet, so far fewer states are visited on open grids.
+    The path is safe but may be a little longer than the shortest one.
+    The number of visited states is stored in stats['visited'] if given.
+    """
+    layout = SearchLayout(grid)
+    classes = layout.classes
+    offsets = layout.offsets
+    size = layout.size * _STATES
+    forward = array('i', [-1]) * size
+    backward = array('i', [-1]) * size
+
+    start_index = layout.index(start)
+    goal_index = layout.index(goal)
+    first = start_index * _STATES
+    forward[first] = first
+    if stats is not None:
+        stats['visited'] = 1
+    if start_index == goal_index:
+        return [start]
+
+    goal_kind = classes[goal_index]
+    if goal_kind == _WALKABLE:
+        goal_states = [goal_index * _STATES]
+    elif goal_kind == _TRAP:
+        goal_states = [goal_index * _STATES + t for t in range(1, _STATES)]
+    else:
+        return []
+    for state in goal_states:
+        backward[state] = state
+
+    def predecessors(state):
+        """States that move into the given state in one step"""
+        index, traps = divmod(state, _STATES)
+        if classes[index] == _TRAP:
+            if traps == 0:
+                return
+            wanted = (traps - 1,)
+        else:
+            wanted = range(_STATES)
+        for offset in offsets:
+            neighbour = index + offset
+            kind = classes[neighbour]
+            for before in wanted:
+                if neighbour == start_index:
+                    if before == 0:
+                        yield first
+                elif kind == _WALKABLE and before == 0 or kind == _TRAP and before > 0:
+                    yield neighbour * _STATES + before
+
+    def successors(state):
+        index, traps = divmod(state, _STATES)
+        for offset in offsets:
+            neighbour = index + offset
+            kind = classes[neighbour]
+            if kind == _WALKABLE:
+                yield neighbour * _STATES
+            elif kind == _TRAP and traps < MAX_TRAPS_IN_ROW:
+                yield neighbour * _STATES + traps + 1
+
+    front, back = [first], goal_states
+    visited = 1 + len(goal_states)
+    meet = -1
+    while front and back and meet < 0:
+        if len(front) <= len(back):
+            level = []
+            for state in front:
+                for next_state in successors(state):
+                    if forward[next_state] == -1:
+                        forward[next_state] = state
+                        level.append(next_state)
+                        if backward[next_state] != -1:
+                            meet = next_state
+                            break
+                if meet >= 0:
+                    break
+            front = level
+            visited += len(level)
+        else:
+            level = []
+            for state in back:
+                for prev_state in predecessors(state):
+                    if backward[prev_state] == -1:
+                        backward[prev_state] = state
+                        level.append(prev_state)
+                        if forward[prev_state] != -1:
+                            meet = prev_state
+                            break
+                if meet >= 0:
+                    break
+            back = level
+            visited += len(level)
+
+    if stats is not None:
+        stats['visited'] = visited
+    if meet < 0:
+        return []
+    path = layout.path(forward, meet)
+    state = meet
+    while backward[state] != state:
+        state = backward[state]
+        path.append(layout.cell(state // _STATES))
+    return path
@@ -0,0 +1,80 @@
+"""
+Tests for the carving strategies
+"""
+
+import sys
+import os
+import random
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.maze_generator import MazeGenerator
+from src.maze_grid import ROAD, create_grid
+from src.carving import CARVING_STRATEGIES, TiledCarving, get_strategy, profile_strategy
+
+
+def _is_perfect(grid):
+    """All maze cells connected and exactly cells - 1 passages between them"""
+    rows, cols = (grid.height - 1) // 2, (grid.width - 1) // 2
+    passages = 0
+    for x in range(1, grid.height - 1):
+        for y in range(1, grid.width - 1):
+            if (x + y) % 2 == 1 and grid.get(x, y) == ROAD:
+                passages += 1
+    if passages != rows * cols - 1:
+        return False
+
+    seen = {(1, 1)}
+    stack = [(1, 1)]
+    while stack:
+        x, y = stack.pop()
+        for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            if grid.get(x + dx, y + dy) == ROAD and (x + 2 * dx, y + 2 * dy) not in seen:
+                seen.add((x + 2 * dx, y + 2 * dy))
+                stack.append((x + 2 * dx, y + 2 * dy))
+    return len(seen) == rows * cols
+
+
+def test_strategies_make_perfect_mazes():
+    """Every strategy carves a spanning tree"""
+    for name in CARVING_STRATEGIES:
+        grid = create_grid(25, 17)
+        get_strategy(name).carve(grid, random.Random(1))
+        assert _is_perfect(grid), name
+
+
+def test_pipeline_runs_on_every_strategy():
+    """Traps, treasure and validation work on top of any strategy"""
+    for name in CARVING_STRATEGIES:
+        generator = MazeGenerator(21, 15, seed=8, algorithm=name)
+        generator.generate()
+        assert generator.algorithm == name
+        assert generator.validate_maze(), name
+
+
+def test_tiled_carving_joins_tiles():
+    """Small tiles joined at their seams form one maze, whatever the worker count"""
+    for tile_size, inner in ((3, 'dfs'), (5, 'kruskal')):
+        serial = create_grid(41, 27)
+        TiledCarving(tile_size, workers=1, inner=inner).carve(serial, random.Random(4))
+        assert _is_perfect(serial)
+
+        parallel = create_grid(41, 27)
+        TiledCarving(tile_size, workers=2, inner=inner).carve(parallel, random.Random(4))
+        assert parallel.to_bytes() == serial.to_bytes()
+
+
+def test_profile_strategy():
+    """Profiling reports time and memory"""
+    report = profile_strategy('eller', 40, 30, seed=3)
+    assert report['width'] == 41 and report['height'] == 31
+    assert report['time'] > 0
+    assert report['peak_memory'] >= 0
+
+
+if __name__ == "__main__":
+    test_strategies_make_perfect_mazes()
+    test_pipeline_runs_on_every_strategy()
+    test_tiled_carving_joins_tiles()
+    test_profile_strategy()
+    print("All tests passed successfully!")
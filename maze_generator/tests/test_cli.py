@@ -0,0 +1,73 @@
+"""
+Tests for the maze-gen command line tool
+"""
+
+import sys
+import os
+import io
+import json
+import subprocess
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.cli import build_parser, run
+from src.maze_generator import MazeGenerator
+from src.maze_io import MazeFile
+
+
+def _run(argv):
+    out, err = io.BytesIO(), io.StringIO()
+    report = run(build_parser().parse_args(argv), stdout=out, stderr=err)
+    return out.getvalue(), err.getvalue(), report
+
+
+def test_ascii_output_matches_generator():
+    """Seeded ASCII output is the same maze to_ascii() gives"""
+    data, err, report = _run(['-n', '2', '-s', '21x15', '--seeds', '7'])
+    blocks = data.decode('utf-8').split('\n\n')
+    assert blocks[0].startswith('# maze 0 21x15 seed=7\n')
+    generator = MazeGenerator(21, 15, seed=8)
+    generator.generate()
+    assert blocks[1].split('\n', 1)[1] == generator.to_ascii()
+    assert report['count'] == 2 and 'mazes/s' in err
+
+
+def test_jsonl_seed_range():
+    """START:STOP sets the count and the seed of every line"""
+    data, _, _ = _run(['-f', 'jsonl', '--seeds', '3:6', '-s', '11x11', '-q'])
+    records = [json.loads(line) for line in data.decode('utf-8').splitlines()]
+    assert [record['seed'] for record in records] == [3, 4, 5]
+    assert len(records[0]['rows']) == 11
+
+
+def test_packed_shards():
+    """Packed records are complete maze files, spread over the shards"""
+    with tempfile.TemporaryDirectory() as folder:
+        pattern = os.path.join(folder, 'part-{shard}.maze')
+        _, _, report = _run(['-n', '4', '-s', '15x11', '--seeds', '1', '-f', 'packed',
+                             '-o', pattern, '--shards', '2', '-q'])
+        with MazeFile(os.path.join(folder, 'part-1.maze')) as maze_file:
+            assert maze_file.seed == 2 and maze_file.metadata == {'index': 1}
+            assert maze_file.width == 15
+        assert report['bytes'] == sum(
+            os.path.getsize(os.path.join(folder, f'part-{k}.maze')) for k in range(2))
+
+
+def test_import_stays_light():
+    """Importing the CLI loads neither tkinter, NumPy nor the generator"""
+    code = ("import sys; import src.cli; "
+            "print(any(name in sys.modules for name in "
+            "('tkinter', 'numpy', 'src.maze_generator')))")
+    root = os.path.join(os.path.dirname(__file__), '..')
+    output = subprocess.run([sys.executable, '-c', code], cwd=root,
+                            capture_output=True, text=True, check=True).stdout
+    assert output.strip() == 'False'
+
+
+if __name__ == "__main__":
+    test_ascii_output_matches_generator()
+    test_jsonl_seed_range()
+    test_packed_shards()
+    test_import_stays_light()
+    print("All tests passed successfully!")
@@ -0,0 +1,124 @@
+"""
+Tests for whole-grid analysis and cached statistics
+"""
+
+import sys
+import os
+from contextlib import contextmanager
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src import maze_analysis
+from src.maze_cell import MazeCell
+from src.maze_generator import MazeGenerator
+from src.maze_grid import create_grid
+from src.maze_analysis import border_cells, cell_counts, find_cell, open_border_access
+
+
+@contextmanager
+def numpy_handle(numpy):
+    """Forces the NumPy branch (a module) or the bytes fallback (False)"""
+    saved = maze_analysis._numpy
+    maze_analysis._numpy = numpy
+    try:
+        yield
+    finally:
+        maze_analysis._numpy = saved
+
+
+def _check_scans(backend='bytearray'):
+    generator = MazeGenerator(21, 15, seed=9, backend=backend)
+    generator.generate()
+    maze = generator.maze
+
+    counts = cell_counts(generator.grid)
+    for cell in MazeCell:
+        assert counts[cell] == sum(row.count(cell) for row in maze)
+
+    expected = [(x, y) for x in range(generator.height) for y in range(generator.width)
+                if (x in (0, generator.height - 1) or y in (0, generator.width - 1))
+                and maze[x][y] == MazeCell.ROAD]
+    assert sorted(border_cells(generator.grid)) == sorted(set(expected))
+
+    maze[3][3] = MazeCell.TREASURE
+    assert find_cell(generator.grid, MazeCell.TREASURE) == min(
+        (x, y) for x in range(generator.height) for y in range(generator.width)
+        if maze[x][y] == MazeCell.TREASURE)
+
+    # Inner roads reach the border wherever the outer wall is opened
+    grid = create_grid(9, 7, backend)
+    for x in range(1, 6):
+        for y in range(1, 8):
+            grid.set(x, y, MazeCell.ROAD)
+    open_border_access(grid)
+    assert sorted(border_cells(grid)) == sorted(
+        [(0, y) for y in (1, 3, 5, 7)] + [(6, y) for y in (1, 3, 5, 7)] +
+        [(x, 0) for x in (1, 3, 5)] + [(x, 8) for x in (1, 3, 5)])
+
+
+def test_scans_match_cell_by_cell():
+    """The bytes fallback of every scan equals a plain scan of maze[i][j]"""
+    with numpy_handle(False):
+        _check_scans()
+
+
+def test_numpy_scans_match_cell_by_cell():
+    """The NumPy branch of every scan, on both grid backends, gives the same"""
+    numpy = pytest.importorskip('numpy')
+    with numpy_handle(numpy):
+        _check_scans()
+        _check_scans('numpy')
+
+
+def test_numpy_backend_matches_bytearray():
+    """A seed gives the same maze and stats on the NumPy and bytearray backends"""
+    pytest.importorskip('numpy')
+    for seed in (1, 7):
+        plain = MazeGenerator(31, 21, seed=seed, trap_density=0.2)
+        plain.generate()
+        vectorized = MazeGenerator(31, 21, seed=seed, trap_density=0.2, backend='numpy')
+        vectorized.generate()
+        assert type(vectorized.grid).__name__ == 'NumpyMazeGrid'
+        assert vectorized.grid.to_bytes() == plain.grid.to_bytes()
+        assert (vectorized.entrance, vectorized.exit) == (plain.entrance, plain.exit)
+        assert vectorized.get_stats() == plain.get_stats()
+        with numpy_handle(False):
+            vectorized.clear_caches()
+            assert vectorized.get_stats() == plain.get_stats()
+
+
+def test_stats_cached_until_mutation():
+    """get_stats() reuses its result until the grid changes"""
+    generator = MazeGenerator(21, 15, seed=4)
+    generator.generate()
+
+    calls = []
+    search = generator._find_safe_path
+
+    def counting_search(start, goal):
+        calls.append((start, goal))
+        return search(start, goal)
+
+    generator._find_safe_path = counting_search
+    first = generator.get_stats()
+    assert generator.get_stats() == first
+    assert len(calls) == 1
+
+    x, y = next((x, y) for x in range(generator.height) for y in range(generator.width)
+                if generator.maze[x][y] == MazeCell.WALL)
+    generator.maze[x][y] = MazeCell.TRAP
+    assert generator.get_stats()['trap_cells'] == first['trap_cells'] + 1
+    assert len(calls) == 2
+
+
+if __name__ == "__main__":
+    test_scans_match_cell_by_cell()
+    try:
+        test_numpy_scans_match_cell_by_cell()
+        test_numpy_backend_matches_bytearray()
+    except pytest.skip.Exception:
+        print("NumPy is not installed, its tests were skipped")
+    test_stats_cached_until_mutation()
+    print("All tests passed successfully!")
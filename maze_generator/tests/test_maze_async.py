@@ -0,0 +1,130 @@
+"""
+Tests for the asyncio generation service
+"""
+
+import sys
+import os
+import asyncio
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src import maze_async
+from src.maze_async import MazeService, generate_async
+from src.maze_generator import MazeGenerator
+
+
+def test_identical_requests_are_coalesced():
+    """Concurrent requests for the same seeded maze share one generation"""
+    async def main():
+        async with MazeService(max_concurrent=2) as service:
+            results = await asyncio.gather(
+                *[service.generate(41, 31, seed=3) for _ in range(4)],
+                service.generate(41, 31, seed=4))
+            return results, service.stats()
+
+    results, stats = asyncio.run(main())
+    assert all(result is results[0] for result in results[:4])
+    assert results[4] is not results[0]
+    assert stats['coalesced'] == 3 and stats['completed'] == 2
+
+    expected = MazeGenerator(41, 31, seed=3)
+    expected.generate()
+    assert results[0].fingerprint() == expected.fingerprint()
+
+
+def test_timeout_cancels_generation():
+    """A timed out request stops its generator instead of finishing it"""
+    async def main():
+        async with MazeService(max_concurrent=1) as service:
+            start = time.perf_counter()
+            try:
+                await service.generate(1501, 1501, seed=1, timeout=0.05)
+            except asyncio.TimeoutError:
+                pass
+            else:
+                raise AssertionError("expected a timeout")
+            # The slot is free again soon after the cancel
+            maze = await service.generate(21, 15, seed=1, timeout=5)
+            return maze, time.perf_counter() - start, service.stats()
+
+    maze, elapsed, stats = asyncio.run(main())
+    assert maze.width == 21
+    assert stats['timeouts'] == 1 and stats['cancelled'] == 1
+    assert stats['completed'] == 1 and stats['in_flight'] == 0
+    assert elapsed < 2
+
+
+def test_concurrency_is_bounded():
+    """No more generations run at once than the semaphore allows"""
+    lock = threading.Lock()
+    running = [0, 0]
+    original = maze_async._generate
+
+    def counting(*args):
+        with lock:
+            running[0] += 1
+            running[1] = max(running[1], running[0])
+        try:
+            time.sleep(0.01)
+            return original(*args)
+        finally:
+            with lock:
+                running[0] -= 1
+
+    async def main():
+        service = MazeService(max_concurrent=2, executor=maze_async.ThreadPoolExecutor(8))
+        await asyncio.gather(*[service.generate(21, 15) for _ in range(8)])
+        await asyncio.gather(generate_async(21, 15, seed=2, service=service))
+        service.executor.shutdown()
+
+    maze_async._generate = counting
+    try:
+        asyncio.run(main())
+    finally:
+        maze_async._generate = original
+    assert running[1] == 2
+
+
+def test_unhashable_parameters_run_alone():
+    """Requests that cannot be coalesced still succeed, and close() cancels queued work"""
+    original = maze_async._generate
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking(width, height, params, cancel):
+        started.set()
+        release.wait(5)
+        return params['tags']
+
+    async def main():
+        executor = maze_async.ThreadPoolExecutor(1)
+        service = MazeService(max_concurrent=2, executor=executor)
+        tasks = [asyncio.ensure_future(service.generate(21, 15, seed=1, tags=['a']))
+                 for _ in range(2)]
+        while not started.is_set() and not any(task.done() for task in tasks):
+            await asyncio.sleep(0.01)
+        # The second request waits behind the first one in the executor
+        service.close()
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        executor.shutdown()
+        return results, service.stats()
+
+    maze_async._generate = blocking
+    try:
+        results, stats = asyncio.run(main())
+    finally:
+        maze_async._generate = original
+    assert results[0] == ['a']
+    assert isinstance(results[1], asyncio.CancelledError)
+    assert stats['coalesced'] == 0 and stats['completed'] == 1
+
+
+if __name__ == "__main__":
+    test_identical_requests_are_coalesced()
+    test_timeout_cancels_generation()
+    test_concurrency_is_bounded()
+    test_unhashable_parameters_run_alone()
+    print("All tests passed successfully!")
@@ -0,0 +1,145 @@
+"""
+Tests for ASCII, PGM and PNG export
+"""
+
+import sys
+import os
+import io
+import struct
+import tempfile
+import zlib
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.maze_cell import SYMBOLS
+from src.maze_export import (PATH_INDEX, _gray, export_image, palette, to_ascii,
+                             write_pgm, write_png)
+from src.maze_generator import MazeGenerator
+from src.maze_grid import ROAD, WALL
+from src.maze_io import MazeFile
+
+
+def make_maze():
+    generator = MazeGenerator(21, 15, seed=4)
+    generator.generate()
+    return generator
+
+
+def read_png(data):
+    """(width, height, palette bytes, pixel rows) of a palette PNG"""
+    assert data[:8] == b'\x89PNG\r\n\x1a\n'
+    chunks = {}
+    position = 8
+    while position < len(data):
+        size, = struct.unpack('>I', data[position:position + 4])
+        kind = data[position + 4:position + 8]
+        body = data[position + 8:position + 8 + size]
+        crc, = struct.unpack('>I', data[position + 8 + size:position + 12 + size])
+        assert crc == zlib.crc32(body, zlib.crc32(kind)) & 0xffffffff
+        chunks[kind] = chunks.get(kind, b'') + body
+        position += 12 + size
+    assert b'IEND' in chunks
+    width, height, depth, color_type = struct.unpack('>IIBB', chunks[b'IHDR'][:10])
+    assert (depth, color_type) == (8, 3)
+    raw = zlib.decompress(chunks[b'IDAT'])
+    rows = [raw[i * (width + 1):(i + 1) * (width + 1)] for i in range(height)]
+    assert all(row[0] == 0 for row in rows)
+    return width, height, chunks[b'PLTE'], [row[1:] for row in rows]
+
+
+def test_ascii_matches_symbols():
+    """The translate table gives the same text as the symbol lookup"""
+    generator = make_maze()
+    grid = generator.grid
+    expected = '\n'.join(''.join(SYMBOLS[code] for code in grid.row_codes(i))
+                         for i in range(grid.height))
+    assert to_ascii(grid) == expected
+    assert generator.to_ascii() == expected
+
+
+def test_png_pixels_and_scale():
+    """Every cell becomes a cell_size square of its palette index"""
+    generator = make_maze()
+    out = io.BytesIO()
+    written = write_png(generator, out, cell_size=3)
+    assert written == len(out.getvalue())
+
+    width, height, colors, rows = read_png(out.getvalue())
+    assert (width, height) == (21 * 3, 15 * 3)
+    assert colors == b''.join(bytes(rgb) for rgb in palette())
+    for x in range(15):
+        expected = bytes(code for code in generator.grid.row_codes(x) for _ in range(3))
+        assert rows[3 * x] == rows[3 * x + 2] == expected
+
+
+def test_solution_overlay():
+    """Road cells of the path get the path colour, other cells keep theirs"""
+    generator = make_maze()
+    path = generator.solver().path('entrance', 'exit')
+    assert path
+    out = io.BytesIO()
+    write_png(generator, out, path=path)
+    _, _, _, rows = read_png(out.getvalue())
+    for x, y in path:
+        code = generator.grid.get(x, y)
+        assert rows[x][y] == (PATH_INDEX if code == ROAD else code)
+    assert sum(row.count(PATH_INDEX) for row in rows) == sum(
+        generator.grid.get(x, y) == ROAD for x, y in path)
+
+
+def test_write_pgm_header_and_size():
+    """write_pgm returns the bytes written and scales every cell"""
+    generator = make_maze()
+    out = io.BytesIO()
+    written = write_pgm(generator, out, cell_size=3)
+    data = out.getvalue()
+    assert written == len(data)
+
+    header = b'P5\n63 45\n255\n'
+    assert data.startswith(header)
+    assert len(data) == len(header) + 63 * 45
+    shades = bytes(_gray(rgb) for rgb in palette())
+    pixels = data[len(header):]
+    for x in range(15):
+        expected = bytes(shades[code] for code in generator.grid.row_codes(x) for _ in range(3))
+        assert pixels[3 * x * 63:(3 * x + 1) * 63] == expected
+
+
+def test_pgm_and_files():
+    """PGM shades cells by brightness; MazeFile sources and file names work"""
+    generator = make_maze()
+    with tempfile.TemporaryDirectory() as directory:
+        maze_path = os.path.join(directory, 'maze.bin')
+        generator.save(maze_path)
+        image_path = os.path.join(directory, 'maze.pgm')
+        with MazeFile(maze_path) as maze_file:
+            written = export_image(maze_file, image_path, cell_size=2)
+        with open(image_path, 'rb') as fp:
+            data = fp.read()
+        assert written == len(data)
+
+        header = b'P5\n42 30\n255\n'
+        assert data.startswith(header)
+        pixels = data[len(header):]
+        assert len(pixels) == 42 * 30
+        # Walls are black and roads white
+        shades = {WALL: 0, ROAD: 255}
+        for y, code in enumerate(generator.grid.row_codes(1)):
+            if code in shades:
+                assert pixels[2 * 42 + 2 * y] == pixels[3 * 42 + 2 * y + 1] == shades[code]
+
+        try:
+            export_image(generator, os.path.join(directory, 'maze.gif'))
+        except ValueError:
+            pass
+        else:
+            assert False, "ValueError expected"
+
+
+if __name__ == "__main__":
+    test_ascii_matches_symbols()
+    test_png_pixels_and_scale()
+    test_solution_overlay()
+    test_write_pgm_header_and_size()
+    test_pgm_and_files()
+    print("All tests passed successfully!")
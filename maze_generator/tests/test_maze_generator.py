@@ -4,10 +4,11 @@ Tests for generating mazes
 
 import sys
 import os
+import threading
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from src.maze_generator import MazeGenerator, MazeCell
+from src.maze_generator import MazeGenerator, MazeCell, GenerationCancelled
 
 
 def test_maze_initialization():
@@ -75,10 +76,152 @@ def test_trap_safety():
             consecutive_traps = 0
 
 
+def test_seed_reproducibility():
+    """Same size and seed give byte-identical mazes"""
+    first = MazeGenerator(31, 21, seed=42)
+    first.generate()
+    second = MazeGenerator(31, 21, seed=42)
+    second.generate()
+    assert first.grid.to_bytes() == second.grid.to_bytes()
+    assert first.fingerprint() == second.fingerprint()
+
+    other = MazeGenerator(31, 21, seed=43)
+    other.generate()
+    assert other.fingerprint() != first.fingerprint()
+
+
+def test_rng_instance():
+    """An explicit rng drives generation instead of the global random module"""
+    import random
+    first = MazeGenerator(21, 15, rng=random.Random(7))
+    first.generate()
+    random.seed(0)
+    second = MazeGenerator(21, 15, rng=random.Random(7))
+    second.generate()
+    assert first.to_ascii() == second.to_ascii()
+
+
+def test_bounded_searches():
+    """Generation, validation and stats share cached search results"""
+    generator = MazeGenerator(31, 21, seed=5)
+    generator.generate()
+    generator.validate_maze()
+    generator.get_stats()
+    counts = generator.search_counts
+    assert counts['bfs'] + counts['safe_search'] <= 2
+    assert counts['cache_hits'] >= 1
+
+
+def test_bfs_walks_through_traps_and_treasure():
+    """Traps and treasure on the only route do not cut the plain path"""
+    generator = MazeGenerator(21, 15, seed=6, trap_density=0)
+    generator.generate()
+    path = generator._bfs(generator.entrance, generator.exit)
+    assert len(path) > 4
+    generator.maze[path[1][0]][path[1][1]] = MazeCell.TRAP
+    generator.maze[path[3][0]][path[3][1]] = MazeCell.TREASURE
+    # Stopping at them, as the search once did, would find no path at all
+    assert generator._bfs(generator.entrance, generator.exit) == path
+
+
+def test_unreachable_treasure_fails_validation():
+    """A walled-in treasure is reported by the single validation search"""
+    generator = MazeGenerator(21, 15, seed=2)
+    generator.generate()
+    for x in range(generator.height):
+        for y in range(generator.width):
+            if generator.maze[x][y] == MazeCell.TREASURE:
+                generator.maze[x][y] = MazeCell.ROAD
+    # Corner cell whose two neighbours are walls
+    generator.maze[0][1] = MazeCell.WALL
+    generator.maze[1][0] = MazeCell.WALL
+    generator.maze[0][0] = MazeCell.TREASURE
+    assert generator.validate_maze() == False
+
+
+def test_progress_reports_and_phase_times():
+    """Progress goes through every phase and does not change the maze"""
+    reports = []
+    generator = MazeGenerator(201, 201, seed=4, trap_density=0.05,
+                              progress=lambda *report: reports.append(report))
+    generator.generate()
+    plain = MazeGenerator(201, 201, seed=4, trap_density=0.05)
+    plain.generate()
+    assert generator.to_ascii() == plain.to_ascii()
+
+    phases = [phase for phase, done, total in reports]
+    assert phases.index('carve') < phases.index('traps') < phases.index('validate')
+    assert max(done for phase, done, total in reports if phase == 'carve') > 0
+    assert set(generator.phase_times) == {'carve', 'traps', 'validate'}
+
+
+def test_cancel_stops_generation():
+    """A set cancel event stops generate() from inside carving"""
+    cancel = threading.Event()
+
+    def progress(phase, done, total):
+        if done >= 2048:
+            cancel.set()
+
+    generator = MazeGenerator(201, 201, seed=1, progress=progress, cancel=cancel)
+    try:
+        generator.generate()
+    except GenerationCancelled:
+        pass
+    else:
+        assert False, "generation was not cancelled"
+    assert generator.entrance is None
+
+
+def test_metrics_and_hooks():
+    """Instrumented runs record every phase and forward records to hooks"""
+    received = []
+    generator = MazeGenerator(101, 101, seed=3, trap_density=0.05, instrument='memory',
+                              hooks=lambda phase, record: received.append(phase))
+    generator.generate()
+    metrics = generator.metrics
+    assert received == ['carve', 'traps', 'treasure', 'validate', 'total']
+    assert set(metrics['traps']) == {'time', 'bfs', 'safe_search', 'cache_hits',
+                                     'visited', 'attempts', 'peak_memory'}
+    assert metrics['total']['visited'] == generator.search_counts['visited'] > 0
+    assert metrics['carve']['peak_memory'] > 0
+
+    plain = MazeGenerator(101, 101, seed=3, trap_density=0.05)
+    plain.generate()
+    assert plain.metrics == {}
+    assert plain.to_ascii() == generator.to_ascii()
+
+
+def test_metrics_count_regeneration_attempts():
+    """Failed validation shows up as a regenerate phase with its attempts"""
+    class FailOnce(MazeGenerator):
+        failed = False
+
+        def validate_maze(self):
+            if not self.failed:
+                self.failed = True
+                return False
+            return super().validate_maze()
+
+    generator = FailOnce(21, 15, seed=1, instrument=True)
+    generator.generate()
+    assert generator.metrics['regenerate']['attempts'] == 1
+    assert generator.metrics['regenerate']['peak_memory'] is None
+
+
 if __name__ == "__main__":
     test_maze_initialization()
     test_maze_generation()
     test_maze_validation()
     test_ascii_output()
     test_trap_safety()
+    test_seed_reproducibility()
+    test_rng_instance()
+    test_bounded_searches()
+    test_bfs_walks_through_traps_and_treasure()
+    test_unreachable_treasure_fails_validation()
+    test_progress_reports_and_phase_times()
+    test_cancel_stops_generation()
+    test_metrics_and_hooks()
+    test_metrics_count_regeneration_attempts()
     print("All tests passed successfully!")
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""
+Tests for the corridor-compressed maze graph
+"""
+
+import sys
+import os
+import random
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.maze_generator import MazeGenerator
+from src.maze_graph import MazeGraph
+from src.maze_grid import WALL, ROAD, TRAP, create_grid
+from src.safe_path import safe_search
+
+
+def _generated(seed, width=41, height=31, **kwargs):
+    generator = MazeGenerator(width, height, seed=seed, **kwargs)
+    generator.generate()
+    return generator
+
+
+def test_paths_match_grid_search():
+    """Graph and grid searches find safe paths of the same length"""
+    for algorithm in ('dfs', 'kruskal', 'sidewinder'):
+        generator = _generated(3, trap_density=0.5, algorithm=algorithm)
+        graph = MazeGraph(generator.grid, (generator.entrance, generator.exit))
+        nodes = [graph.layout.cell(index) for index in graph.cells]
+        nodes.remove(generator.entrance)
+        rng = random.Random(algorithm)
+        for start in [generator.entrance] + rng.sample(nodes, 5):
+            goals = rng.sample(nodes, 10)
+            expected = safe_search(generator.grid, start, goals)
+            for goal, path in graph.safe_paths(start, goals).items():
+                assert len(path) == len(expected[goal])
+                if path:
+                    assert path[0] == start and path[-1] == goal
+                    assert all(abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1
+                               for a, b in zip(path, path[1:]))
+
+
+def test_step_aside_resets_trap_run():
+    """A trap junction reached with two traps is left after a step to a side road"""
+    grid = create_grid(7, 4)
+    for y, code in enumerate((ROAD, TRAP, TRAP, TRAP, ROAD), start=1):
+        grid.set(1, y, code)
+    grid.set(2, 3, ROAD)
+    graph = MazeGraph(grid)
+    path = graph.safe_paths((1, 1), ((1, 5),))[(1, 5)]
+    assert path == [(1, 1), (1, 2), (1, 3), (2, 3), (1, 3), (1, 4), (1, 5)]
+
+    grid.set(2, 3, WALL)
+    assert MazeGraph(grid).safe_paths((1, 1), ((1, 5),))[(1, 5)] == []
+
+
+def test_validation_visits_fewer_states():
+    """validate_maze() searches the cached graph with far fewer states"""
+    generator = _generated(1, 201, 201, trap_density=0.02)
+    graph = generator.graph()
+    assert graph.node_count * 5 < graph.walkable
+    assert generator.graph() is graph
+
+    generator._invalidate_caches()
+    generator.search_counts['visited'] = 0
+    assert generator.validate_maze()
+    on_graph = generator.search_counts['visited']
+
+    stats = {}
+    safe_search(generator.grid, generator.entrance, (generator.exit,), stats)
+    assert on_graph * 5 < stats['visited']
+
+
+if __name__ == "__main__":
+    test_paths_match_grid_search()
+    test_step_aside_resets_trap_run()
+    test_validation_visits_fewer_states()
+    print("All tests passed successfully!")
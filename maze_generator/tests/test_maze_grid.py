@@ -0,0 +1,62 @@
+"""
+Tests for the flat grid storage
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.maze_cell import MazeCell
+from src.maze_generator import MazeGenerator
+from src.maze_grid import MazeGrid, create_grid, ROAD, TRAP
+
+
+def test_grid_row_view():
+    """Row view reads and writes the flat buffer"""
+    grid = create_grid(7, 5)
+    grid[2][3] = MazeCell.ROAD
+    assert grid.get(2, 3) == ROAD
+    assert grid[2][3] == MazeCell.ROAD
+    assert grid[2][-4] is MazeCell.ROAD
+    assert grid[2].count(MazeCell.ROAD) == 1
+    assert MazeCell.ROAD in grid[2]
+    assert MazeCell.ROAD not in grid[1]
+    assert len(grid) == 5 and len(grid[0]) == 7
+
+
+def test_grid_version_changes_on_write():
+    """Every write bumps the mutation counter"""
+    grid = create_grid(5, 5)
+    version = grid.version
+    grid.set(1, 1, TRAP)
+    grid[1][2] = MazeCell.ROAD
+    assert grid.version == version + 2
+
+
+def test_grid_compatible_with_rows():
+    """Generated grid matches its list-of-lists conversion"""
+    generator = MazeGenerator(15, 11)
+    generator.generate()
+    rows = generator.maze.to_rows()
+    assert generator.maze == rows
+    assert MazeGrid.from_rows(rows).to_bytes() == generator.grid.to_bytes()
+    assert generator.grid.bytes_per_cell < 2
+
+
+def test_unknown_backend():
+    """Unknown backends are rejected"""
+    try:
+        create_grid(5, 5, backend='tape')
+    except ValueError:
+        pass
+    else:
+        assert False, "ValueError expected"
+
+
+if __name__ == "__main__":
+    test_grid_row_view()
+    test_grid_version_changes_on_write()
+    test_grid_compatible_with_rows()
+    test_unknown_backend()
+    print("All tests passed successfully!")
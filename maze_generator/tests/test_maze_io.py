@@ -0,0 +1,102 @@
+"""
+Tests for the binary maze file format
+"""
+
+import sys
+import os
+import io
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.maze_generator import MazeGenerator
+from src.maze_io import MazeFile, pack_row, unpack_row, write_ascii
+
+
+def test_pack_roundtrip():
+    """Packing keeps every cell code, odd and even widths"""
+    for row in (bytes([0, 1, 2, 3, 4, 5, 1]), bytes([5, 4, 3, 2])):
+        packed = pack_row(row)
+        assert len(packed) == (len(row) + 1) // 2
+        assert unpack_row(packed, len(row)) == row
+
+
+def test_save_and_load():
+    """A saved maze loads back identical"""
+    generator = MazeGenerator(31, 21, seed=12)
+    generator.generate()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'maze.bin')
+        generator.save(path, metadata={'name': 'test'})
+        loaded = MazeGenerator.load(path)
+
+        assert loaded.fingerprint() == generator.fingerprint()
+        assert loaded.seed == 12
+        assert loaded.validate_maze()
+
+        with MazeFile(path) as maze_file:
+            assert maze_file.metadata == {'name': 'test'}
+            assert maze_file.row(5) == generator.grid.row_codes(5)
+            region = maze_file.region(2, 3, 6, 10)
+            assert region == [generator.grid.row_codes(i)[3:10] for i in range(2, 6)]
+
+
+def test_region_clamps_windows():
+    """Out-of-range and inverted windows agree between grid and file"""
+    generator = MazeGenerator(21, 15, seed=3)
+    generator.generate()
+    grid = generator.grid
+    windows = [
+        (0, -2, 8, -1),      # left of the grid
+        (0, 30, 8, 40),      # right of the grid
+        (-5, -5, 3, 4),      # overlapping the top left corner
+        (10, 15, 40, 40),    # overlapping the bottom right corner
+        (20, 0, 30, 5),      # below the grid
+        (5, 10, 2, 3),       # inverted
+        (-3, -3, 100, 100),  # around the whole grid
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'maze.bin')
+        generator.save(path)
+        with MazeFile(path) as maze_file:
+            for top, left, bottom, right in windows:
+                rows = grid.region(top, left, bottom, right)
+                assert rows == maze_file.region(top, left, bottom, right)
+                x0, x1 = max(0, top), min(grid.height, bottom)
+                y0, y1 = max(0, left), min(grid.width, right)
+                expected = [grid.row_codes(x)[y0:y1] if y1 > y0 else b''
+                            for x in range(x0, x1)]
+                assert rows == expected
+
+
+def test_streaming_ascii():
+    """Streamed ASCII equals to_ascii()"""
+    generator = MazeGenerator(21, 15, seed=1)
+    generator.generate()
+    out = io.StringIO()
+    write_ascii(generator, out)
+    assert out.getvalue() == generator.to_ascii()
+
+
+def test_rejects_other_files():
+    """Files without the maze header are refused"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'other.bin')
+        with open(path, 'wb') as fp:
+            fp.write(b'not a maze file at all, just some bytes here')
+        try:
+            MazeFile(path)
+        except ValueError:
+            pass
+        else:
+            assert False, "ValueError expected"
+
+
+if __name__ == "__main__":
+    test_pack_roundtrip()
+    test_save_and_load()
+    test_region_clamps_windows()
+    test_streaming_ascii()
+    test_rejects_other_files()
+    print("All tests passed successfully!")
@@ -0,0 +1,126 @@
+"""
+Tests for the pre-generated maze pool
+"""
+
+import sys
+import os
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src import maze_pool
+from src.maze_generator import MazeGenerator
+from src.maze_pool import MazePool
+
+
+def test_warm_pool_hits_and_refills():
+    """Warm requests are hits and every taken maze is replaced"""
+    with MazePool(size=3) as pool:
+        pool.warm(21, 15, wait=True, trap_density=0.05)
+        assert pool.stats()['ready'] == 3
+
+        generator = pool.get(21, 15, trap_density=0.05)
+        assert generator.width == 21 and generator.validate_maze()
+        assert generator.trap_density == 0.05
+        pool.join()
+
+        stats = pool.stats()
+        assert stats['hits'] == 1 and stats['misses'] == 0
+        assert stats['ready'] == 3 and stats['refills'] == 4
+        assert stats['refill_lag_max'] >= stats['refill_lag_avg'] > 0
+
+
+def test_cold_key_is_generated_in_caller():
+    """A miss still returns a maze and warms the key; even sizes share the key"""
+    with MazePool(size=2) as pool:
+        generator = pool.get(20, 14)
+        assert (generator.width, generator.height) == (21, 15)
+        pool.join()
+        stats = pool.stats()
+        assert stats['misses'] == 1 and stats['ready'] == 2
+        pool.get(21, 15)
+        assert pool.stats()['hit_rate'] == 0.5
+
+
+def test_seed_is_rejected():
+    """Seeded requests would always return the same maze"""
+    with MazePool() as pool:
+        try:
+            pool.get(21, 15, seed=1)
+        except ValueError:
+            pass
+        else:
+            assert False, "seed was accepted"
+
+
+class ColoredGenerator(MazeGenerator):
+    """Generator taking a list parameter, which cannot be part of a pool key"""
+
+    def __init__(self, width, height, colors=None, **params):
+        super().__init__(width, height, **params)
+        self.colors = colors
+
+
+def test_unhashable_parameters_bypass_pool():
+    """Requests that cannot be keyed are generated in the caller, not pooled"""
+    assert MazePool.key(21, 15, {'colors': ['red']}) is None
+    maze_pool.MazeGenerator = ColoredGenerator
+    try:
+        with MazePool(size=2) as pool:
+            pool.warm(21, 15, wait=True, colors=['red'])
+            generator = pool.get(21, 15, colors=['red'])
+            stats = pool.stats()
+    finally:
+        maze_pool.MazeGenerator = MazeGenerator
+    assert generator.colors == ['red'] and generator.validate_maze()
+    assert stats['misses'] == 1 and stats['ready'] == 0 and stats['pending'] == 0
+
+
+def test_memory_budget_spills_least_recent_key():
+    """Over the budget, mazes of the older key move to disk and are served from there"""
+    with MazePool(size=2, memory_budget=25000, spill_dir=True) as pool:
+        spill_dir = pool.spill_dir
+        pool.warm(101, 101, wait=True)
+        pool.warm(99, 99, wait=True)
+        stats = pool.stats()
+        assert stats['memory'] <= 25000
+        assert stats['spilled'] >= 1 and stats['on_disk'] == stats['spilled']
+
+        generator = pool.get(101, 101)
+        assert generator.width == 101 and generator.validate_maze()
+        assert pool.stats()['disk_hits'] + pool.stats()['hits'] == 1
+    assert not os.path.exists(spill_dir)
+
+
+def test_spilling_mazes_count_against_size():
+    """Mazes on their way to disk are not scheduled again"""
+    with MazePool(size=2, memory_budget=0, spill_dir=True) as pool:
+        spill = pool._spill
+        writing, release = threading.Event(), threading.Event()
+
+        def slow_spill(key, generator):
+            writing.set()
+            release.wait()
+            spill(key, generator)
+
+        pool._spill = slow_spill
+        pool.warm(21, 15)
+        assert writing.wait(10)
+        # One maze is being written, the other one is still queued
+        pool.warm(21, 15)
+        release.set()
+        pool.join()
+
+        stats = pool.stats()
+        assert stats['refills'] == 2
+        assert stats['on_disk'] + stats['ready'] == 2 and stats['pending'] == 0
+
+
+if __name__ == "__main__":
+    test_warm_pool_hits_and_refills()
+    test_cold_key_is_generated_in_caller()
+    test_seed_is_rejected()
+    test_unhashable_parameters_bypass_pool()
+    test_memory_budget_spills_least_recent_key()
+    test_spilling_mazes_count_against_size()
+    print("All tests passed successfully!")
@@ -0,0 +1,70 @@
+"""
+Tests for bitmap rendering, without a display
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.maze_cell import MazeCell
+from src.maze_generator import MazeGenerator
+from src.maze_render import BitmapRenderer, cell_size_for
+
+
+class StubImage:
+    """Records PhotoImage.put calls"""
+
+    def __init__(self):
+        self.calls = []
+
+    def put(self, data, to=None):
+        self.calls.append((data, to))
+
+
+def test_cell_size_never_zero():
+    """Large mazes still get one pixel per cell"""
+    assert cell_size_for(21, 15) == 23
+    assert cell_size_for(1001, 1001) == 1
+
+
+def test_full_then_dirty_render():
+    """Only changed rows are drawn again"""
+    generator = MazeGenerator(21, 15, seed=1)
+    generator.generate()
+    image = StubImage()
+    renderer = BitmapRenderer(image, cell_size=10)
+
+    assert renderer.render(generator.maze) == 15
+    # Every row: one fill call and one outline call
+    assert len(image.calls) == 30
+    data, to = image.calls[0]
+    assert to == (0, 0, 210, 9)
+    # Nine fill pixels and one outline pixel per cell
+    assert data.count('#') == 21 * 10
+
+    image.calls.clear()
+    assert renderer.render(generator.maze) == 0
+    assert image.calls == []
+
+    x, y = next((x, y) for x in range(1, 14) for y in range(1, 20)
+                if generator.maze[x][y] == MazeCell.ROAD)
+    generator.maze[x][y] = MazeCell.TRAP
+    assert renderer.render(generator.maze) == 1
+    assert image.calls[0][1] == (y * 10, x * 10, (y + 1) * 10, x * 10 + 9)
+
+
+def test_labels_for_special_cells():
+    """Entrance and exit get their letters"""
+    generator = MazeGenerator(21, 15, seed=1)
+    generator.generate()
+    texts = [label[2] for label in BitmapRenderer(StubImage(), 10).labels(generator.maze)]
+    assert 'E' in texts and 'X' in texts
+    assert BitmapRenderer(StubImage(), 2).labels(generator.maze) == []
+
+
+if __name__ == "__main__":
+    test_cell_size_never_zero()
+    test_full_then_dirty_render()
+    test_labels_for_special_cells()
+    print("All tests passed successfully!")
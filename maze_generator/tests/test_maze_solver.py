@@ -0,0 +1,111 @@
+"""
+Tests for the multi-query maze solver
+"""
+
+import sys
+import os
+import random
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.maze_generator import MazeGenerator
+from src.maze_grid import WALL, ROAD, ENTRANCE, TRAP, create_grid
+from src.maze_solver import MazeSolver
+from src.safe_path import safe_search
+
+
+def _generated(seed, **kwargs):
+    generator = MazeGenerator(31, 21, seed=seed, **kwargs)
+    generator.generate()
+    return generator
+
+
+def _walkable(generator):
+    return [(x, y) for x in range(generator.height) for y in range(generator.width)
+            if generator.grid.get(x, y) not in (WALL, ENTRANCE)]
+
+
+def test_distances_match_safe_search():
+    """Tree queries and their BFS fallback agree with the generator's search"""
+    for algorithm in ('dfs', 'kruskal', 'binary_tree'):
+        generator = _generated(2, trap_density=0.4, algorithm=algorithm)
+        solver = MazeSolver(generator)
+        assert solver.is_tree
+        cells = _walkable(generator)
+        rng = random.Random(algorithm)
+        for _ in range(100):
+            start, goal = rng.choice(cells), rng.choice(cells)
+            expected = safe_search(generator.grid, start, (goal,))[goal]
+            assert solver.distance(start, goal) == len(expected) - 1
+            path = solver.path(start, goal)
+            assert len(path) == len(expected)
+            if path:
+                assert path[0] == start and path[-1] == goal
+
+
+def test_fields_of_named_cells():
+    """The entrance field holds the safe path length to the exit"""
+    generator = _generated(4, trap_density=0.1)
+    solver = generator.solver()
+    safe_path = generator._find_safe_path(generator.entrance, generator.exit)
+    x, y = generator.exit
+    assert solver.fields['entrance'][x * generator.width + y] == len(safe_path) - 1
+    assert solver.distance('entrance', 'exit') == len(safe_path) - 1
+    assert solver.distance('exit', 'entrance') == len(safe_path) - 1
+    assert generator.solver() is solver
+
+
+def test_detour_resets_trap_run():
+    """A side step off a trap run gives a safe walk longer than the tree path"""
+    grid = create_grid(7, 4)
+    for y, code in enumerate((ROAD, TRAP, TRAP, TRAP, ROAD), start=1):
+        grid.set(1, y, code)
+    grid.set(2, 3, ROAD)
+    solver = MazeSolver(grid)
+    assert solver.is_tree
+    assert solver.distance((1, 1), (1, 5)) == 6
+    assert solver.path((1, 1), (1, 5))[3] == (2, 3)
+
+    grid.set(2, 3, WALL)
+    assert solver.distance((1, 1), (1, 5)) == -1
+    assert solver.path((1, 1), (1, 5)) == []
+
+
+def test_mazes_with_loops():
+    """Loops switch the solver to BFS trees"""
+    generator = _generated(3, trap_density=0.3)
+    for y in range(1, generator.width - 1):
+        if generator.grid.get(2, y) == WALL:
+            generator.grid.set(2, y, ROAD)
+    solver = MazeSolver(generator)
+    assert not solver.is_tree
+    for start in _walkable(generator)[::7]:
+        expected = safe_search(generator.grid, start, (generator.exit,))[generator.exit]
+        assert solver.distance(start, 'exit') == len(expected) - 1
+    assert len(solver._trees) <= solver.max_trees
+
+
+def test_generator_solver_follows_replaced_maze():
+    """Replacing the grid or moving the exit gives a fresh solver"""
+    generator = _generated(3)
+    other = _generated(8)
+    assert generator.solver().distance('entrance', 'exit') != \
+        other.solver().distance('entrance', 'exit')
+
+    generator.maze = other.grid.to_rows()
+    generator.entrance, generator.exit = other.entrance, other.exit
+    assert generator.solver().grid is generator.grid
+    assert generator.solver().distance('entrance', 'exit') == \
+        other.solver().distance('entrance', 'exit')
+
+    generator.exit = generator.entrance
+    assert generator.solver().distance('entrance', 'exit') == 0
+
+
+if __name__ == "__main__":
+    test_distances_match_safe_search()
+    test_fields_of_named_cells()
+    test_detour_resets_trap_run()
+    test_mazes_with_loops()
+    test_generator_solver_follows_replaced_maze()
+    print("All tests passed successfully!")
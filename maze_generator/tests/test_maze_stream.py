@@ -0,0 +1,69 @@
+"""
+Tests for row-streaming generation
+"""
+
+import sys
+import os
+import io
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.maze_generator import MazeGenerator
+from src.maze_grid import TRAP
+from src.maze_io import MazeFile
+from src.maze_stream import MazeStream, stream_maze
+
+
+def _materialize(stream):
+    generator = MazeGenerator(stream.width, stream.height)
+    generator.grid.load_bytes(b''.join(stream.rows()))
+    generator.entrance = stream.entrance
+    generator.exit = stream.exit
+    return generator
+
+
+def test_streamed_maze_is_valid():
+    """A streamed maze passes the regular validation"""
+    for seed in range(5):
+        stream = MazeStream(31, 41, seed=seed, trap_density=0.3)
+        generator = _materialize(stream)
+        assert generator.validate_maze(), seed
+        assert generator.get_stats()['has_safe_path']
+
+
+def test_traps_never_touch():
+    """No two traps are neighbours, so every path is safe"""
+    rows = list(stream_maze(41, 61, seed=3, trap_density=0.5))
+    assert len(rows) == 61 and all(len(row) == 41 for row in rows)
+    for x, row in enumerate(rows):
+        for y, code in enumerate(row):
+            if code == TRAP:
+                assert row[y + 1] != TRAP
+                assert rows[x + 1][y] != TRAP
+
+
+def test_formats_agree():
+    """ASCII and packed output describe the same maze"""
+    stream = MazeStream(21, 15, seed=6)
+    reference = _materialize(MazeStream(21, 15, seed=6))
+
+    text = io.StringIO()
+    stream.write_ascii(text)
+    assert text.getvalue() == reference.to_ascii() + '\n'
+
+    data = io.BytesIO()
+    MazeStream(21, 15, seed=6).write_packed(data)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'stream.maze')
+        with open(path, 'wb') as fp:
+            fp.write(data.getvalue())
+        with MazeFile(path) as maze_file:
+            assert maze_file.to_generator().fingerprint() == reference.fingerprint()
+
+
+if __name__ == "__main__":
+    test_streamed_maze_is_valid()
+    test_traps_never_touch()
+    test_formats_agree()
+    print("All tests passed successfully!")
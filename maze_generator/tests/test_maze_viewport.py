@@ -0,0 +1,110 @@
+"""
+Tests for the level-of-detail pyramid and the zoomable viewport
+"""
+
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.maze_generator import MazeGenerator
+from src.maze_grid import MazeGrid, ROAD
+from src.maze_io import MazeFile
+from src.maze_viewport import LodPyramid, MazeViewport
+
+
+class StubImage:
+    """Counts PhotoImage.put calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def put(self, data, to=None):
+        self.calls += 1
+
+
+def _generated(width=61, height=41, seed=1):
+    generator = MazeGenerator(width, height, seed=seed)
+    generator.generate()
+    return generator
+
+
+def test_pyramid_levels_or_their_blocks():
+    """Every level holds the OR of the cell flags below each block"""
+    grid = _generated().grid
+    pyramid = LodPyramid(grid, tile_size=16)
+    for level in range(pyramid.levels):
+        height, width = pyramid.shape(level)
+        rows = pyramid.region(level, 0, 0, height, width)
+        span = 1 << level
+        for i in range(height):
+            for j in range(width):
+                flags = 0
+                for codes in grid.region(i * span, j * span, (i + 1) * span, (j + 1) * span):
+                    for code in codes:
+                        flags |= 1 << code
+                assert rows[i][j] == flags
+    assert pyramid.shape(pyramid.levels - 1) == (1, 1)
+
+
+def test_pyramid_from_file_and_lazy_tiles():
+    """A memory-mapped file gives the same tiles, built only when asked for"""
+    generator = _generated(301, 301)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'maze.maze')
+        generator.save(path)
+        with MazeFile(path) as maze_file:
+            from_file = LodPyramid(maze_file, tile_size=32)
+            window = from_file.region(0, 40, 50, 90, 120)
+            assert from_file.built == 6
+            assert window == LodPyramid(generator.grid, tile_size=32).region(0, 40, 50, 90, 120)
+
+
+def test_pyramid_follows_grid_changes():
+    """Tiles are rebuilt after the grid is modified"""
+    grid = MazeGrid(9, 9)
+    pyramid = LodPyramid(grid)
+    assert pyramid.region(0, 0, 0, 1, 1) == [b'\x01']
+    grid.set(0, 0, ROAD)
+    assert pyramid.region(0, 0, 0, 1, 1) == [bytes([1 << ROAD])]
+
+
+def test_viewport_fit_zoom_and_pan():
+    """Large mazes fit through coarser levels, zoom keeps the anchor cell"""
+    pyramid = LodPyramid(MazeGrid(1999, 1499, fill=ROAD))
+    view = MazeViewport(StubImage(), 500, 400)
+    view.show(pyramid)
+    assert view.level == 2 and view.cell_size == 1
+    assert view.render() == 400
+
+    before = view.to_cell(120, 80)
+    view.zoom(3, (120, 80))
+    assert view.level == 0 and view.cell_size == 2
+    after = view.to_cell(120, 80)
+    assert abs(before[0] - after[0]) < 1 and abs(before[1] - after[1]) < 1
+
+    view.pan(10 ** 6, 10 ** 6)
+    assert (view.top, view.left) == (0, 0)
+    view.render()
+    assert view.render() == 0
+
+
+def test_viewport_small_maze_and_labels():
+    """Small mazes get whole cells and letters on special cells"""
+    generator = _generated(21, 15)
+    view = MazeViewport(StubImage(), 500, 400)
+    view.show(LodPyramid(generator.grid))
+    assert (view.level, view.cell_size) == (0, 23)
+    view.render()
+    texts = [label[2] for label in view.labels()]
+    assert 'E' in texts and 'X' in texts
+
+
+if __name__ == "__main__":
+    test_pyramid_levels_or_their_blocks()
+    test_pyramid_from_file_and_lazy_tiles()
+    test_pyramid_follows_grid_changes()
+    test_viewport_fit_zoom_and_pan()
+    test_viewport_small_maze_and_labels()
+    print("All tests passed successfully!")
@@ -0,0 +1,68 @@
+"""
+Tests for the chunked maze world
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.maze_grid import WALL, TRAP
+from src.maze_world import MazeWorld
+
+
+def test_chunks_are_deterministic():
+    """A chunk comes out the same alone, in a window and in another world object"""
+    with MazeWorld(seed=7, chunk_size=16, prefetch_threads=0) as world:
+        window = world.region(-20, -20, 40, 40)
+    with MazeWorld(seed=7, chunk_size=16, prefetch_threads=0) as other:
+        assert other.region(-4, -4, 12, 12) == [row[16:32] for row in window[16:32]]
+        assert other[-20, 5] == window[0][25]
+    with MazeWorld(seed=8, chunk_size=16, prefetch_threads=0) as different:
+        assert different.region(-20, -20, 40, 40) != window
+
+
+def test_doors_connect_chunks():
+    """Every open cell of a block of chunks is reachable, and no traps touch"""
+    size = 12
+    with MazeWorld(seed=3, chunk_size=size, trap_density=0.3,
+                   prefetch_threads=0) as world:
+        rows = world.region(0, 0, 3 * size, 3 * size)
+    open_cells = {(x, y) for x, row in enumerate(rows) for y, code in enumerate(row)
+                  if code != WALL}
+    seen = {(1, 1)}
+    stack = [(1, 1)]
+    while stack:
+        x, y = stack.pop()
+        for cell in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if cell in open_cells and cell not in seen:
+                seen.add(cell)
+                stack.append(cell)
+    assert seen == open_cells
+
+    traps = {cell for cell in open_cells if rows[cell[0]][cell[1]] == TRAP}
+    assert traps
+    assert not any((x + 1, y) in traps or (x, y + 1) in traps for x, y in traps)
+
+
+def test_cache_is_bounded_and_prefetched():
+    """The LRU keeps the budget and prefetched chunks are hits"""
+    with MazeWorld(seed=1, chunk_size=16, memory_budget=16 * 16 * 4) as world:
+        for cx in range(10):
+            world[cx * 16, 0]
+        stats = world.stats()
+        assert stats['chunks'] == 4 and stats['evicted'] == 6
+        assert stats['misses'] == 10
+
+        world.prefetch(1000, 1000, radius=0)
+        world.join()
+        world[1000, 1000]
+        stats = world.stats()
+        assert stats['prefetched'] == 1 and stats['hits'] == 1
+
+
+if __name__ == "__main__":
+    test_chunks_are_deterministic()
+    test_doors_connect_chunks()
+    test_cache_is_bounded_and_prefetched()
+    print("All tests passed successfully!")
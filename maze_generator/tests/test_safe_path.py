@@ -0,0 +1,138 @@
+"""
+Tests for incremental safe-path maintenance
+"""
+
+import sys
+import os
+import random
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.maze_generator import MazeGenerator
+from src.maze_grid import ROAD, TRAP, WALL, create_grid
+from src.safe_path import SafePathEngine, safe_search, safe_search_bidirectional
+
+
+def _generated(seed, **kwargs):
+    generator = MazeGenerator(21, 15, seed=seed, **kwargs)
+    generator.generate()
+    return generator
+
+
+def test_trap_off_path_needs_no_search():
+    """Traps away from the witness are accepted without searching"""
+    generator = _generated(3)
+    engine = SafePathEngine(generator, generator.entrance, generator.exit)
+    assert engine.searches == 1
+
+    for x in range(generator.height):
+        for y in range(generator.width):
+            if generator.grid.get(x, y) == 1 and not engine.on_path(x, y):
+                assert engine.try_place_trap(x, y)
+                assert generator.grid.get(x, y) == TRAP
+                assert engine.searches == 1
+                return
+
+
+def test_third_trap_in_row_is_rejected():
+    """A run of three traps on the only path is reverted"""
+    generator = _generated(5, trap_density=0)
+    engine = SafePathEngine(generator, generator.entrance, generator.exit)
+    inner = engine.path[1:-1]
+    assert len(inner) >= 3
+
+    stride = generator.grid.stride
+    cells = [divmod(index, stride) for index in inner[:3]]
+    assert engine.try_place_trap(*cells[0])
+    assert engine.try_place_trap(*cells[1])
+    assert not engine.try_place_trap(*cells[2])
+    assert generator.grid.get(*cells[2]) != TRAP
+    assert generator._find_safe_path(generator.entrance, generator.exit)
+
+
+def test_looped_mazes_keep_safe_path():
+    """Witnesses passing a cell twice are checked at every visit"""
+    for seed in range(60):
+        generator = _generated(seed, trap_density=0)
+        grid = generator.grid
+        rng = random.Random(seed)
+        walls = [(x, y) for x in range(1, grid.height - 1) for y in range(1, grid.width - 1)
+                 if grid.get(x, y) == WALL]
+        for cell in rng.sample(walls, len(walls) // 4):
+            grid.set(*cell, ROAD)
+
+        engine = SafePathEngine(generator, generator.entrance, generator.exit)
+        roads = [(x, y) for x in range(grid.height) for y in range(grid.width)
+                 if grid.get(x, y) == ROAD]
+        rng.shuffle(roads)
+        for cell in roads[:len(roads) // 2]:
+            if engine.try_place_trap(*cell):
+                assert generator._find_safe_path(generator.entrance, generator.exit)
+                _assert_safe_walk(grid, engine.witness())
+
+
+def _assert_safe_walk(grid, route):
+    run = 0
+    for cell in route[1:]:
+        run = run + 1 if grid.get(*cell) == TRAP else 0
+        assert run <= 2
+
+
+def test_trap_density():
+    """High trap density still leaves a safe path"""
+    generator = _generated(11, trap_density=0.5)
+    stats = generator.get_stats()
+    assert stats['trap_cells'] > 5
+    assert stats['has_safe_path']
+    assert generator.validate_maze()
+
+
+def _open_room():
+    """7x9 room split by a band of traps three cells wide, open on the last row"""
+    grid = create_grid(9, 7)
+    for x in range(1, 6):
+        for y in range(1, 8):
+            grid.set(x, y, ROAD)
+    for x in range(1, 5):
+        for y in (3, 4, 5):
+            grid.set(x, y, TRAP)
+    return grid
+
+
+def _assert_safe_route(grid, route, start, goal):
+    assert route[0] == start and route[-1] == goal
+    run = 0
+    for cell in route[1:]:
+        run = run + 1 if grid.get(*cell) == TRAP else 0
+        assert run < 3
+    # Crossing the band anywhere above the last row means three traps in a row
+    assert any(x == 5 for x, _ in route)
+
+
+def test_safe_search_routes_around_traps():
+    """Integer-state search finds a safe detour around the trap band"""
+    grid = _open_room()
+    start, goal = (1, 1), (1, 7)
+    paths = safe_search(grid, start, [goal, (0, 0)])
+    assert paths[(0, 0)] == []
+    _assert_safe_route(grid, paths[goal], start, goal)
+    _assert_safe_route(grid, safe_search_bidirectional(grid, start, goal), start, goal)
+
+
+def test_bidirectional_matches_reachability():
+    """Both search directions agree on generated mazes"""
+    for seed in range(10):
+        generator = _generated(seed, trap_density=0.4, algorithm='kruskal')
+        forward = generator._find_safe_path(generator.entrance, generator.exit)
+        both = safe_search_bidirectional(generator.grid, generator.entrance, generator.exit)
+        assert bool(forward) == bool(both)
+
+
+if __name__ == "__main__":
+    test_trap_off_path_needs_no_search()
+    test_third_trap_in_row_is_rejected()
+    test_looped_mazes_keep_safe_path()
+    test_trap_density()
+    test_safe_search_routes_around_traps()
+    test_bidirectional_matches_reachability()
+    print("All tests passed successfully!")